@@ -0,0 +1,168 @@
+"""
+Compare vectorized analytics against naive per-row loops.
+
+Usage:
+    python -m benchmarks.bench_analytics --assets 1000 --days 1825
+    python -m benchmarks.bench_analytics --assets 200 --days 365 --load
+
+The naive correlation is quadratic in assets, so it runs on the first
+--naive-assets assets and is extrapolated to the full universe.
+"""
+
+import argparse
+import math
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.analytics.price_matrix import load_price_matrix
+from src.analytics.risk import correlation, max_drawdown, returns, rolling_volatility
+from src.model.sql_models import Base
+from src.repository.crypto_repository import CryptoRepository
+
+START = datetime(2019, 1, 1)
+WINDOW = 30
+
+
+def make_prices(assets: int, days: int, gap_rate: float = 0.02) -> np.ndarray:
+    rng = np.random.default_rng(42)
+    steps = rng.normal(0, 0.03, size=(assets, days))
+    prices = 100 * np.exp(np.cumsum(steps, axis=1))
+    prices[rng.random(prices.shape) < gap_rate] = np.nan
+    return prices
+
+
+def naive_series(prices: np.ndarray) -> List[List[float]]:
+    return [[None if math.isnan(p) else float(p) for p in row] for row in prices]
+
+
+def naive_returns(series: List[List[float]]) -> List[List[float]]:
+    result = []
+    for row in series:
+        changes = [None]
+        for previous, current in zip(row, row[1:]):
+            ok = previous is not None and current is not None
+            changes.append(current / previous - 1 if ok else None)
+        result.append(changes)
+    return result
+
+
+def naive_volatility(series: List[List[float]]) -> List[List[float]]:
+    result = []
+    for row in series:
+        values = []
+        for end in range(1, len(row) + 1):
+            window = [r for r in row[max(0, end - WINDOW) : end] if r is not None]
+            values.append(statistics.stdev(window) if len(window) >= 2 else None)
+        result.append(values)
+    return result
+
+
+def naive_correlation(series: List[List[float]]) -> Dict:
+    result = {}
+    for i, left in enumerate(series):
+        for j, right in enumerate(series[i + 1 :], i + 1):
+            pairs = [(a, b) for a, b in zip(left, right) if None not in (a, b)]
+            if len(pairs) >= 2:
+                result[i, j] = statistics.correlation(*zip(*pairs))
+    return result
+
+
+def naive_drawdown(series: List[List[float]]) -> List[float]:
+    result = []
+    for row in series:
+        peak, worst = None, 0.0
+        for price in row:
+            if price is None:
+                continue
+            peak = price if peak is None else max(peak, price)
+            worst = min(worst, price / peak - 1)
+        result.append(worst)
+    return result
+
+
+def timed(fn, *args) -> tuple:
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def bench_metrics(prices: np.ndarray, naive_assets: int) -> None:
+    assets = prices.shape[0]
+    print(f"{'metric':<12} {'naive s':>10} {'numpy s':>10} {'speedup':>9}")
+
+    series = naive_series(prices)
+    naive_r, naive_r_s = timed(naive_returns, series)
+    _, naive_v_s = timed(naive_volatility, naive_r)
+    _, naive_c_sample = timed(naive_correlation, naive_r[:naive_assets])
+    pairs = lambda n: n * (n - 1) / 2  # noqa: E731
+    naive_c_s = naive_c_sample * pairs(assets) / max(pairs(naive_assets), 1)
+    _, naive_d_s = timed(naive_drawdown, series)
+
+    vector_r, vector_r_s = timed(returns, prices)
+    _, vector_v_s = timed(rolling_volatility, vector_r, WINDOW)
+    _, vector_c_s = timed(correlation, vector_r)
+    _, vector_d_s = timed(max_drawdown, prices)
+
+    for name, naive, vector in [
+        ("returns", naive_r_s, vector_r_s),
+        ("volatility", naive_v_s, vector_v_s),
+        ("correlation", naive_c_s, vector_c_s),
+        ("drawdown", naive_d_s, vector_d_s),
+    ]:
+        print(f"{name:<12} {naive:>10.3f} {vector:>10.3f} {naive / vector:>8.0f}x")
+    if naive_assets < assets:
+        print(f"(naive correlation extrapolated from {naive_assets} assets)")
+
+
+def bench_load(prices: np.ndarray) -> None:
+    assets, days = prices.shape
+    asset_ids = [f"asset-{i}" for i in range(assets)]
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        with factory() as session:
+            rows = []
+            for asset_id, row in zip(asset_ids, prices):
+                for day, price in enumerate(row):
+                    if not math.isnan(price):
+                        date = START + timedelta(days=day)
+                        time_ms = int(date.timestamp() * 1000)
+                        rows.append((asset_id, price, date, time_ms, "d1"))
+            CryptoRepository(session).bulk_load_asset_histories(rows)
+
+        end = START + timedelta(days=days)
+        with factory() as session:
+            repo = CryptoRepository(session)
+            _, orm_s = timed(
+                lambda: [
+                    repo.get_asset_history_by_date_range(asset_id, START, end)
+                    for asset_id in asset_ids
+                ]
+            )
+        with factory() as session:
+            _, matrix_s = timed(load_price_matrix, session, asset_ids, START, end)
+        engine.dispose()
+    print(f"{'load':<12} {orm_s:>10.3f} {matrix_s:>10.3f} {orm_s / matrix_s:>8.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=1825)
+    parser.add_argument("--naive-assets", type=int, default=100)
+    parser.add_argument(
+        "--load", action="store_true", help="Also time loading from SQLite"
+    )
+    args = parser.parse_args()
+    prices = make_prices(args.assets, args.days)
+    bench_metrics(prices, min(args.naive_assets, args.assets))
+    if args.load:
+        bench_load(prices)
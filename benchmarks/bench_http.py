@@ -0,0 +1,142 @@
+"""
+Compare CoinCapClient connection settings at high request concurrency.
+
+Serves history payloads from a local asyncio HTTP/1.1 server in a separate
+process (keep-alive, optional gzip) and times --requests GETs issued
+--concurrency at a time.
+
+Usage:
+    python -m benchmarks.bench_http --concurrency 64 --requests 2000
+    python -m benchmarks.bench_http --latency 0.02 --points 1440
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import multiprocessing
+import time
+from typing import Dict
+
+import httpx
+import structlog
+
+from benchmarks.fake_coincap import FakeCoinCap
+from src.client.coincap_client import CoinCapClient
+
+
+def make_bodies(points: int) -> Dict[bool, bytes]:
+    """The history payload, keyed by whether it is gzip-compressed."""
+    step = 60_000
+    end = 1_714_435_200_000
+    params = {"interval": "m1", "start": end - (points - 1) * step, "end": end}
+    body = json.dumps(
+        FakeCoinCap().history("bitcoin", httpx.QueryParams(params))
+    ).encode()
+    return {False: body, True: gzip.compress(body)}
+
+
+async def serve_async(points: int, latency: float, ports: multiprocessing.Queue):
+    """
+    Minimal asyncio HTTP/1.1 server with keep-alive.
+
+    A single event loop handles every connection, so the server stays cheap at
+    high connection counts and ``latency`` behaves like network/server delay.
+    """
+    bodies = make_bodies(points)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = head.decode("latin-1").lower()
+                use_gzip = "accept-encoding:" in headers and "gzip" in headers
+                if latency:
+                    await asyncio.sleep(latency)
+                payload = bodies[use_gzip]
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + (b"Content-Encoding: gzip\r\n" if use_gzip else b"")
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+                if "connection: close" in headers:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=1024)
+    ports.put(server.sockets[0].getsockname()[1])
+    await server.serve_forever()
+
+
+def serve(points: int, latency: float, ports: multiprocessing.Queue) -> None:
+    """Run the server in its own process so it does not share the client's GIL."""
+    asyncio.run(serve_async(points, latency, ports))
+
+
+CONFIGS: Dict[str, Dict] = {
+    "default": {},
+    "keepalive_64": {
+        "limits": httpx.Limits(max_connections=100, max_keepalive_connections=64)
+    },
+    "no_keepalive": {
+        "limits": httpx.Limits(max_connections=100, max_keepalive_connections=0)
+    },
+    "10_connections": {
+        "limits": httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    },
+    "identity": {"accept_encoding": "identity"},
+    "http2": {"http2": True},
+}
+
+
+async def run_config(base_url: str, options: Dict, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    async with CoinCapClient(base_url=base_url, rate_limit=0, **options) as client:
+
+        async def one() -> int:
+            async with semaphore:
+                return len(await client._make_request("GET", "/assets/bitcoin/history"))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - started, client.http2
+
+
+def run(args: argparse.Namespace) -> None:
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR)
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ports: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve, args=(args.points, args.latency, ports), daemon=True
+    )
+    server.start()
+    base_url = f"http://127.0.0.1:{ports.get(timeout=10)}"
+    print(f"{'config':<16} {'req/sec':>10} {'seconds':>9}")
+    try:
+        for name, options in CONFIGS.items():
+            elapsed, http2 = asyncio.run(
+                run_config(base_url, options, args.requests, args.concurrency)
+            )
+            note = " (h2 not installed or no TLS: HTTP/1.1)" if name == "http2" else ""
+            if http2:
+                note = ""
+            print(f"{name:<16} {args.requests / elapsed:>10.0f} {elapsed:>9.3f}{note}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005)
+    run(parser.parse_args())
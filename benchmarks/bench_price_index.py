@@ -0,0 +1,92 @@
+"""
+Compare latest price lookups through CryptoRepository with LatestPriceIndex.
+
+Usage:
+    python -m benchmarks.bench_price_index --assets 2000 --days 365
+    python -m benchmarks.bench_price_index --lookups 100000 --batch 500
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.model.sql_models import Base
+from src.repository.crypto_repository import CryptoRepository
+from src.service.price_index import LatestPriceIndex
+
+START = datetime(2023, 1, 1)
+
+
+def per_lookup(fn: Callable[[], object], lookups: int) -> float:
+    started = time.perf_counter()
+    for _ in range(lookups):
+        fn()
+    return (time.perf_counter() - started) / lookups
+
+
+def load(factory: sessionmaker, assets: int, days: int) -> None:
+    rows = []
+    for i in range(assets):
+        for day in range(days):
+            date = START + timedelta(days=day)
+            time_ms = int(date.timestamp() * 1000)
+            rows.append((f"asset-{i}", 100 + day, date, time_ms, "d1"))
+    with factory() as session:
+        CryptoRepository(session).bulk_load_asset_histories(rows)
+
+
+def run(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        load(factory, args.assets, args.days)
+
+        rng = random.Random(42)
+        asset_ids = [f"asset-{i}" for i in range(args.assets)]
+        batch = rng.sample(asset_ids, min(args.batch, args.assets))
+        index = LatestPriceIndex(factory, max_assets=args.assets)
+
+        started = time.perf_counter()
+        index.warm()
+        warm_s = time.perf_counter() - started
+
+        with factory() as session:
+            repo = CryptoRepository(session)
+            db_lookups = max(args.lookups // 100, 1)
+            db_point = per_lookup(
+                lambda: repo.get_latest_prices([rng.choice(asset_ids)]), db_lookups
+            )
+            db_bulk = per_lookup(lambda: repo.get_latest_prices(batch), 10)
+        index_point = per_lookup(
+            lambda: index.price(rng.choice(asset_ids)), args.lookups
+        )
+        index_bulk = per_lookup(lambda: index.prices(batch), 100)
+        engine.dispose()
+
+    print(f"warm-up of {args.assets} assets: {warm_s * 1000:.1f} ms")
+    print(f"\n{'lookup':<22} {'repository us':>14} {'index us':>10} {'speedup':>9}")
+    for name, db, cached in [
+        ("point", db_point, index_point),
+        (f"bulk of {len(batch)}", db_bulk, index_bulk),
+    ]:
+        print(
+            f"{name:<22} {db * 1e6:>14.1f} {cached * 1e6:>10.2f} "
+            f"{db / cached:>8.0f}x"
+        )
+    print(f"\n{index.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500)
+    run(parser.parse_args())
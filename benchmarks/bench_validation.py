@@ -0,0 +1,98 @@
+"""
+Compare history validation pipelines in rows/sec and allocations per row.
+
+Usage:
+    python -m benchmarks.bench_validation --rows 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from src.model.cryptocurrency import AssetHistoryResponse, HistoryPointsAdapter
+from src.model.sql_models import AssetHistory
+
+
+def make_payload(count: int) -> List[Dict]:
+    start = 1_514_764_800_000
+    return [
+        {
+            "priceUsd": f"{40000 + i % 1000 / 7:.16f}",
+            "time": start + i * 60_000,
+            "date": datetime.fromtimestamp((start + i * 60_000) / 1000).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def two_model_pipeline(payload: List[Dict]) -> list:
+    """Current path: one pydantic model per row, then one ORM object per row."""
+    history = AssetHistoryResponse.model_validate({"data": payload}).data
+    return [
+        AssetHistory(
+            asset_id="bitcoin",
+            price_usd=float(item.price_usd),
+            date=datetime.fromtimestamp(item.time / 1000),
+            time=item.time,
+        )
+        for item in history
+    ]
+
+
+def fast_path(payload: List[Dict]) -> list:
+    """Batch TypeAdapter validation straight into bulk insert tuples."""
+    return [
+        (
+            "bitcoin",
+            item["price_usd"],
+            datetime.fromtimestamp(item["time"] / 1000),
+            item["time"],
+        )
+        for item in HistoryPointsAdapter.validate_python(payload)
+    ]
+
+
+PIPELINES: Dict[str, Callable[[List[Dict]], list]] = {
+    "two_model": two_model_pipeline,
+    "fast_path": fast_path,
+}
+
+
+def measure(pipeline: Callable[[List[Dict]], list], payload: List[Dict]) -> tuple:
+    gc.collect()
+    started = time.perf_counter()
+    pipeline(payload)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = pipeline(payload)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+    return elapsed, peak, blocks
+
+
+def run(rows: int) -> None:
+    payload = make_payload(rows)
+    print(
+        f"{'pipeline':<10} {'rows/sec':>12} {'peak bytes/row':>16} {'allocs/row':>12}"
+    )
+    for name, pipeline in PIPELINES.items():
+        elapsed, peak, blocks = measure(pipeline, payload)
+        print(
+            f"{name:<10} {rows / elapsed:>12.0f} {peak / rows:>16.1f} "
+            f"{blocks / rows:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    run(parser.parse_args().rows)
@@ -0,0 +1,153 @@
+"""
+In-process stand-in for the CoinCap API, for benchmarks and load tests.
+
+Responses are generated from the payloads in ``src/examples`` and scaled to
+any requested range, optionally with injected latency and 429 responses.
+"""
+
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+import httpx
+
+from src.util.intervals import interval_ms
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "src" / "examples"
+BASE_URL = "https://coincap.fake/v3"
+
+
+class FakeCoinCap:
+    """
+    httpx request handler emulating the history, markets and assets endpoints.
+
+    History returns one point per interval step inside the requested
+    [start, end] range, cycling through the example prices. Markets return
+    ``markets_per_asset`` pairs derived from the example markets.
+    """
+
+    def __init__(
+        self,
+        markets_per_asset: int = 100,
+        assets: int = 2000,
+        latency: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after: float = 0.05,
+        seed: int = 42,
+    ):
+        """
+        Initialize the fake server.
+
+        Args:
+            markets_per_asset: Markets available for every asset
+            assets: Assets in the /assets listing
+            latency: Seconds added to every response
+            rate_limit_ratio: Share of requests answered with 429
+            retry_after: Retry-After seconds sent with 429 responses
+            seed: Seed for the 429 injection
+        """
+        history = json.loads((EXAMPLES / "slug_history.json").read_text())["data"]
+        markets = json.loads((EXAMPLES / "slug_markets.json").read_text())["data"]
+        self.prices = [point["priceUsd"] for point in history]
+        self.market_templates = markets
+        self.asset_templates = json.loads((EXAMPLES / "assets.json").read_text())[
+            "data"
+        ]
+        self.assets = assets
+        self.markets_per_asset = markets_per_asset
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.rate_limited = 0
+        self.bytes_sent = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rate_limit_ratio and self._random.random() < self.rate_limit_ratio:
+            self.rate_limited += 1
+            return httpx.Response(429, headers={"Retry-After": str(self.retry_after)})
+
+        parts = request.url.path.rstrip("/").split("/")
+        params = request.url.params
+        if len(parts) >= 3 and parts[-3] == "assets" and parts[-1] == "history":
+            body = self.history(parts[-2], params)
+        elif len(parts) >= 3 and parts[-3] == "assets" and parts[-1] == "markets":
+            body = self.markets(parts[-2], params)
+        elif parts[-1] == "assets":
+            body = self.listing(params)
+        else:
+            return httpx.Response(404, json={"error": "not found"})
+        content = json.dumps(body).encode()
+        self.bytes_sent += len(content)
+        return httpx.Response(
+            200, content=content, headers={"Content-Type": "application/json"}
+        )
+
+    def history(self, asset_id: str, params: httpx.QueryParams) -> Dict:
+        step = interval_ms(params.get("interval", "d1"))
+        end = int(params.get("end", 1_714_435_200_000))
+        start = int(params.get("start", end - 30 * step))
+        first = -(-start // step) * step
+        return {
+            "data": [
+                {
+                    "priceUsd": self.prices[(time // step) % len(self.prices)],
+                    "time": time,
+                    "date": datetime.fromtimestamp(time / 1000, timezone.utc)
+                    .isoformat()
+                    .replace("+00:00", "Z"),
+                }
+                for time in range(first, end + 1, step)
+            ],
+            "timestamp": end,
+        }
+
+    def markets(self, asset_id: str, params: httpx.QueryParams) -> Dict:
+        limit = int(params.get("limit", 100))
+        offset = int(params.get("offset", 0))
+        data = []
+        for index in range(offset, min(offset + limit, self.markets_per_asset)):
+            template = self.market_templates[index % len(self.market_templates)]
+            data.append(
+                {
+                    **template,
+                    "baseId": asset_id,
+                    "quoteId": f"{template['quoteId']}-{index}",
+                }
+            )
+        return {"data": data, "timestamp": 0}
+
+    def listing(self, params: httpx.QueryParams) -> Dict:
+        """Assets ranked 1..N, with market cap and volume falling with rank."""
+        limit = int(params.get("limit", 100))
+        offset = int(params.get("offset", 0))
+        data = []
+        for index in range(offset, min(offset + limit, self.assets)):
+            template = self.asset_templates[index % len(self.asset_templates)]
+            data.append(
+                {
+                    **template,
+                    "id": f"asset-{index + 1}",
+                    "rank": str(index + 1),
+                    "marketCapUsd": str(1e12 / (index + 1)),
+                    "volumeUsd24Hr": str(1e10 / (index + 1)),
+                }
+            )
+        return {"data": data, "timestamp": 0}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "bytes_sent": self.bytes_sent,
+        }
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Float, cast, select
+from sqlalchemy.orm import Session
+
+from src.model.sql_models import AssetHistory
+from src.repository.crypto_repository import time_range_clauses
+from src.util.intervals import interval_ms
+
+
+def require_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "Analytics require numpy; install it with `poetry install -E analytics`"
+        ) from e
+    return numpy
+
+
+class PriceMatrix:
+    """
+    Prices of many assets aligned on one dense time index.
+
+    ``prices`` has one row per asset and one column per interval step between
+    ``start_time`` and ``end_time``; steps without a stored point are NaN and
+    False in ``mask``.
+    """
+
+    def __init__(self, asset_ids: List[str], times: Any, prices: Any):
+        np = require_numpy()
+        self.asset_ids = asset_ids
+        self.times = times
+        self.prices = prices
+        self.mask = ~np.isnan(prices)
+
+    @property
+    def dates(self) -> Any:
+        """The time index as numpy datetime64 values."""
+        return self.times.astype("datetime64[ms]")
+
+    def row(self, asset_id: str) -> Any:
+        return self.prices[self.asset_ids.index(asset_id)]
+
+    def coverage(self) -> Dict[str, float]:
+        """Share of index steps with a stored price, per asset."""
+        return dict(zip(self.asset_ids, self.mask.mean(axis=1).tolist()))
+
+
+def load_price_matrix(
+    session: Session,
+    asset_ids: Sequence[str],
+    start_date: datetime,
+    end_date: datetime,
+    interval: str = "d1",
+) -> PriceMatrix:
+    """
+    Load a history range for many assets straight into a PriceMatrix.
+
+    Prices are cast to floating point in SQL and the rows are scattered into a
+    preallocated array, so no ORM instances or Decimals are built.
+
+    Args:
+        session: Database session
+        asset_ids: Assets to load, in the row order of the matrix
+        start_date: Inclusive start; aligned down to the interval
+        end_date: Exclusive end
+        interval: Interval of the stored rows (default is d1)
+
+    Returns:
+        PriceMatrix: Aligned prices with NaN where points are missing
+    """
+    np = require_numpy()
+    step = interval_ms(interval)
+    start_time = int(start_date.timestamp() * 1000) // step * step
+    end_time = int(end_date.timestamp() * 1000)
+    times = np.arange(start_time, end_time, step, dtype=np.int64)
+    prices = np.full((len(asset_ids), times.size), np.nan)
+    positions = {asset_id: index for index, asset_id in enumerate(asset_ids)}
+
+    query = select(
+        AssetHistory.asset_id, AssetHistory.time, cast(AssetHistory.price_usd, Float)
+    ).where(
+        AssetHistory.asset_id.in_(list(asset_ids)),
+        AssetHistory.interval == interval,
+        *time_range_clauses(start_time, end_time),
+    )
+    result = session.execute(query.execution_options(yield_per=50_000))
+    for rows in result.partitions():
+        assets, point_times, values = zip(*rows)
+        row_index = np.fromiter(
+            (positions[asset_id] for asset_id in assets), np.intp, len(assets)
+        )
+        column_index = (np.asarray(point_times, dtype=np.int64) - start_time) // step
+        prices[row_index, column_index] = values
+    return PriceMatrix(list(asset_ids), times, prices)
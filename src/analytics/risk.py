@@ -0,0 +1,107 @@
+from typing import Any
+
+from src.analytics.price_matrix import require_numpy
+
+# All functions take (assets x time) float arrays where NaN marks a gap and
+# return arrays of the same layout, one row per asset.
+
+
+def forward_fill(prices: Any) -> Any:
+    """Carry the last observed price forward over gaps."""
+    np = require_numpy()
+    observed = ~np.isnan(prices)
+    index = np.where(observed, np.arange(prices.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    return np.take_along_axis(prices, index, axis=1)
+
+
+def returns(prices: Any, log: bool = False) -> Any:
+    """
+    Returns between consecutive steps; NaN at the first step and around gaps.
+
+    Args:
+        prices: Price matrix
+        log: Compute log returns instead of simple returns
+    """
+    np = require_numpy()
+    result = np.full(prices.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = prices[:, 1:] / prices[:, :-1]
+        result[:, 1:] = np.log(ratio) if log else ratio - 1
+    return result
+
+
+def _window_sums(values: Any, window: int) -> Any:
+    """Sum of the last ``window`` steps at every step, via cumulative sums."""
+    np = require_numpy()
+    cumulative = np.cumsum(values, axis=1)
+    sums = cumulative.copy()
+    sums[:, window:] -= cumulative[:, :-window]
+    return sums
+
+
+def rolling_volatility(returns: Any, window: int, min_periods: int = 2) -> Any:
+    """
+    Rolling sample standard deviation of returns, ignoring gaps.
+
+    Args:
+        returns: Return matrix
+        window: Window length in steps
+        min_periods: Observed returns required in a window; NaN below it
+    """
+    np = require_numpy()
+    observed = ~np.isnan(returns)
+    values = np.where(observed, returns, 0.0)
+    count = _window_sums(observed.astype(float), window)
+    total = _window_sums(values, window)
+    squares = _window_sums(values * values, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (squares - total * total / count) / (count - 1)
+    volatility = np.sqrt(np.clip(variance, 0.0, None))
+    volatility[count < max(min_periods, 2)] = np.nan
+    return volatility
+
+
+def correlation(returns: Any, min_periods: int = 2) -> Any:
+    """
+    Pairwise Pearson correlation between assets over their common observations.
+
+    Gaps are excluded pairwise with matrix products instead of per-pair loops.
+
+    Returns:
+        (assets x assets) matrix; NaN where a pair shares fewer than
+        ``min_periods`` observations or one side is constant
+    """
+    np = require_numpy()
+    observed = (~np.isnan(returns)).astype(float)
+    values = np.where(observed > 0, returns, 0.0)
+    count = observed @ observed.T
+    sum_x = values @ observed.T
+    sum_xx = (values * values) @ observed.T
+    sum_xy = values @ values.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = sum_xy - sum_x * sum_x.T / count
+        variance_x = sum_xx - sum_x * sum_x / count
+        variance_y = sum_xx.T - sum_x.T * sum_x.T / count
+        result = covariance / np.sqrt(variance_x * variance_y)
+    result[count < max(min_periods, 2)] = np.nan
+    return np.clip(result, -1.0, 1.0)
+
+
+def drawdown(prices: Any) -> Any:
+    """Fractional distance below the running peak at each step (0 at a peak)."""
+    np = require_numpy()
+    filled = forward_fill(prices)
+    peak = np.fmax.accumulate(filled, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return filled / peak - 1
+
+
+def max_drawdown(prices: Any) -> Any:
+    """Deepest drawdown of each asset over the whole range (NaN if no prices)."""
+    np = require_numpy()
+    drawdowns = drawdown(prices)
+    result = np.full(prices.shape[0], np.nan)
+    has_prices = ~np.isnan(drawdowns).all(axis=1)
+    result[has_prices] = np.nanmin(drawdowns[has_prices], axis=1)
+    return result
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 
-from src.model.cryptocurrency import AssetHistory, Market
+from src.model.cryptocurrency import Asset, AssetHistory, Market
 
 
 class BaseCryptoClient(ABC):
@@ -32,3 +32,17 @@ class BaseCryptoClient(ABC):
             List[Market]: List of market data
         """
         pass
+
+    @abstractmethod
+    async def get_assets(self, limit: int = 100, offset: int = 0) -> List[Asset]:
+        """
+        Get one page of the asset listing.
+
+        Args:
+            limit (int): Number of results to return
+            offset (int): Number of results to skip
+
+        Returns:
+            List[Asset]: List of assets
+        """
+        pass
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import urlencode
+
+import httpx
+
+
+class CacheEntry:
+    """A cached response body with its validators and expiry."""
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        expires_at: Optional[float] = None,
+    ):
+        """
+        Initialize the entry.
+
+        Args:
+            body (bytes): Raw response body
+            etag (Optional[str]): ETag header of the response
+            last_modified (Optional[str]): Last-Modified header of the response
+            expires_at (Optional[float]): UNIX time after which the entry must be
+                revalidated; None means it never expires
+        """
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return self.expires_at is None or (now or time.time()) < self.expires_at
+
+    def validators(self) -> dict:
+        """Conditional request headers for revalidating the entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of API response bodies with an optional disk store.
+
+    Entries expire after a TTL, or never when stored with ``ttl=None`` (used for
+    closed history windows). The memory tier evicts least recently used entries
+    beyond ``max_entries`` or ``max_bytes``; the disk tier, when a directory is
+    given, keeps every entry across runs and refills the memory tier on a miss.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 60.0,
+        directory: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Entries kept in memory
+            max_bytes (int): Total body bytes kept in memory
+            ttl (float): Default seconds before an entry must be revalidated
+            directory (Optional[Union[str, Path]]): Directory of the disk store
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        """Cache key of a request: method, path and sorted query parameters."""
+        params = urlencode(sorted(request.url.params.multi_items()))
+        return f"{request.method} {request.url.host}{request.url.path}?{params}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry, fresh or stale; stale entries still carry validators.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.directory:
+            entry = self._read(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is not None and entry.is_fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def put(
+        self,
+        key: str,
+        response: httpx.Response,
+        body: bytes,
+        ttl: Optional[float],
+    ) -> CacheEntry:
+        """
+        Store a response body.
+
+        Args:
+            key (str): Cache key, see ResponseCache.key
+            response (httpx.Response): Response providing the validators
+            body (bytes): Raw response body
+            ttl (Optional[float]): Seconds until revalidation; None never expires
+        """
+        entry = CacheEntry(
+            body,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            expires_at=self._expiry(ttl),
+        )
+        self._remember(key, entry)
+        if self.directory:
+            self._write(key, entry)
+        return entry
+
+    def refresh(self, key: str, entry: CacheEntry, ttl: Optional[float]) -> None:
+        """Extend an entry after the server confirmed it with 304 Not Modified."""
+        self.revalidated += 1
+        entry.expires_at = self._expiry(ttl)
+        if self.directory:
+            self._write(key, entry)
+
+    def stats(self) -> dict:
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_revalidated": self.revalidated,
+            "cache_entries": len(self._entries),
+            "cache_bytes": self._bytes,
+        }
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        if ttl is None:
+            return None
+        return time.time() + ttl
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous.body)
+        if len(entry.body) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.body)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key), "rb") as file:
+                meta = json.loads(file.readline())
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("key") != key:
+            return None
+        return CacheEntry(body, meta["etag"], meta["last_modified"], meta["expires_at"])
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        """Write metadata as a JSON line followed by the raw body, atomically."""
+        meta = {
+            "key": key,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "expires_at": entry.expires_at,
+        }
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as file:
+            file.write(json.dumps(meta).encode() + b"\n")
+            file.write(entry.body)
+        os.replace(tmp, path)
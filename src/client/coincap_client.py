@@ -1,18 +1,105 @@
-from typing import List, Optional
+import asyncio
+import importlib.util
+import json
+import re
+import time
+from collections import deque
+from operator import attrgetter, itemgetter
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 
-from dotenv import load_dotenv
 import httpx
 import os
+from pydantic import TypeAdapter
 from src.client.base_client import BaseCryptoClient
+from src.client.cache import ResponseCache
+from src.client.rate_limiter import TokenBucket, backoff_delay, parse_retry_after
 from src.model.cryptocurrency import (
+    Asset,
     AssetHistory,
     AssetHistoryResponse,
+    AssetResponse,
+    HistoryPoint,
+    HistoryPointsAdapter,
     Market,
     MarketResponse,
 )
+from src.util import env  # noqa: F401  (loads .env before settings are read)
+from src.util.intervals import history_windows, interval_ms
+from src.util.json_stream import iter_json_array
 from src.util.logger import logger
+from src.util.metrics import metrics
 
-load_dotenv()
+_HISTORY_BATCH = TypeAdapter(List[AssetHistory])
+_MARKET_BATCH = TypeAdapter(List[Market])
+
+
+_REQUESTS = metrics.counter("coincap_requests_total", "CoinCap HTTP responses")
+_REQUEST_SECONDS = metrics.histogram(
+    "coincap_request_seconds", "CoinCap time to response headers"
+)
+_RETRIES = metrics.counter("coincap_retries_total", "CoinCap request retries")
+_RATE_LIMITED = metrics.counter(
+    "coincap_rate_limited_total", "CoinCap 429 Too Many Requests responses"
+)
+_RESPONSE_BYTES = metrics.counter(
+    "coincap_response_bytes_total", "CoinCap response body bytes received"
+)
+
+
+def supported_encodings() -> List[str]:
+    """Content encodings httpx can decode with the installed packages."""
+    encodings = ["gzip", "deflate"]
+    for encoding, modules in (
+        ("br", ("brotli", "brotlicffi")),
+        ("zstd", ("zstandard",)),
+    ):
+        if any(importlib.util.find_spec(module) for module in modules):
+            encodings.append(encoding)
+    return encodings
+
+
+def negotiate_encodings(requested: Optional[str] = None) -> str:
+    """
+    Build an Accept-Encoding value, keeping only encodings that can be decoded.
+
+    Args:
+        requested: Comma-separated encodings, e.g. "br, gzip"; None means all
+            supported ones
+
+    Returns:
+        str: Accept-Encoding header value ("identity" if nothing is usable)
+    """
+    supported = supported_encodings()
+    if requested is None:
+        return ", ".join(supported)
+    wanted = [encoding.strip() for encoding in requested.split(",") if encoding.strip()]
+    usable = [
+        encoding
+        for encoding in wanted
+        if encoding.split(";")[0] in supported or encoding.startswith("identity")
+    ]
+    if len(usable) < len(wanted):
+        logger.warning(
+            "Dropping unsupported Accept-Encoding values",
+            requested=requested,
+            supported=supported,
+        )
+    return ", ".join(usable) or "identity"
+
+
+def _endpoint_label(endpoint: str) -> str:
+    """Collapse asset IDs so endpoints form a bounded set of metric labels."""
+    return re.sub(r"^/assets/[^/]+", "/assets/{id}", endpoint)
+
+
+async def _single_chunk(body: bytes) -> AsyncIterator[bytes]:
+    yield body
+
+
+async def _counted(chunks: AsyncIterator[bytes], endpoint: str) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        _RESPONSE_BYTES.inc(len(chunk), endpoint=endpoint)
+        yield chunk
 
 
 class CoinCapClient(BaseCryptoClient):
@@ -20,32 +107,126 @@ class CoinCapClient(BaseCryptoClient):
 
     BASE_URL = os.getenv("BASE_URL_API")
     TIMEOUT = 30.0  # seconds
+    CONNECT_TIMEOUT = float(os.getenv("COINCAP_CONNECT_TIMEOUT", "5"))
+    READ_TIMEOUT = float(os.getenv("COINCAP_READ_TIMEOUT", str(TIMEOUT)))
+    POOL_TIMEOUT = float(os.getenv("COINCAP_POOL_TIMEOUT", str(TIMEOUT)))
+    MAX_CONNECTIONS = int(os.getenv("COINCAP_MAX_CONNECTIONS", "100"))
+    # httpcore scans idle connections per queued request, so a very large
+    # keep-alive pool costs CPU at high concurrency (see benchmarks/bench_http.py)
+    MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("COINCAP_MAX_KEEPALIVE", "20"))
+    KEEPALIVE_EXPIRY = float(os.getenv("COINCAP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2 = os.getenv("COINCAP_HTTP2", "").lower() in ("1", "true", "yes")
+    ACCEPT_ENCODING = os.getenv("COINCAP_ACCEPT_ENCODING")  # default: all supported
     MAX_RETRIES = 3
+    RATE_LIMIT = float(os.getenv("COINCAP_RATE_LIMIT", "10"))  # requests per second
+    RATE_LIMIT_BURST = int(os.getenv("COINCAP_RATE_LIMIT_BURST", "10"))
+    BACKOFF_BASE = 0.5  # seconds
+    BACKOFF_MAX = 30.0  # seconds
+    HISTORY_POINTS_PER_REQUEST = 1440  # e.g. one day of m1 data per request
+    HISTORY_CONCURRENCY = 4  # windows fetched in parallel per asset
+    STREAM_BATCH_SIZE = 500  # items validated and yielded at a time when streaming
+    MARKETS_PAGE_SIZE = 2000  # largest page the markets endpoint serves
+    MARKETS_CONCURRENCY = 4  # market pages fetched in parallel per asset
+    ASSETS_PAGE_SIZE = 2000  # largest page the assets endpoint serves
+    ASSETS_CONCURRENCY = 4  # asset listing pages fetched in parallel
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        rate_limit: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[ResponseCache] = None,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        http2: Optional[bool] = None,
+        accept_encoding: Optional[str] = None,
+    ):
         """
         Initialize the CoinCap client.
 
         Args:
             api_key (Optional[str]): API key for authentication
+            base_url (Optional[str]): API base URL (defaults to BASE_URL_API)
+            rate_limit (Optional[float]): Requests per second shared by every
+                coroutine using this client (0 disables client-side limiting)
+            rate_limit_burst (Optional[int]): Requests allowed back to back
+            transport (Optional[httpx.AsyncBaseTransport]): Custom HTTP transport
+            cache (Optional[ResponseCache]): Cache for GET response bodies;
+                closed history windows are kept without expiry
+            limits (Optional[httpx.Limits]): Connection pool limits (defaults to
+                the COINCAP_MAX_* settings)
+            timeout (Optional[httpx.Timeout]): Connect/read/write/pool timeouts
+            http2 (Optional[bool]): Multiplex requests over HTTP/2; falls back to
+                HTTP/1.1 when the h2 package is not installed
+            accept_encoding (Optional[str]): Accept-Encoding header; unsupported
+                encodings are dropped (defaults to every encoding httpx decodes)
         """
         self.api_key = api_key
-        self._client = httpx.AsyncClient(
-            base_url=self.BASE_URL,
-            timeout=self.TIMEOUT,
+        self.accept_encoding = negotiate_encodings(
+            accept_encoding or self.ACCEPT_ENCODING
+        )
+        self.http2 = self._http2_available(self.HTTP2 if http2 is None else http2)
+        # The httpx client (and its SSL context) is built on the first request
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_options = dict(
+            base_url=base_url or self.BASE_URL,
+            timeout=timeout
+            or httpx.Timeout(
+                self.TIMEOUT,
+                connect=self.CONNECT_TIMEOUT,
+                read=self.READ_TIMEOUT,
+                pool=self.POOL_TIMEOUT,
+            ),
+            limits=limits
+            or httpx.Limits(
+                max_connections=self.MAX_CONNECTIONS,
+                max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self.KEEPALIVE_EXPIRY,
+            ),
+            http2=self.http2,
             headers=self._get_headers(),
+            transport=transport,
         )
 
+        rate = self.RATE_LIMIT if rate_limit is None else rate_limit
+        burst = rate_limit_burst or self.RATE_LIMIT_BURST
+        self.rate_limiter = TokenBucket(rate, burst) if rate > 0 else None
+        self.cache = cache
+        self.retries = 0
+        self.rate_limited_responses = 0
+        self.backoff_seconds = 0.0
+
     def _get_headers(self) -> dict:
         """Get headers for API requests."""
         headers = {
             "Accept": "application/json",
+            "Accept-Encoding": self.accept_encoding,
             "Content-Type": "application/json",
         }
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
         return headers
 
+    @staticmethod
+    def _http2_available(requested: bool) -> bool:
+        if not requested:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+            return False
+        return True
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying httpx client, created on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_options)
+        return self._client
+
     async def __aenter__(self):
         """Context manager entry."""
         return self
@@ -56,11 +237,42 @@ class CoinCapClient(BaseCryptoClient):
 
     async def close(self):
         """Close the HTTP client."""
-        await self._client.aclose()
+        logger.info("CoinCap client throttling summary", **self.throttle_stats())
+        if self.cache:
+            logger.info("CoinCap client cache summary", **self.cache.stats())
+        if self._client is not None:
+            await self._client.aclose()
+
+    def throttle_stats(self) -> dict:
+        """Get counters for time spent rate limited and backing off."""
+        limiter = self.rate_limiter
+        return {
+            "retries": self.retries,
+            "rate_limited_responses": self.rate_limited_responses,
+            "backoff_seconds": round(self.backoff_seconds, 3),
+            "throttled_requests": limiter.throttled_requests if limiter else 0,
+            "throttled_seconds": round(limiter.throttled_seconds, 3) if limiter else 0,
+        }
+
+    async def _backoff(self, delay: float, shared: bool = False) -> None:
+        """
+        Wait before retrying a request.
+
+        Args:
+            delay (float): Seconds to wait
+            shared (bool): Pause every coroutine on the shared rate limiter
+                instead of only the caller (used for 429 responses)
+        """
+        self.retries += 1
+        self.backoff_seconds += delay
+        if shared and self.rate_limiter:
+            self.rate_limiter.pause(delay)
+        else:
+            await asyncio.sleep(delay)
 
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> dict:
         """
-        Make an HTTP request with retry logic and error handling.
+        Make an HTTP request and decode the full JSON body.
 
         Args:
             method (str): HTTP method
@@ -73,19 +285,136 @@ class CoinCapClient(BaseCryptoClient):
         Raises:
             httpx.HTTPError: If the request fails after retries
         """
+        if self.cache and method == "GET":
+            body = await self._cached_body(method, endpoint, **kwargs)
+        else:
+            body = (await self._send(method, endpoint, **kwargs)).content
+            _RESPONSE_BYTES.inc(len(body), endpoint=_endpoint_label(endpoint))
+        with metrics.span("parse", endpoint=_endpoint_label(endpoint)):
+            return json.loads(body)
+
+    async def _stream_items(
+        self, method: str, endpoint: str, key: str = "data", **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Make an HTTP request and yield the items of the ``key`` array as they arrive.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            key (str): Name of the array in the JSON response
+            **kwargs: Additional arguments for the request
+
+        Yields:
+            Any: Raw decoded items of the array
+
+        Raises:
+            httpx.HTTPError: If the request fails after retries
+        """
+        if self.cache and method == "GET":
+            # The body is cached whole, so replay it as a single chunk
+            body = await self._cached_body(method, endpoint, **kwargs)
+            async for item in iter_json_array(_single_chunk(body), key):
+                yield item
+            return
+
+        response = await self._send(method, endpoint, stream=True, **kwargs)
+        chunks = _counted(response.aiter_bytes(), _endpoint_label(endpoint))
+        try:
+            async for item in iter_json_array(chunks, key):
+                yield item
+        finally:
+            await response.aclose()
+
+    async def _cached_body(self, method: str, endpoint: str, **kwargs) -> bytes:
+        """
+        Get a response body through the cache.
+
+        Fresh entries are returned without a request; stale ones are revalidated
+        with If-None-Match/If-Modified-Since and reused on 304 Not Modified.
+        """
+        key = self.cache.key(self.client.build_request(method, endpoint, **kwargs))
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh():
+            return entry.body
+
+        ttl = self._cache_ttl(endpoint, kwargs.get("params") or {})
+        headers = entry.validators() if entry is not None else {}
+        response = await self._send(method, endpoint, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(key, entry, ttl)
+            return entry.body
+        _RESPONSE_BYTES.inc(len(response.content), endpoint=_endpoint_label(endpoint))
+        return self.cache.put(key, response, response.content, ttl).body
+
+    def _cache_ttl(self, endpoint: str, params: dict) -> Optional[float]:
+        """
+        Cache lifetime of a response: None (forever) for closed history windows.
+
+        A history window is closed once its end, plus one interval for the
+        last bucket to settle, lies in the past.
+        """
+        end = params.get("end")
+        if endpoint.endswith("/history") and end is not None:
+            settled = int(end) + interval_ms(params.get("interval", "d1"))
+            if settled <= time.time() * 1000:
+                return None
+        return self.cache.ttl
+
+    async def _send(
+        self, method: str, endpoint: str, stream: bool = False, **kwargs
+    ) -> httpx.Response:
+        """
+        Send an HTTP request with rate limiting, retry logic and error handling.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            stream (bool): Return before reading the body; the caller must close it
+            **kwargs: Additional arguments for the request
+
+        Returns:
+            httpx.Response: Successful response
+
+        Raises:
+            httpx.HTTPError: If the request fails after retries
+        """
+        label = _endpoint_label(endpoint)
         for attempt in range(self.MAX_RETRIES):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
             try:
-                response = await self._client.request(method, endpoint, **kwargs)
-                response.raise_for_status()
-                return response.json()
+                request = self.client.build_request(method, endpoint, **kwargs)
+                started = time.perf_counter()
+                response = await self.client.send(request, stream=stream)
+                _REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=label)
+                _REQUESTS.inc(endpoint=label, status=response.status_code)
+                if response.status_code == 304:  # conditional request, body cached
+                    return response
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError:
+                    await response.aclose()
+                    raise
+                return response
             except httpx.HTTPStatusError as e:
                 if e.response.status_code == 429:  # Rate limit
+                    self.rate_limited_responses += 1
+                    _RATE_LIMITED.inc(endpoint=label)
                     if attempt < self.MAX_RETRIES - 1:
+                        _RETRIES.inc(endpoint=label, reason="rate_limited")
+                        delay = parse_retry_after(e.response.headers.get("Retry-After"))
+                        if delay is None:
+                            delay = backoff_delay(
+                                attempt, self.BACKOFF_BASE, self.BACKOFF_MAX
+                            )
                         logger.warning(
                             "Rate limit exceeded, retrying...",
                             attempt=attempt + 1,
                             max_retries=self.MAX_RETRIES,
+                            delay=round(delay, 3),
                         )
+                        await self._backoff(delay, shared=True)
                         continue
                 logger.error(
                     "HTTP error occurred",
@@ -95,11 +424,15 @@ class CoinCapClient(BaseCryptoClient):
                 raise
             except httpx.TimeoutException:
                 if attempt < self.MAX_RETRIES - 1:
+                    _RETRIES.inc(endpoint=label, reason="timeout")
+                    delay = backoff_delay(attempt, self.BACKOFF_BASE, self.BACKOFF_MAX)
                     logger.warning(
                         "Request timed out, retrying...",
                         attempt=attempt + 1,
                         max_retries=self.MAX_RETRIES,
+                        delay=round(delay, 3),
                     )
+                    await self._backoff(delay)
                     continue
                 logger.error("Request timed out after all retries")
                 raise
@@ -136,7 +469,8 @@ class CoinCapClient(BaseCryptoClient):
             response = await self._make_request(
                 "GET", f"/assets/{asset_id}/history", params=params
             )
-            history_response = AssetHistoryResponse.model_validate(response)
+            with metrics.span("validate", endpoint="/assets/{id}/history"):
+                history_response = AssetHistoryResponse.model_validate(response)
             return history_response.data
         except Exception as e:
             logger.error(
@@ -146,6 +480,240 @@ class CoinCapClient(BaseCryptoClient):
             )
             raise
 
+    async def _stream_batches(
+        self, endpoint: str, params: dict, adapter: TypeAdapter, batch_size: int
+    ) -> AsyncIterator[list]:
+        """Stream the ``data`` array of a GET endpoint in validated batches."""
+        batch = []
+        async for item in self._stream_items("GET", endpoint, params=params):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield self._validate(adapter, batch, endpoint)
+                batch = []
+        if batch:
+            yield self._validate(adapter, batch, endpoint)
+
+    @staticmethod
+    def _validate(adapter: TypeAdapter, batch: list, endpoint: str) -> list:
+        with metrics.span("validate", endpoint=_endpoint_label(endpoint)):
+            return adapter.validate_python(batch)
+
+    async def stream_history(
+        self,
+        asset_id: str,
+        interval: str = "d1",
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[List[AssetHistory]]:
+        """
+        Stream historical price data, parsing the response incrementally.
+
+        Args:
+            asset_id (str): The ID of the asset
+            interval (str): Time interval (m1, m5, m15, m30, h1, h2, h6, h12, d1)
+            start (Optional[int]): UNIX time in milliseconds
+            end (Optional[int]): UNIX time in milliseconds
+            batch_size (Optional[int]): Items per yielded batch
+
+        Yields:
+            List[AssetHistory]: Validated historical price data
+        """
+        async for batch in self._stream_history(
+            asset_id, interval, start, end, batch_size, _HISTORY_BATCH
+        ):
+            yield batch
+
+    async def stream_history_points(
+        self,
+        asset_id: str,
+        interval: str = "d1",
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[List[HistoryPoint]]:
+        """
+        Stream historical price data as lightweight HistoryPoint dicts.
+
+        Same as stream_history, but each batch is validated once with
+        HistoryPointsAdapter instead of building one pydantic model per row.
+
+        Yields:
+            List[HistoryPoint]: Validated historical price points
+        """
+        async for batch in self._stream_history(
+            asset_id, interval, start, end, batch_size, HistoryPointsAdapter
+        ):
+            yield batch
+
+    async def _stream_history(
+        self,
+        asset_id: str,
+        interval: str,
+        start: Optional[int],
+        end: Optional[int],
+        batch_size: Optional[int],
+        adapter: TypeAdapter,
+    ) -> AsyncIterator[list]:
+        try:
+            params = {"interval": interval}
+            if start is not None:
+                params["start"] = start
+            if end is not None:
+                params["end"] = end
+
+            async for batch in self._stream_batches(
+                f"/assets/{asset_id}/history",
+                params,
+                adapter,
+                batch_size or self.STREAM_BATCH_SIZE,
+            ):
+                yield batch
+        except Exception as e:
+            logger.error(
+                "Failed to stream asset history",
+                asset_id=asset_id,
+                error=str(e),
+            )
+            raise
+
+    async def iter_history(
+        self,
+        asset_id: str,
+        interval: str,
+        start: int,
+        end: int,
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[List[AssetHistory]]:
+        """
+        Fetch a history range in interval-sized windows, yielding each window.
+
+        Windows are requested concurrently (bounded by ``max_concurrency``) but
+        yielded in time order, deduplicated on ``time``, so callers can start
+        storing data before the whole range is downloaded.
+
+        Args:
+            asset_id (str): The ID of the asset
+            interval (str): Time interval (m1, m5, m15, m30, h1, h2, h6, h12, d1)
+            start (int): UNIX time in milliseconds
+            end (int): UNIX time in milliseconds
+            max_concurrency (Optional[int]): Windows in flight at once
+
+        Yields:
+            List[AssetHistory]: Historical price data for one window
+        """
+        async for batch in self._iter_windows(
+            asset_id,
+            interval,
+            start,
+            end,
+            max_concurrency,
+            _HISTORY_BATCH,
+            attrgetter("time"),
+        ):
+            yield batch
+
+    async def iter_history_points(
+        self,
+        asset_id: str,
+        interval: str,
+        start: int,
+        end: int,
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[List[HistoryPoint]]:
+        """
+        Fetch a history range in concurrent windows as HistoryPoint dicts.
+
+        Same as iter_history, using the batch validation fast path.
+
+        Yields:
+            List[HistoryPoint]: Historical price points for one window
+        """
+        async for batch in self._iter_windows(
+            asset_id,
+            interval,
+            start,
+            end,
+            max_concurrency,
+            HistoryPointsAdapter,
+            itemgetter("time"),
+        ):
+            yield batch
+
+    async def _iter_windows(
+        self,
+        asset_id: str,
+        interval: str,
+        start: int,
+        end: int,
+        max_concurrency: Optional[int],
+        adapter: TypeAdapter,
+        time_of: Callable[[Any], int],
+    ) -> AsyncIterator[list]:
+        windows = history_windows(start, end, interval, self.HISTORY_POINTS_PER_REQUEST)
+        limit = max_concurrency or self.HISTORY_CONCURRENCY
+        pending: deque = deque()
+        last_time = None
+
+        def schedule() -> None:
+            window = next(windows, None)
+            if window is not None:
+                pending.append(
+                    asyncio.create_task(
+                        self._fetch_window(asset_id, interval, *window, adapter)
+                    )
+                )
+
+        try:
+            for _ in range(limit):
+                schedule()
+            while pending:
+                history = await pending.popleft()
+                schedule()
+                batch = []
+                for item in sorted(history, key=time_of):
+                    if last_time is None or time_of(item) > last_time:
+                        batch.append(item)
+                        last_time = time_of(item)
+                if batch:
+                    yield batch
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_window(
+        self, asset_id: str, interval: str, start: int, end: int, adapter: TypeAdapter
+    ) -> list:
+        return [
+            item
+            async for batch in self._stream_history(
+                asset_id, interval, start, end, None, adapter
+            )
+            for item in batch
+        ]
+
+    async def get_history_range(
+        self,
+        asset_id: str,
+        interval: str,
+        start: int,
+        end: int,
+        max_concurrency: Optional[int] = None,
+    ) -> List[AssetHistory]:
+        """
+        Fetch a full history range using concurrent windows (see iter_history).
+
+        Returns:
+            List[AssetHistory]: Deduplicated historical price data in time order
+        """
+        return [
+            item
+            async for batch in self.iter_history(
+                asset_id, interval, start, end, max_concurrency
+            )
+            for item in batch
+        ]
+
     async def get_markets(
         self, asset_id: str, limit: Optional[int] = 100, offset: Optional[int] = 0
     ) -> List[Market]:
@@ -165,7 +733,8 @@ class CoinCapClient(BaseCryptoClient):
             response = await self._make_request(
                 "GET", f"/assets/{asset_id}/markets", params=params
             )
-            market_response = MarketResponse.model_validate(response)
+            with metrics.span("validate", endpoint="/assets/{id}/markets"):
+                market_response = MarketResponse.model_validate(response)
             return market_response.data
         except Exception as e:
             logger.error(
@@ -174,3 +743,189 @@ class CoinCapClient(BaseCryptoClient):
                 error=str(e),
             )
             raise
+
+    async def stream_markets(
+        self,
+        asset_id: str,
+        limit: Optional[int] = 100,
+        offset: Optional[int] = 0,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[List[Market]]:
+        """
+        Stream market data, parsing the response incrementally.
+
+        Args:
+            asset_id (str): The ID of the asset
+            limit (Optional[int]): Number of results to return (default is 100)
+            offset (Optional[int]): Number of results to skip (default is 0)
+            batch_size (Optional[int]): Items per yielded batch
+
+        Yields:
+            List[Market]: Validated market data
+        """
+        try:
+            async for batch in self._stream_batches(
+                f"/assets/{asset_id}/markets",
+                {"limit": limit, "offset": offset},
+                _MARKET_BATCH,
+                batch_size or self.STREAM_BATCH_SIZE,
+            ):
+                yield batch
+        except Exception as e:
+            logger.error(
+                "Failed to stream asset markets",
+                asset_id=asset_id,
+                error=str(e),
+            )
+            raise
+
+    async def get_all_markets(
+        self,
+        asset_id: str,
+        offset: int = 0,
+        page_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[List[Market]]:
+        """
+        Fetch every market of an asset, following pagination to the end.
+
+        Pages are yielded as they arrive, not in offset order; see _all_pages.
+
+        Args:
+            asset_id (str): The ID of the asset
+            offset (int): Number of results to skip (default is 0)
+            page_size (Optional[int]): Markets requested per page
+            max_concurrency (Optional[int]): Pages in flight at once
+
+        Yields:
+            List[Market]: One page of market data
+        """
+
+        def fetch(limit: int, page_offset: int) -> Awaitable[List[Market]]:
+            return self.get_markets(asset_id, limit=limit, offset=page_offset)
+
+        async for page in self._all_pages(
+            fetch,
+            offset,
+            page_size or self.MARKETS_PAGE_SIZE,
+            max_concurrency or self.MARKETS_CONCURRENCY,
+        ):
+            yield page
+
+    async def get_assets(
+        self, limit: Optional[int] = 100, offset: Optional[int] = 0
+    ) -> List[Asset]:
+        """
+        Get one page of the asset listing, ordered by rank.
+
+        Args:
+            limit (Optional[int]): Number of results to return (default is 100)
+            offset (Optional[int]): Number of results to skip (default is 0)
+
+        Returns:
+            List[Asset]: List of assets
+        """
+        try:
+            params = {"limit": limit, "offset": offset}
+            response = await self._make_request("GET", "/assets", params=params)
+            with metrics.span("validate", endpoint="/assets"):
+                asset_response = AssetResponse.model_validate(response)
+            return asset_response.data
+        except Exception as e:
+            logger.error("Failed to get assets", offset=offset, error=str(e))
+            raise
+
+    async def get_all_assets(
+        self,
+        offset: int = 0,
+        page_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[List[Asset]]:
+        """
+        Fetch the whole asset listing, following pagination to the end.
+
+        Pages are yielded as they arrive, not in rank order; see _all_pages.
+
+        Args:
+            offset (int): Number of results to skip (default is 0)
+            page_size (Optional[int]): Assets requested per page
+            max_concurrency (Optional[int]): Pages in flight at once
+
+        Yields:
+            List[Asset]: One page of assets
+        """
+
+        def fetch(limit: int, page_offset: int) -> Awaitable[List[Asset]]:
+            return self.get_assets(limit=limit, offset=page_offset)
+
+        async for page in self._all_pages(
+            fetch,
+            offset,
+            page_size or self.ASSETS_PAGE_SIZE,
+            max_concurrency or self.ASSETS_CONCURRENCY,
+        ):
+            yield page
+
+    async def _all_pages(
+        self,
+        fetch: Callable[[int, int], Awaitable[list]],
+        offset: int,
+        limit: int,
+        max_concurrency: int,
+    ) -> AsyncIterator[list]:
+        """
+        Follow offset pagination of an endpoint that reports no total.
+
+        The first page is fetched alone; if it is full, following pages are
+        requested concurrently (bounded by ``max_concurrency`` and the client's
+        rate limit) until a short page marks the end.
+
+        Args:
+            fetch: Coroutine function taking (limit, offset) and returning a page
+            offset: Offset of the first page
+            limit: Items requested per page
+            max_concurrency: Pages in flight at once
+
+        Yields:
+            list: One non-empty page, in completion order
+        """
+        first = await fetch(limit, offset)
+        if first:
+            yield first
+        if len(first) < limit:
+            return
+
+        pending: Dict[asyncio.Task, int] = {}
+        next_offset = offset + limit
+        end: Optional[int] = None  # offset of the first short page
+
+        def schedule() -> None:
+            nonlocal next_offset
+            task = asyncio.create_task(fetch(limit, next_offset))
+            pending[task] = next_offset
+            next_offset += limit
+
+        try:
+            for _ in range(max_concurrency):
+                schedule()
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    page_offset = pending.pop(task)
+                    page = task.result()
+                    if len(page) < limit:
+                        end = page_offset if end is None else min(end, page_offset)
+                    elif end is None:
+                        schedule()
+                    if page:
+                        yield page
+                # Pages past the end can only come back empty
+                for task, page_offset in list(pending.items()):
+                    if end is not None and page_offset > end:
+                        task.cancel()
+                        del pending[task]
+        finally:
+            for task in pending:
+                task.cancel()
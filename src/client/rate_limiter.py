@@ -0,0 +1,110 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket shared by every coroutine using one client.
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``. Callers
+    wait in FIFO order when the bucket is empty, and a server-imposed pause
+    (e.g. from ``Retry-After``) blocks every caller until it expires.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate (float): Sustained requests per second
+            burst (int): Maximum number of requests allowed back to back
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.throttled_seconds = 0.0
+        self.throttled_requests = 0
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated:
+            # Still paused: tokens only accrue once the pause is over
+            return
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting if needed.
+
+        Returns:
+            float: Seconds spent waiting for the token
+        """
+        async with self._lock:
+            waited = 0.0
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = max(self._paused_until - now, 0.0)
+                if not delay and self._tokens < 1:
+                    delay = (1 - self._tokens) / self.rate
+                if not delay:
+                    break
+                await asyncio.sleep(delay)
+                waited += delay
+            self._tokens -= 1
+            if waited:
+                self.throttled_seconds += waited
+                self.throttled_requests += 1
+            return waited
+
+    def pause(self, seconds: float) -> None:
+        """
+        Block all callers for ``seconds`` and drop any accumulated burst.
+
+        Tokens start refilling when the pause ends, so the first requests
+        after it are paced at ``rate`` instead of firing as a burst.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = min(self._tokens, 0.0)
+        self._updated = self._paused_until
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header given either as seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing/invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given zero-based attempt."""
+    return random.uniform(0, min(cap, base * (2**attempt)))
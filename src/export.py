@@ -0,0 +1,346 @@
+import argparse
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Context, Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import BigInteger, DateTime, Integer, Numeric, Table, select
+from sqlalchemy.engine import Connection, Engine
+
+from src.model.sql_models import AssetHistory, MarketChange, MarketCurrent
+from src.util.logger import logger
+
+EXPORT_STATE_FILE = "_export_state.json"
+# Change timestamps are stamped by the writers before they commit, so a slow
+# ingest can commit rows older than the saved watermark; incremental exports
+# look back this far and rewrite the overlapping partitions again
+EXPORT_OVERLAP = timedelta(seconds=float(os.getenv("EXPORT_OVERLAP_SECONDS", "600")))
+
+
+class Export(NamedTuple):
+    table: Table
+    # Column naming the asset of each row, the first partition level
+    partition_column: str
+    # Column whose month is the second partition level; None keeps one
+    # partition per asset, for tables whose rows change in place
+    month_column: Optional[str]
+    # Column set when a row is inserted or rewritten by an upsert
+    changed_column: str
+
+
+EXPORTS = {
+    "asset_history": Export(AssetHistory.__table__, "asset_id", "date", "created_at"),
+    "markets_current": Export(MarketCurrent.__table__, "base_id", None, "updated_at"),
+    "market_changes": Export(
+        MarketChange.__table__, "base_id", "created_at", "created_at"
+    ),
+}
+
+# Precision/scale used for Numeric columns declared without them
+DEFAULT_DECIMAL = (38, 18)
+_DECIMAL_CONTEXT = Context(prec=DEFAULT_DECIMAL[0])
+
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export requires pyarrow; install it with `poetry install -E export`"
+        ) from e
+    return pyarrow
+
+
+def arrow_schema(table: Table, exclude: List[str]) -> Any:
+    """Map a SQLAlchemy table to a pyarrow schema, keeping decimals exact."""
+    pa = _require_pyarrow()
+    fields = []
+    for column in table.columns:
+        if column.name in exclude:
+            continue
+        if isinstance(column.type, Numeric):
+            precision = column.type.precision or DEFAULT_DECIMAL[0]
+            scale = column.type.scale
+            if scale is None:
+                scale = DEFAULT_DECIMAL[1]
+            arrow_type = pa.decimal128(precision, scale)
+        elif isinstance(column.type, (BigInteger, Integer)):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+
+def _column_values(values: List[Any], arrow_type: Any) -> List[Any]:
+    """Quantize decimals to the column scale so pyarrow never has to round."""
+    pa = _require_pyarrow()
+    if not pa.types.is_decimal(arrow_type):
+        return values
+    exponent = Decimal(1).scaleb(-arrow_type.scale)
+    return [
+        (
+            None
+            if value is None
+            else Decimal(str(value)).quantize(exponent, context=_DECIMAL_CONTEXT)
+        )
+        for value in values
+    ]
+
+
+def load_state(output_dir: Path) -> Dict[str, str]:
+    path = output_dir / EXPORT_STATE_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_state(output_dir: Path, state: Dict[str, str]) -> None:
+    path = output_dir / EXPORT_STATE_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+Partition = Tuple[str, Optional[str]]  # (asset, "YYYY-MM" or None)
+
+
+def _month(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+
+def _next_month(value: datetime) -> datetime:
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _partition(spec: Export, row: Any) -> Partition:
+    month = _month(row[spec.month_column]) if spec.month_column else None
+    return row[spec.partition_column], month
+
+
+def _partition_dir(output_dir: Path, name: str, spec: Export, key: Partition) -> Path:
+    asset_id, month = key
+    directory = (
+        output_dir / name / f"{spec.partition_column}={quote(asset_id, safe='')}"
+    )
+    return directory / f"month={month}" if month else directory
+
+
+def changed_partitions(
+    connection: Connection, spec: Export, since: datetime
+) -> Tuple[Set[Partition], Optional[datetime]]:
+    """
+    Partitions holding rows inserted or rewritten after ``since``.
+
+    Returns:
+        Tuple[Set[Partition], Optional[datetime]]: The partitions and the
+        latest change seen, None if nothing changed
+    """
+    table = spec.table
+    columns = [table.c[spec.partition_column], table.c[spec.changed_column]]
+    if spec.month_column:
+        columns.append(table.c[spec.month_column])
+    query = select(*columns).where(table.c[spec.changed_column] > since)
+    partitions: Set[Partition] = set()
+    latest = None
+    for row in connection.execution_options(stream_results=True).execute(query):
+        row = row._mapping
+        partitions.add(_partition(spec, row))
+        if latest is None or row[spec.changed_column] > latest:
+            latest = row[spec.changed_column]
+    return partitions, latest
+
+
+def _partition_rows(
+    connection: Connection,
+    spec: Export,
+    partitions: Optional[Set[Partition]],
+    chunk_size: int,
+) -> Iterator[List[Any]]:
+    """
+    Stream the rows of ``partitions`` (every row when None) in chunks.
+
+    Every partition is read whole, one query per asset bounded to the
+    asset's changed months, so rewritten partitions replace the old ones.
+    """
+    table = spec.table
+    order = [table.c[spec.partition_column]]
+    if spec.month_column:
+        order.append(table.c[spec.month_column])
+    if partitions is None:
+        queries = [select(table).order_by(*order)]
+    else:
+        months: Dict[str, List[str]] = defaultdict(list)
+        for asset_id, month in partitions:
+            months[asset_id].append(month)
+        queries = []
+        for asset_id in sorted(months):
+            query = select(table).where(table.c[spec.partition_column] == asset_id)
+            if spec.month_column:
+                column = table.c[spec.month_column]
+                first = datetime.strptime(min(months[asset_id]), "%Y-%m")
+                last = datetime.strptime(max(months[asset_id]), "%Y-%m")
+                query = query.where(column >= first, column < _next_month(last))
+            queries.append(query.order_by(*order))
+
+    for query in queries:
+        result = (
+            connection.execution_options(stream_results=True, yield_per=chunk_size)
+            .execute(query)
+            .mappings()
+        )
+        for rows in result.partitions():
+            if partitions is not None:
+                rows = [row for row in rows if _partition(spec, row) in partitions]
+            if rows:
+                yield rows
+
+
+def export_table(
+    engine: Engine,
+    name: str,
+    output_dir: Path,
+    since: Optional[datetime] = None,
+    chunk_size: int = 50_000,
+    overlap: timedelta = EXPORT_OVERLAP,
+) -> Optional[datetime]:
+    """
+    Stream one table into Parquet files partitioned by asset (and month).
+
+    Rows are read through a server-side cursor in ``chunk_size`` batches and
+    each batch is written as one file per partition it touches, under
+    ``<output_dir>/<table>/<asset column>=<id>[/month=<YYYY-MM>]/``.
+
+    With ``since``, only partitions holding rows inserted or rewritten after
+    it are exported, each one whole: upserts rewrite rows in place, so
+    appending just the changed rows would leave their old versions in the
+    earlier files. Rows changed up to ``overlap`` before ``since`` count as
+    changed too, so rows committed after the last run with an earlier stamp
+    are not missed; rewriting their partitions again is harmless. Files written before this run are removed from every
+    exported partition (from the whole table on a full export) once the new
+    ones are in place, so readers never see duplicate rows.
+
+    Args:
+        engine: Database engine
+        name: Table name, one of EXPORTS
+        output_dir: Root directory of the export
+        since: Only export partitions changed after this timestamp
+        chunk_size: Rows fetched and written per batch
+        overlap: How far before ``since`` to look for late-committed changes
+
+    Returns:
+        Optional[datetime]: Latest change exported, or None if nothing was new
+    """
+    pa = _require_pyarrow()
+    spec = EXPORTS[name]
+    schema = arrow_schema(spec.table, exclude=[spec.partition_column])
+    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+
+    latest = None
+    exported = 0
+    written: Set[Path] = set()
+    with engine.connect() as connection:
+        partitions = None
+        if since is not None:
+            partitions, latest = changed_partitions(connection, spec, since - overlap)
+            if not partitions:
+                logger.info("Exported table to Parquet", table=name, rows=0)
+                return None
+
+        chunks = _partition_rows(connection, spec, partitions, chunk_size)
+        for part, rows in enumerate(chunks):
+            grouped: Dict[Partition, List[Any]] = defaultdict(list)
+            for row in rows:
+                grouped[_partition(spec, row)].append(row)
+                if since is None and (
+                    latest is None or row[spec.changed_column] > latest
+                ):
+                    latest = row[spec.changed_column]
+
+            for key, partition_rows in grouped.items():
+                columns = {
+                    field.name: _column_values(
+                        [row[field.name] for row in partition_rows], field.type
+                    )
+                    for field in schema
+                }
+                directory = _partition_dir(output_dir, name, spec, key)
+                directory.mkdir(parents=True, exist_ok=True)
+                path = directory / f"part-{run_id}-{part:05d}.parquet"
+                pa.parquet.write_table(
+                    pa.Table.from_pydict(columns, schema=schema), path
+                )
+                written.add(path)
+            exported += len(rows)
+
+    if partitions is None:
+        stale = (output_dir / name).rglob("*.parquet")
+    else:
+        directories = {
+            _partition_dir(output_dir, name, spec, key) for key in partitions
+        }
+        stale = (path for d in directories for path in d.glob("*.parquet"))
+    for path in list(stale):
+        if path not in written:
+            path.unlink()
+
+    logger.info("Exported table to Parquet", table=name, rows=exported)
+    return latest
+
+
+def export(
+    engine: Engine,
+    output_dir: Path,
+    tables: Optional[List[str]] = None,
+    full: bool = False,
+    chunk_size: int = 50_000,
+    overlap: timedelta = EXPORT_OVERLAP,
+) -> None:
+    """
+    Export tables to Parquet, rewriting only partitions changed since the last run.
+
+    Args:
+        engine: Database engine
+        output_dir: Root directory of the export
+        tables: Tables to export (defaults to all of EXPORTS)
+        full: Ignore the saved state and export every row
+        chunk_size: Rows fetched and written per batch
+        overlap: How far before the saved state to look for late-committed changes
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state = {} if full else load_state(output_dir)
+    for name in tables or list(EXPORTS):
+        since = datetime.fromisoformat(state[name]) if name in state else None
+        latest = export_table(
+            engine,
+            name,
+            output_dir,
+            since=since,
+            chunk_size=chunk_size,
+            overlap=overlap,
+        )
+        # Rows found only through the overlap must not move the state back
+        if latest is not None and (since is None or latest > since):
+            state[name] = latest.isoformat()
+            save_state(output_dir, state)
+
+
+if __name__ == "__main__":
+    from src.util.db import engine
+
+    parser = argparse.ArgumentParser(description="Export tables to Parquet")
+    parser.add_argument("--output", type=Path, default=Path("exports"))
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORTS), default=None)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument(
+        "--full", action="store_true", help="Ignore the incremental export state"
+    )
+    args = parser.parse_args()
+    export(engine, args.output, args.tables, args.full, args.chunk_size)
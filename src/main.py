@@ -1,17 +1,23 @@
 import asyncio
 import os
 from datetime import datetime
-from typing import List
-
-from dotenv import load_dotenv
+from typing import List, Optional
 
 from src.client.coincap_client import CoinCapClient
-from src.model.sql_models import Base
+from src.migrations import migrate
 from src.service.crypto_service import CryptoService
-from src.util.db import engine, get_db
+from src.service.pipeline import IngestionPipeline
+from src.service.price_index import LatestPriceIndex
+from src.service.universe import UniversePlanner
+from src.util.db import (
+    get_async_engine,
+    get_async_session_factory,
+    get_db,
+    get_engine,
+    get_session_factory,
+)
 from src.util.logger import logger
-
-load_dotenv()
+from src.util.metrics import metrics, start_from_env
 
 
 async def main(
@@ -19,37 +25,104 @@ async def main(
     start_date: datetime = None,
     ingest_history: bool = True,
     ingest_market: bool = True,
-    market_limit: int = 100,
+    market_limit: Optional[int] = 100,
     market_offset: int = 0,
+    max_workers: int = 1,
+    interval: str = "d1",
+    rollup_intervals: List[str] = None,
+    use_pipeline: bool = False,
+    client: Optional[CoinCapClient] = None,
+    universe_size: Optional[int] = None,
+    universe_by: str = "rank",
+    price_index: Optional[LatestPriceIndex] = None,
+    async_writes: bool = False,
 ):
     """
     Main function to ingest cryptocurrency data.
 
     Args:
-        asset_ids: List of asset IDs to fetch data for. If None, defaults to ['bitcoin']
+        asset_ids: List of asset IDs to fetch data for. If None, defaults to the
+            discovered universe when universe_size is set, else ['bitcoin']
         start_date: Optional start date for historical data
         ingest_history: Whether to ingest price history data
         ingest_market: Whether to ingest market data
-        market_limit: Number of market results to return (default is 100)
+        market_limit: Number of market results to return (default is 100);
+            None fetches every page
         market_offset: Number of market results to skip (default is 0)
+        max_workers: Number of assets ingested concurrently (default is 1)
+        interval: History interval fetched from the API (default is d1)
+        rollup_intervals: Coarser intervals computed locally from the fetched one
+        use_pipeline: Run the staged fetch/transform/write pipeline, overlapping
+            network and database I/O (max_workers sets the fetcher count)
+        client: Client to use instead of one built from COINCAP_API_KEY, e.g.
+            one with a custom transport; it is closed when ingestion ends
+        universe_size: Discover the top N assets from the CoinCap listing and
+            ingest them, most liquid first, instead of a fixed list
+        universe_by: Ordering of the discovered universe: "rank", "market_cap"
+            or "volume"
+        price_index: LatestPriceIndex kept current with every ingestion commit,
+            for services embedding the ingestion
+        async_writes: Write fetched history and market pages through the async
+            engine (requires `poetry install -E async`), so commits do not block
+            the event loop; ignored by the pipeline, which writes in a thread
     """
-    if asset_ids is None:
+    if asset_ids is None and not universe_size:
         asset_ids = ["bitcoin"]
 
-    # Initialize database
-    Base.metadata.create_all(engine)
+    # Fail on bad rollup intervals before touching the database or the API
+    CryptoService.check_rollups(interval, rollup_intervals or [])
+
+    # Apply pending schema migrations (a single query when up to date)
+    migrate(get_engine())
+    metrics_server = start_from_env()
 
     # Get database session
     db = next(get_db())
 
     try:
         # Initialize service and client
-        crypto_service = CryptoService(db)
-        async with CoinCapClient(
-            os.getenv(
-                "COINCAP_API_KEY",
+        crypto_service = CryptoService(
+            db,
+            session_factory=get_session_factory(),
+            price_index=price_index,
+            async_session_factory=(
+                get_async_session_factory() if async_writes else None
+            ),
+        )
+        if client is None:
+            client = CoinCapClient(
+                os.getenv(
+                    "COINCAP_API_KEY",
+                )
             )
-        ) as client:
+        async with client:
+            if asset_ids is None:
+                planner = UniversePlanner(db, size=universe_size, by=universe_by)
+                asset_ids = await planner.discover(client)
+
+            if use_pipeline:
+                pipeline = IngestionPipeline(
+                    get_session_factory(),
+                    fetch_workers=max_workers,
+                    price_index=price_index,
+                )
+                await pipeline.run(
+                    client,
+                    asset_ids,
+                    start_date,
+                    interval=interval,
+                    ingest_history=ingest_history,
+                    ingest_market=ingest_market,
+                    market_limit=market_limit,
+                    market_offset=market_offset,
+                )
+                for asset_id in asset_ids:
+                    for target_interval in rollup_intervals or []:
+                        crypto_service.rollup_history(
+                            asset_id, interval, target_interval
+                        )
+                return
+
             # Ingest data for all specified assets
             await crypto_service.ingest_multiple_assets(
                 client,
@@ -59,6 +132,9 @@ async def main(
                 ingest_market=ingest_market,
                 market_limit=market_limit,
                 market_offset=market_offset,
+                max_workers=max_workers,
+                interval=interval,
+                rollup_intervals=rollup_intervals,
             )
 
     except Exception as e:
@@ -66,6 +142,12 @@ async def main(
         raise
     finally:
         db.close()
+        if async_writes:
+            await get_async_engine().dispose()
+        if os.getenv("METRICS_FILE"):
+            metrics.dump(os.environ["METRICS_FILE"])
+        if metrics_server:
+            metrics_server.shutdown()
 
 
 if __name__ == "__main__":
@@ -81,6 +163,29 @@ if __name__ == "__main__":
     # start_date = datetime(2024, 1, 1)
     # asyncio.run(main(assets, start_date, ingest_market=False))
 
-    # 3. Ingest only market data with pagination
+    # 3. Ingest many assets with 8 concurrent workers
+    # assets = ["bitcoin", "ethereum", "cardano", "solana", "ripple"]
+    # asyncio.run(main(assets, start_date, max_workers=8))
+
+    # 4. Ingest hourly history and derive daily prices locally
+    # assets = ["bitcoin"]
+    # asyncio.run(main(assets, start_date, interval="h1", rollup_intervals=["d1"]))
+
+    # 5. Overlap fetching and database writes with the staged pipeline
+    # assets = ["bitcoin", "ethereum", "cardano"]
+    # asyncio.run(main(assets, start_date, max_workers=4, use_pipeline=True))
+
+    # 6. Ingest only market data with pagination
     # assets = ["bitcoin"]
     # asyncio.run(main(assets, ingest_history=False, market_limit=50, market_offset=0))
+
+    # 7. Ingest every market of each asset, fetching pages concurrently
+    # assets = ["bitcoin"]
+    # asyncio.run(main(assets, ingest_history=False, market_limit=None))
+
+    # 8. Write pages through the async engine instead of blocking the event loop
+    # assets = ["bitcoin", "ethereum", "cardano"]
+    # asyncio.run(main(assets, start_date, max_workers=4, async_writes=True))
+
+    # 9. Discover the 500 most traded assets and ingest them, most liquid first
+    # asyncio.run(main(universe_size=500, universe_by="volume", max_workers=8))
@@ -0,0 +1,189 @@
+import argparse
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import BigInteger, insert, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from src.model.sql_models import AssetHistory, Base, SchemaVersion
+from src.util.logger import logger
+
+# pg_advisory_xact_lock key serializing concurrent migration runs
+MIGRATION_LOCK_ID = 0x636F696E
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_tables(*names: str) -> Callable[[Connection], None]:
+    """Upgrade step creating tables from the models, skipping existing ones."""
+
+    def upgrade(connection: Connection) -> None:
+        tables = [Base.metadata.tables[name] for name in names]
+        Base.metadata.create_all(connection, tables=tables, checkfirst=True)
+
+    return upgrade
+
+
+def _create_indexes(*names: str) -> Callable[[Connection], None]:
+    """Upgrade step creating the models' indexes, skipping existing ones."""
+
+    def upgrade(connection: Connection) -> None:
+        for name in names:
+            # ddl_if keeps PostgreSQL-only indexes off other dialects
+            for index in Base.metadata.tables[name].indexes:
+                index.create(connection, checkfirst=True)
+
+    return upgrade
+
+
+def _upgrade_asset_history(connection: Connection) -> None:
+    """
+    Upgrade asset_history from its pre-interval shape.
+
+    Tables created before history was stored per interval have no
+    ``interval`` column, a (asset_id, date) primary key and a 32-bit ``time``.
+    Existing rows are d1 history. PostgreSQL alters the table in place;
+    SQLite cannot change a primary key, so the table is rebuilt.
+    """
+    table = AssetHistory.__tablename__
+    columns = {c["name"]: c["type"] for c in inspect(connection).get_columns(table)}
+    if connection.dialect.name != "postgresql":
+        if "interval" in columns:
+            return
+        legacy = f"{table}_legacy"
+        connection.execute(text(f'ALTER TABLE "{table}" RENAME TO "{legacy}"'))
+        AssetHistory.__table__.create(connection)
+        connection.execute(
+            text(
+                f'INSERT INTO "{table}" '
+                '(asset_id, "interval", price_usd, date, "time", created_at) '
+                "SELECT asset_id, 'd1', price_usd, date, \"time\", created_at "
+                f'FROM "{legacy}"'
+            )
+        )
+        connection.execute(text(f'DROP TABLE "{legacy}"'))
+        return
+
+    if "interval" not in columns:
+        pkey = AssetHistory.__table__.primary_key
+        key = ", ".join(f'"{c.name}"' for c in pkey.columns)
+        connection.execute(
+            text(
+                f'ALTER TABLE "{table}" '
+                "ADD COLUMN \"interval\" VARCHAR NOT NULL DEFAULT 'd1'"
+            )
+        )
+        connection.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{pkey.name}"'))
+        connection.execute(
+            text(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{pkey.name}" PRIMARY KEY ({key})'
+            )
+        )
+    if not isinstance(columns["time"], BigInteger):
+        connection.execute(
+            text(f'ALTER TABLE "{table}" ALTER COLUMN "time" TYPE BIGINT')
+        )
+
+
+# Append new migrations here; applied versions are never edited
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "baseline schema",
+        _create_tables(
+            "asset_history",
+            "markets",
+            "markets_current",
+            "market_changes",
+            "ingestion_state",
+            "asset_leases",
+            "assets",
+        ),
+    ),
+    Migration(
+        2,
+        "asset_history interval key and BIGINT time",
+        _upgrade_asset_history,
+    ),
+    Migration(
+        3,
+        "covering and BRIN time indexes",
+        _create_indexes("asset_history", "markets", "market_changes"),
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+_VERSION_QUERY = text(f"SELECT max(version) FROM {SchemaVersion.__tablename__}")
+
+
+def current_version(connection: Connection) -> int:
+    """Latest applied migration, 0 for a database that was never migrated."""
+    try:
+        # Plain SQL: a cold process would otherwise pay for compiling a select()
+        version = connection.execute(_VERSION_QUERY).scalar_one()
+    except DBAPIError:
+        # No schema_version table yet; the caller's transaction is discarded
+        return 0
+    return version or 0
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> int:
+    """
+    Bring the schema up to ``target`` (default: the latest migration).
+
+    An up-to-date database costs a single query, so this can run at the start
+    of every invocation instead of ``create_all``, which reflects every table.
+    Pending migrations run in one transaction, serialized across processes by
+    an advisory lock on PostgreSQL. Databases created earlier with
+    ``create_all`` are adopted: the baseline skips tables that already exist
+    and version 2 upgrades an asset_history created before intervals.
+
+    Args:
+        engine: Database engine
+        target: Version to stop at
+
+    Returns:
+        int: Number of migrations applied
+    """
+    target = LATEST_VERSION if target is None else target
+    with engine.connect() as connection:
+        if current_version(connection) >= target:
+            return 0
+
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_ID}
+            )
+        SchemaVersion.__table__.create(connection, checkfirst=True)
+        # Another process may have migrated while we waited for the lock
+        current = current_version(connection)
+        pending = [m for m in MIGRATIONS if current < m.version <= target]
+        for migration in pending:
+            logger.info(
+                "Applying schema migration",
+                version=migration.version,
+                description=migration.description,
+            )
+            migration.upgrade(connection)
+            connection.execute(
+                insert(SchemaVersion).values(
+                    version=migration.version, description=migration.description
+                )
+            )
+    return len(pending)
+
+
+if __name__ == "__main__":
+    from src.util.db import get_engine
+
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument("--target", type=int, default=None)
+    args = parser.parse_args()
+    applied = migrate(get_engine(), args.target)
+    logger.info("Schema is up to date", applied=applied, target=args.target)
@@ -1,8 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import Annotated, List, Optional, TypedDict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class TimeStampedModel(BaseModel):
@@ -26,6 +26,21 @@ class AssetHistory(TimeStampedModel):
     date: datetime = Field(..., description="Date of the price data")
 
 
+class HistoryPoint(TypedDict):
+    """
+    Lightweight history point for the batch validation fast path.
+
+    Validated as plain dicts through ``HistoryPointsAdapter`` instead of one
+    pydantic model per row; ``date`` is not parsed since it is derived from ``time``.
+    """
+
+    price_usd: Annotated[Decimal, Field(alias="priceUsd")]
+    time: int
+
+
+HistoryPointsAdapter = TypeAdapter(List[HistoryPoint])
+
+
 class Market(TimeStampedModel):
     """
     Represents a cryptocurrency market (trading pair).
@@ -66,6 +81,55 @@ class Market(TimeStampedModel):
     )
 
 
+class Asset(TimeStampedModel):
+    """
+    Represents a cryptocurrency asset from the assets listing.
+    {
+            "id": "bitcoin",
+            "rank": "1",
+            "symbol": "BTC",
+            "name": "Bitcoin",
+            "supply": "19864328.0000000000000000",
+            "maxSupply": "21000000.0000000000000000",
+            "marketCapUsd": "1876233416024.5625563016000000",
+            "volumeUsd24Hr": "20437405455.4069546396549432",
+            "priceUsd": "94451.8627813741389000",
+            "changePercent24Hr": "0.2911843526563546"
+        }
+    """
+
+    id: str = Field(..., description="ID of the asset")
+    rank: int = Field(..., description="Rank of the asset by market cap")
+    symbol: str = Field(..., description="Symbol of the asset")
+    name: str = Field(..., description="Name of the asset")
+    supply: Optional[Decimal] = Field(None, description="Circulating supply")
+    max_supply: Optional[Decimal] = Field(
+        None, alias="maxSupply", description="Maximum supply, if capped"
+    )
+    market_cap_usd: Optional[Decimal] = Field(
+        None, alias="marketCapUsd", description="Market cap of the asset in USD"
+    )
+    volume_usd_24h: Optional[Decimal] = Field(
+        None,
+        alias="volumeUsd24Hr",
+        description="Volume in USD of the asset in the last 24 hours",
+    )
+    price_usd: Optional[Decimal] = Field(
+        None, alias="priceUsd", description="Current price of the asset in USD"
+    )
+    change_percent_24h: Optional[Decimal] = Field(
+        None,
+        alias="changePercent24Hr",
+        description="Price change in the last 24 hours, in percent",
+    )
+
+
+class AssetResponse(BaseModel):
+    """Response model for assets endpoint"""
+
+    data: List[Asset]
+
+
 class AssetHistoryResponse(BaseModel):
     """Response model for asset history endpoint"""
 
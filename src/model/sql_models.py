@@ -1,23 +1,63 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, Numeric, PrimaryKeyConstraint, String
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    Numeric,
+    PrimaryKeyConstraint,
+    String,
+)
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
 
+def brin_index(table: str, column: str) -> Index:
+    """
+    BRIN index on an append-mostly time column, created on PostgreSQL only.
+
+    A few pages per block range instead of one entry per row: cheap to keep up
+    on very large tables whose physical order follows the column.
+    """
+    return Index(f"brin_{table}_{column}", column, postgresql_using="brin").ddl_if(
+        dialect="postgresql"
+    )
+
+
 class AssetHistory(Base):
     """SQLAlchemy model for asset price history."""
 
     __tablename__ = "asset_history"
     __table_args__ = (
-        PrimaryKeyConstraint("asset_id", "date", name="asset_history_pkey"),
+        PrimaryKeyConstraint("asset_id", "interval", "date", name="asset_history_pkey"),
+        # Time series reads (TimeSeriesRepository) filter on the epoch column
+        Index(
+            "ix_asset_history_series",
+            "asset_id",
+            "interval",
+            "time",
+            postgresql_include=["price_usd"],
+        ),
+        # Cross sections: every asset's price on a date
+        Index(
+            "ix_asset_history_date",
+            "interval",
+            "date",
+            "asset_id",
+            postgresql_include=["price_usd"],
+        ),
+        # Incremental exports read rows created since the last run
+        brin_index("asset_history", "created_at"),
     )
 
     asset_id = Column(String, nullable=False)
+    interval = Column(String, nullable=False, default="d1")
     price_usd = Column(Numeric(20, 8), nullable=False)
     date = Column(DateTime, nullable=False)
-    time = Column(Integer, nullable=False)
+    time = Column(BigInteger, nullable=False)
     created_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
@@ -31,6 +71,9 @@ class Market(Base):
         PrimaryKeyConstraint(
             "base_id", "quote_id", "exchange_id", "created_at", name="markets_pkey"
         ),
+        # The primary key already serves "latest snapshot per pair" (it leads
+        # with the pair and ends with created_at); time-range scans use BRIN
+        brin_index("markets", "created_at"),
     )
 
     exchange_id = Column(String, nullable=False)
@@ -42,3 +85,120 @@ class Market(Base):
     price_usd = Column(Numeric, nullable=False)
     volume_percent = Column(Numeric, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class MarketCurrent(Base):
+    """SQLAlchemy model for the latest state of each market."""
+
+    __tablename__ = "markets_current"
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "base_id", "quote_id", "exchange_id", name="markets_current_pkey"
+        ),
+    )
+
+    exchange_id = Column(String, nullable=False)
+    base_id = Column(String, nullable=False)
+    quote_id = Column(String, nullable=False)
+    base_symbol = Column(String, nullable=False)
+    quote_symbol = Column(String, nullable=False)
+    volume_usd_24h = Column(Numeric, nullable=False)
+    price_usd = Column(Numeric, nullable=False)
+    volume_percent = Column(Numeric, nullable=False)
+    # created_at of the market_changes row the change threshold is measured from
+    changed_at = Column(DateTime, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+
+class MarketChange(Base):
+    """SQLAlchemy model for market snapshots recorded when a market moves."""
+
+    __tablename__ = "market_changes"
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "base_id",
+            "quote_id",
+            "exchange_id",
+            "created_at",
+            name="market_changes_pkey",
+        ),
+        brin_index("market_changes", "created_at"),
+    )
+
+    exchange_id = Column(String, nullable=False)
+    base_id = Column(String, nullable=False)
+    quote_id = Column(String, nullable=False)
+    volume_usd_24h = Column(Numeric, nullable=False)
+    price_usd = Column(Numeric, nullable=False)
+    volume_percent = Column(Numeric, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class Asset(Base):
+    """SQLAlchemy model for the latest listing of each known asset."""
+
+    __tablename__ = "assets"
+    __table_args__ = (PrimaryKeyConstraint("id", name="assets_pkey"),)
+
+    id = Column(String, nullable=False)
+    rank = Column(Integer, nullable=False)
+    symbol = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    supply = Column(Numeric, nullable=True)
+    max_supply = Column(Numeric, nullable=True)
+    market_cap_usd = Column(Numeric, nullable=True)
+    volume_usd_24h = Column(Numeric, nullable=True)
+    price_usd = Column(Numeric, nullable=True)
+    change_percent_24h = Column(Numeric, nullable=True)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+
+class IngestionState(Base):
+    """SQLAlchemy model for per-asset incremental ingestion watermarks."""
+
+    __tablename__ = "ingestion_state"
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "asset_id", "dataset", "interval", name="ingestion_state_pkey"
+        ),
+    )
+
+    asset_id = Column(String, nullable=False)
+    dataset = Column(String, nullable=False)
+    interval = Column(String, nullable=False)
+    last_timestamp = Column(DateTime, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+
+class AssetLease(Base):
+    """SQLAlchemy model for asset work units leased to ingestion workers."""
+
+    __tablename__ = "asset_leases"
+    __table_args__ = (PrimaryKeyConstraint("asset_id", name="asset_leases_pkey"),)
+
+    asset_id = Column(String, nullable=False)
+    owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+
+class SchemaVersion(Base):
+    """SQLAlchemy model for the schema migrations applied to the database."""
+
+    __tablename__ = "schema_version"
+    __table_args__ = (PrimaryKeyConstraint("version", name="schema_version_pkey"),)
+
+    version = Column(Integer, nullable=False, autoincrement=False)
+    description = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,196 @@
+import argparse
+import os
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from src.model.sql_models import Base
+from src.util.logger import logger
+
+# Partitioned table -> range partition column (PostgreSQL only)
+PARTITIONED_TABLES = {
+    "asset_history": "date",
+    "markets": "created_at",
+    "market_changes": "created_at",
+}
+
+# Monthly partitions kept ready past the current month
+MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+
+def _month(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months(start: date, end: date) -> Iterator[date]:
+    """First day of every month from ``start``'s month to ``end``'s, inclusive."""
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        yield month
+        month = _next_month(month)
+
+
+def horizon(months_ahead: int) -> date:
+    """First day of the month ``months_ahead`` months after the current one."""
+    month = _month(datetime.utcnow())
+    for _ in range(months_ahead):
+        month = _next_month(month)
+    return month
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    query = text(
+        "SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+    )
+    return connection.execute(query, {"table": table}).first() is not None
+
+
+def create_partitions(
+    connection: Connection, table: str, start: date, end: date
+) -> List[str]:
+    """
+    Create the monthly partitions of ``table`` covering ``start``..``end``.
+
+    A DEFAULT partition catches rows outside every monthly range so inserts
+    never fail; keep it empty by creating partitions ahead of time, since a
+    month cannot be added while the default partition holds rows for it.
+
+    Returns:
+        List[str]: Partitions that did not exist yet
+    """
+    existing = set(
+        connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ),
+            {"table": table},
+        ).scalars()
+    )
+    created = []
+    for month in months(start, end):
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        connection.execute(
+            text(
+                f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+            )
+        )
+        created.append(name)
+    if f"{table}_default" not in existing:
+        connection.execute(
+            text(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+        )
+    return created
+
+
+def convert_table(connection: Connection, table: str, end: date) -> int:
+    """
+    Rebuild an existing table as a monthly range-partitioned table.
+
+    The rows are copied into partitions covering their months, the old table
+    is dropped and the model's indexes are recreated on the partitioned
+    parent, which propagates them to every partition. Runs inside the
+    caller's transaction and locks the table until it commits.
+
+    Returns:
+        int: Rows copied
+    """
+    column = PARTITIONED_TABLES[table]
+    old = f"{table}_unpartitioned"
+    pkey = Base.metadata.tables[table].primary_key
+    key = ", ".join(f'"{c.name}"' for c in pkey.columns)
+
+    connection.execute(text(f'ALTER TABLE "{table}" RENAME TO "{old}"'))
+    connection.execute(
+        text(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{pkey.name}" TO "{old}_pkey"')
+    )
+    connection.execute(
+        text(
+            f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ("{column}")'
+        )
+    )
+    connection.execute(
+        text(f'ALTER TABLE "{table}" ADD CONSTRAINT "{pkey.name}" PRIMARY KEY ({key})')
+    )
+
+    oldest = connection.execute(text(f'SELECT min("{column}") FROM "{old}"')).scalar()
+    create_partitions(connection, table, _month(oldest or datetime.utcnow()), end)
+
+    copied = connection.execute(
+        text(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    ).rowcount
+    connection.execute(text(f'DROP TABLE "{old}"'))
+    for index in Base.metadata.tables[table].indexes:
+        index.create(connection)
+    return copied
+
+
+def ensure_partitions(
+    engine: Engine, convert: bool = False, months_ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Keep monthly partitions ready for the coming months.
+
+    Meant to run from cron (``make partitions``) well before a month starts.
+    Tables that are not partitioned are left alone unless ``convert`` is set,
+    which rebuilds them as partitioned tables once. No-op on other dialects.
+
+    Args:
+        engine: Database engine
+        convert: Partition tables that are not partitioned yet
+        months_ahead: Months past the current one to create (default
+            PARTITION_MONTHS_AHEAD)
+
+    Returns:
+        List[str]: Partitions created
+    """
+    if engine.dialect.name != "postgresql":
+        logger.warning("Partitioning is only supported on PostgreSQL")
+        return []
+    end = horizon(MONTHS_AHEAD if months_ahead is None else months_ahead)
+    current = _month(datetime.utcnow())
+
+    created: List[str] = []
+    for table in PARTITIONED_TABLES:
+        with engine.begin() as connection:
+            if not is_partitioned(connection, table):
+                if not convert:
+                    continue
+                copied = convert_table(connection, table, end)
+                logger.info("Partitioned table by month", table=table, rows=copied)
+            created += create_partitions(connection, table, current, end)
+    if created:
+        logger.info("Created partitions", partitions=created)
+    return created
+
+
+if __name__ == "__main__":
+    from src.util.db import get_engine
+
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions")
+    parser.add_argument(
+        "--convert",
+        action="store_true",
+        help="Rebuild non-partitioned tables as partitioned ones (locks them)",
+    )
+    parser.add_argument("--months-ahead", type=int, default=None)
+    args = parser.parse_args()
+    ensure_partitions(get_engine(), args.convert, args.months_ahead)
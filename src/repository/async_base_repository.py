@@ -0,0 +1,49 @@
+from typing import List, Optional, Type, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+class AsyncBaseRepository:
+    """Base repository class for asyncio database operations."""
+
+    def __init__(self, session: AsyncSession, model_class: Type[T]):
+        """Initialize the repository with an async database session and model class."""
+        self.session = session
+        self.model_class = model_class
+
+    async def create(self, obj: T) -> T:
+        """Create a new object in the database."""
+        self.session.add(obj)
+        await self.session.commit()
+        return obj
+
+    async def create_many(self, objs: List[T]) -> List[T]:
+        """Create multiple objects in the database."""
+        self.session.add_all(objs)
+        await self.session.commit()
+        return objs
+
+    async def get_all(self) -> List[T]:
+        """Get all objects from the database."""
+        result = await self.session.execute(select(self.model_class))
+        return result.scalars().all()
+
+    async def get_by_id(self, id: str) -> Optional[T]:
+        """Get an object by its ID."""
+        result = await self.session.execute(
+            select(self.model_class).filter_by(id=id).limit(1)
+        )
+        return result.scalars().first()
+
+    async def update(self, obj: T) -> T:
+        """Update an object in the database."""
+        await self.session.commit()
+        return obj
+
+    async def delete(self, obj: T) -> None:
+        """Delete an object from the database."""
+        await self.session.delete(obj)
+        await self.session.commit()
@@ -0,0 +1,174 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.model.sql_models import AssetHistory, MarketChange, MarketCurrent
+from src.repository.async_base_repository import AsyncBaseRepository
+from src.repository.crypto_repository import (
+    ASSET_HISTORY_COLUMNS,
+    Row,
+    _as_dict,
+    _chunks,
+    history_range_query,
+    latest_dates_query,
+    market_baselines_query,
+    market_snapshot_rows,
+    unique_markets,
+    upsert_statement,
+    watermark_statement,
+    watermarks_query,
+)
+
+
+class AsyncCryptoRepository(AsyncBaseRepository):
+    """
+    Asyncio counterpart of CryptoRepository.
+
+    Statements are built by the same helpers as the sync repository, so both
+    behave identically; only the execution awaits instead of blocking.
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, AssetHistory)
+
+    @property
+    def dialect(self) -> str:
+        """Name of the database dialect behind the session."""
+        return self.session.bind.dialect.name
+
+    async def get_asset_history_by_date_range(
+        self,
+        asset_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        interval: str = "d1",
+    ) -> List[AssetHistory]:
+        """Get asset history by date range."""
+        query = history_range_query(asset_id, start_date, end_date, interval)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def upsert_asset_histories(
+        self,
+        rows: Iterable[Row],
+        update: bool = False,
+        chunk_size: int = 1000,
+        commit: bool = True,
+    ) -> int:
+        """
+        Bulk insert asset history rows with INSERT ... ON CONFLICT.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in ASSET_HISTORY_COLUMNS order
+            update: Overwrite existing rows instead of skipping them
+            chunk_size: Number of rows per INSERT statement
+            commit: Commit at the end; pass False to group with other writes
+
+        Returns:
+            int: Number of rows inserted or updated
+        """
+        table = AssetHistory.__table__
+        stmt = None
+        total = 0
+        for chunk in _chunks(rows, chunk_size):
+            values = [_as_dict(row, ASSET_HISTORY_COLUMNS) for row in chunk]
+            if stmt is None:
+                stmt = upsert_statement(self.dialect, table, values[0].keys(), update)
+            result = await self.session.execute(
+                stmt,
+                values,
+                execution_options={"insertmanyvalues_page_size": chunk_size},
+            )
+            total += max(result.rowcount, 0)
+        if commit:
+            await self.session.commit()
+        return total
+
+    async def get_latest_date(
+        self, asset_id: str, interval: str = "d1"
+    ) -> Optional[datetime]:
+        query = (
+            select(AssetHistory.date)
+            .where(AssetHistory.asset_id == asset_id, AssetHistory.interval == interval)
+            .order_by(AssetHistory.date.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_latest_dates(
+        self, asset_ids: List[str], interval: str = "d1"
+    ) -> Dict[str, datetime]:
+        """Get the latest stored history date for many assets in one query."""
+        result = await self.session.execute(latest_dates_query(asset_ids, interval))
+        return dict(result.all())
+
+    async def get_watermarks(
+        self, asset_ids: List[str], dataset: str, interval: str
+    ) -> Dict[str, datetime]:
+        """Load the ingestion watermarks of many assets in one query."""
+        result = await self.session.execute(
+            watermarks_query(asset_ids, dataset, interval)
+        )
+        return dict(result.all())
+
+    async def set_watermark(
+        self,
+        asset_id: str,
+        dataset: str,
+        interval: str,
+        last_timestamp: datetime,
+        commit: bool = True,
+    ) -> None:
+        """Advance an asset's ingestion watermark; it never moves backwards."""
+        await self.session.execute(
+            watermark_statement(
+                self.dialect, asset_id, dataset, interval, last_timestamp
+            )
+        )
+        if commit:
+            await self.session.commit()
+
+    async def upsert_market_snapshots(
+        self, rows: Iterable[Row], threshold: float = 0.0, commit: bool = True
+    ) -> int:
+        """
+        Record a market snapshot: upsert current state, append only real changes.
+
+        See CryptoRepository.upsert_market_snapshots.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in MARKET_COLUMNS order
+            threshold: Relative move required to record a change, e.g. 0.001
+            commit: Commit at the end; pass False to group with other writes
+
+        Returns:
+            int: Number of change rows recorded
+        """
+        markets = unique_markets(rows)
+        if not markets:
+            return 0
+
+        result = await self.session.execute(
+            market_baselines_query({market[0] for market in markets})
+        )
+        baselines = {tuple(row[:3]): row for row in result}
+        current, changes = market_snapshot_rows(markets, baselines, threshold)
+        await self.session.execute(
+            upsert_statement(
+                self.dialect, MarketCurrent.__table__, current[0].keys(), update=True
+            ),
+            current,
+        )
+        if changes:
+            await self.session.execute(
+                upsert_statement(
+                    self.dialect, MarketChange.__table__, changes[0].keys(), False
+                ),
+                changes,
+            )
+        if commit:
+            await self.session.commit()
+        return len(changes)
@@ -0,0 +1,170 @@
+import csv
+import io
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import Table, insert, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+
+from src.util.logger import logger
+
+
+class _CsvStream:
+    """File-like object that renders rows to CSV lazily as COPY reads them."""
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+        self.rows_written = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            batch = list(islice(self._rows, 1000))
+            if not batch:
+                break
+            self._writer.writerows(batch)
+            self.rows_written += len(batch)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def _ordered(
+    rows: Iterable[Any], table: Table, columns: Sequence[str]
+) -> Iterator[List[Any]]:
+    """Normalize dict/tuple rows into column order, filling missing column defaults."""
+    defaults = {}
+    for index, name in enumerate(columns):
+        default = table.c[name].default
+        if default is not None:
+            # Callable defaults (e.g. created_at) are evaluated once per load
+            defaults[index] = default.arg(None) if default.is_callable else default.arg
+
+    for row in rows:
+        if isinstance(row, dict):
+            values = [row.get(column) for column in columns]
+        else:
+            values = list(row) + [None] * (len(columns) - len(row))
+        for index, default in defaults.items():
+            if values[index] is None:
+                values[index] = default
+        yield values
+
+
+def _deduplicated(
+    rows: Iterable[List[Any]], table: Table, columns: Sequence[str]
+) -> List[List[Any]]:
+    """Keep only the last row for each primary key, like the upsert path does."""
+    key = [columns.index(column.name) for column in table.primary_key]
+    latest = {tuple(row[index] for index in key): row for row in rows}
+    return list(latest.values())
+
+
+def bulk_load(
+    session: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Any],
+    chunk_size: int = 10_000,
+    commit: bool = True,
+) -> int:
+    """
+    Load rows into ``table``, ignoring rows whose primary key already exists.
+
+    On PostgreSQL the rows are streamed with ``COPY FROM STDIN`` into a temporary
+    staging table and merged with a single ``INSERT ... SELECT ... ON CONFLICT DO
+    NOTHING``. Other dialects fall back to ``executemany`` in chunks. Rows that
+    repeat a primary key within one load are collapsed first, keeping the last
+    one, so the input is buffered in memory for the duration of the load.
+
+    Args:
+        session: Database session
+        table: Target table
+        columns: Data columns, in the order used by tuple rows
+        rows: Dicts keyed by column name, or tuples in ``columns`` order
+        chunk_size: Rows per executemany batch on the fallback path
+        commit: Commit at the end; pass False to group with other writes
+
+    Returns:
+        int: Number of rows inserted
+    """
+    columns = [*columns, "created_at"]
+    ordered = _deduplicated(_ordered(rows, table, columns), table, columns)
+    if session.get_bind().dialect.name == "postgresql":
+        inserted = _copy_load(session, table, columns, ordered)
+    else:
+        inserted = _executemany_load(session, table, columns, ordered, chunk_size)
+    if commit:
+        session.commit()
+    return inserted
+
+
+def _copy_load(
+    session: Session,
+    table: Table,
+    columns: List[str],
+    rows: Iterable[List[Any]],
+) -> int:
+    staging = f"{table.name}_staging"
+    column_list = ", ".join(columns)
+    key = ", ".join(column.name for column in table.primary_key)
+
+    connection = session.connection()
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE {staging} "
+            f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+    stream = _CsvStream(rows)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)", stream
+        )
+    finally:
+        cursor.close()
+
+    result = connection.execute(
+        text(
+            f"INSERT INTO {table.name} ({column_list}) "
+            f"SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({key}) DO NOTHING"
+        )
+    )
+    connection.execute(text(f"DROP TABLE {staging}"))
+    logger.info(
+        "Bulk loaded rows with COPY",
+        table=table.name,
+        copied=stream.rows_written,
+        inserted=result.rowcount,
+    )
+    return result.rowcount
+
+
+def _executemany_load(
+    session: Session,
+    table: Table,
+    columns: List[str],
+    rows: Iterable[List[Any]],
+    chunk_size: int,
+) -> int:
+    if session.get_bind().dialect.name == "sqlite":
+        stmt = sqlite.insert(table).on_conflict_do_nothing()
+    else:
+        stmt = insert(table)
+
+    inserted = 0
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_size)):
+        params: List[Dict[str, Any]] = [dict(zip(columns, row)) for row in chunk]
+        result = session.execute(stmt, params)
+        inserted += max(result.rowcount, 0)
+    return inserted
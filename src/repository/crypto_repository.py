@@ -1,11 +1,297 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from sqlalchemy import and_, select
+from sqlalchemy import Select, Table, and_, delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from src.model.sql_models import AssetHistory, Market
+from src.model.sql_models import (
+    Asset,
+    AssetHistory,
+    IngestionState,
+    Market,
+    MarketChange,
+    MarketCurrent,
+)
 from src.repository.base_repository import BaseRepository
+from src.repository.bulk_loader import bulk_load
+
+Row = Union[Dict[str, Any], Sequence[Any]]
+
+# Column order expected when asset history rows are passed as tuples; a
+# missing trailing interval defaults to "d1"
+ASSET_HISTORY_COLUMNS = ("asset_id", "price_usd", "date", "time", "interval")
+
+# Column order expected when market rows are passed as tuples
+MARKET_COLUMNS = (
+    "exchange_id",
+    "base_id",
+    "quote_id",
+    "base_symbol",
+    "quote_symbol",
+    "volume_usd_24h",
+    "price_usd",
+    "volume_percent",
+)
+
+# Column order expected when asset listing rows are passed as tuples
+ASSET_COLUMNS = (
+    "id",
+    "rank",
+    "symbol",
+    "name",
+    "supply",
+    "max_supply",
+    "market_cap_usd",
+    "volume_usd_24h",
+    "price_usd",
+    "change_percent_24h",
+)
+
+# Orderings available for picking the top assets, best first
+ASSET_ORDERINGS = {
+    "rank": (Asset.rank.asc(),),
+    "market_cap": (Asset.market_cap_usd.desc().nulls_last(), Asset.rank.asc()),
+    "volume": (Asset.volume_usd_24h.desc().nulls_last(), Asset.rank.asc()),
+}
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _as_dict(row: Row, columns: Sequence[str]) -> Dict[str, Any]:
+    return row if isinstance(row, dict) else dict(zip(columns, row))
+
+
+def _asset_dict(row: Row) -> Dict[str, Any]:
+    """Asset row with every column present, so one executemany covers all rows."""
+    row = _as_dict(row, ASSET_COLUMNS)
+    return {column: row.get(column) for column in ASSET_COLUMNS}
+
+
+def _moved(new: Any, old: Any, threshold: float) -> bool:
+    """Whether ``new`` differs from ``old`` by more than ``threshold`` (relative)."""
+    new, old = Decimal(str(new)), Decimal(str(old))
+    if old == 0:
+        return new != 0
+    return abs(new - old) / abs(old) > Decimal(str(threshold))
+
+
+def _chunks(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# Statement builders shared by CryptoRepository and AsyncCryptoRepository
+
+
+def upsert_statement(
+    dialect: str, table: Table, columns: Iterable[str], update: bool
+) -> Any:
+    """Build a dialect-specific INSERT ... ON CONFLICT for the table's primary key."""
+    insert = _DIALECT_INSERTS.get(dialect)
+    if insert is None:
+        raise NotImplementedError(f"Upsert is not supported for dialect {dialect}")
+
+    stmt = insert(table)
+    key = [column.name for column in table.primary_key]
+    if not update:
+        return stmt.on_conflict_do_nothing(index_elements=key)
+    columns = set(columns)
+    changed = {
+        column.name: stmt.excluded[column.name]
+        for column in table.columns
+        if column.name not in key
+        and (column.name in columns or column.onupdate is not None)
+    }
+    return stmt.on_conflict_do_update(index_elements=key, set_=changed)
+
+
+def watermark_statement(
+    dialect: str,
+    asset_id: str,
+    dataset: str,
+    interval: str,
+    last_timestamp: datetime,
+) -> Any:
+    """Build an upsert that only ever moves a watermark forward."""
+    table = IngestionState.__table__
+    insert = _DIALECT_INSERTS.get(dialect)
+    if insert is None:
+        raise NotImplementedError("Watermarks require PostgreSQL or SQLite")
+    stmt = insert(table).values(
+        asset_id=asset_id,
+        dataset=dataset,
+        interval=interval,
+        last_timestamp=last_timestamp,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={
+            "last_timestamp": stmt.excluded.last_timestamp,
+            "updated_at": stmt.excluded.updated_at,
+        },
+        where=table.c.last_timestamp < stmt.excluded.last_timestamp,
+    )
+
+
+# ``date`` is the local datetime of ``time``; the margin covers writers and
+# readers running in different timezones or across a DST change
+DATE_MARGIN = timedelta(days=1)
+
+
+def time_range_clauses(start_time: int, end_time: int) -> list:
+    """
+    WHERE clauses selecting asset_history rows with time in [start_time, end_time).
+
+    The redundant ``date`` bounds let PostgreSQL prune the monthly partitions
+    of asset_history, which are ranged on ``date`` (see src/partitions.py).
+    """
+    return [
+        AssetHistory.time >= start_time,
+        AssetHistory.time < end_time,
+        AssetHistory.date >= datetime.fromtimestamp(start_time / 1000) - DATE_MARGIN,
+        AssetHistory.date < datetime.fromtimestamp(end_time / 1000) + DATE_MARGIN,
+    ]
+
+
+def history_range_query(
+    asset_id: str, start_date: datetime, end_date: datetime, interval: str
+) -> Select:
+    return select(AssetHistory).where(
+        and_(
+            AssetHistory.asset_id == asset_id,
+            AssetHistory.interval == interval,
+            AssetHistory.date >= start_date,
+            AssetHistory.date <= end_date,
+        )
+    )
+
+
+def latest_dates_query(asset_ids: Optional[List[str]], interval: str) -> Select:
+    """Latest stored date per asset; ``asset_ids=None`` covers every asset."""
+    query = select(AssetHistory.asset_id, func.max(AssetHistory.date)).where(
+        AssetHistory.interval == interval
+    )
+    if asset_ids is not None:
+        query = query.where(AssetHistory.asset_id.in_(asset_ids))
+    return query.group_by(AssetHistory.asset_id)
+
+
+def latest_prices_query(asset_ids: Optional[List[str]], interval: str) -> Select:
+    """Latest stored point per asset, found through the primary key."""
+    latest = latest_dates_query(asset_ids, interval).subquery()
+    return select(
+        AssetHistory.asset_id,
+        AssetHistory.price_usd,
+        AssetHistory.date,
+        AssetHistory.time,
+    ).join(
+        latest,
+        and_(
+            AssetHistory.asset_id == latest.c.asset_id,
+            AssetHistory.interval == interval,
+            AssetHistory.date == latest.c[1],
+        ),
+    )
+
+
+def watermarks_query(asset_ids: List[str], dataset: str, interval: str) -> Select:
+    return select(IngestionState.asset_id, IngestionState.last_timestamp).where(
+        IngestionState.asset_id.in_(asset_ids),
+        IngestionState.dataset == dataset,
+        IngestionState.interval == interval,
+    )
+
+
+# Primary key of markets_current and (with created_at) of market_changes
+MARKET_KEY = ("base_id", "quote_id", "exchange_id")
+
+
+def unique_markets(rows: Iterable[Row]) -> Dict[Tuple, Dict[str, Any]]:
+    """Market rows keyed by MARKET_KEY; the last occurrence of a market wins."""
+    return {
+        tuple(market[column] for column in MARKET_KEY): market
+        for market in (_as_dict(row, MARKET_COLUMNS) for row in rows)
+    }
+
+
+def market_baselines_query(base_ids: Iterable[str]) -> Select:
+    """Current markets of ``base_ids`` joined to their last recorded change."""
+    return (
+        select(
+            MarketCurrent.base_id,
+            MarketCurrent.quote_id,
+            MarketCurrent.exchange_id,
+            MarketChange.price_usd,
+            MarketChange.volume_usd_24h,
+            MarketCurrent.changed_at,
+        )
+        .join(
+            MarketChange,
+            and_(
+                MarketChange.base_id == MarketCurrent.base_id,
+                MarketChange.quote_id == MarketCurrent.quote_id,
+                MarketChange.exchange_id == MarketCurrent.exchange_id,
+                MarketChange.created_at == MarketCurrent.changed_at,
+            ),
+        )
+        .where(MarketCurrent.base_id.in_(base_ids))
+    )
+
+
+def market_snapshot_rows(
+    markets: Dict[Tuple, Dict[str, Any]], baselines: Dict[Tuple, Any], threshold: float
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split a snapshot into markets_current rows and the market_changes to record.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Rows to upsert into
+        markets_current and rows to insert into market_changes
+    """
+    now = datetime.utcnow()
+    current, changes = [], []
+    for market_key, market in markets.items():
+        baseline = baselines.get(market_key)
+        changed = (
+            baseline is None
+            or _moved(market["price_usd"], baseline.price_usd, threshold)
+            or _moved(market["volume_usd_24h"], baseline.volume_usd_24h, threshold)
+        )
+        current.append(
+            {
+                **{column: market[column] for column in MARKET_COLUMNS},
+                "changed_at": now if changed else baseline.changed_at,
+                "updated_at": now,
+            }
+        )
+        if changed:
+            changes.append(
+                {
+                    **{column: market[column] for column in MARKET_KEY},
+                    "price_usd": market["price_usd"],
+                    "volume_usd_24h": market["volume_usd_24h"],
+                    "volume_percent": market["volume_percent"],
+                    "created_at": now,
+                }
+            )
+    return current, changes
 
 
 class CryptoRepository(BaseRepository):
@@ -13,25 +299,37 @@ class CryptoRepository(BaseRepository):
         super().__init__(session, AssetHistory)
         self.market_model = Market
 
+    @property
+    def dialect(self) -> str:
+        """Name of the database dialect behind the session."""
+        return self.session.get_bind().dialect.name
+
     def get_asset_history_by_date_range(
-        self, asset_id: str, start_date: datetime, end_date: datetime
+        self,
+        asset_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        interval: str = "d1",
     ) -> List[AssetHistory]:
         """Get asset history by date range."""
-        query = select(AssetHistory).where(
-            and_(
-                AssetHistory.asset_id == asset_id,
-                AssetHistory.date >= start_date,
-                AssetHistory.date <= end_date,
-            )
-        )
+        query = history_range_query(asset_id, start_date, end_date, interval)
         return self.session.execute(query).scalars().all()
 
     def insert_asset_history(
-        self, asset_id: str, price_usd: float, date: datetime, time: int
+        self,
+        asset_id: str,
+        price_usd: float,
+        date: datetime,
+        time: int,
+        interval: str = "d1",
     ) -> AssetHistory:
         """Insert a new asset history into the database."""
         asset_history = AssetHistory(
-            asset_id=asset_id, price_usd=price_usd, date=date, time=time
+            asset_id=asset_id,
+            interval=interval,
+            price_usd=price_usd,
+            date=date,
+            time=time,
         )
         return self.create(asset_history)
 
@@ -41,16 +339,379 @@ class CryptoRepository(BaseRepository):
         """Insert multiple asset histories into the database."""
         return self.create_many(histories)
 
-    def get_latest_date(self, asset_id: str) -> Optional[datetime]:
+    def upsert_asset_histories(
+        self,
+        rows: Iterable[Row],
+        update: bool = False,
+        chunk_size: int = 1000,
+        commit: bool = True,
+    ) -> int:
+        """
+        Bulk insert asset history rows with INSERT ... ON CONFLICT.
+
+        Rows already present for the same primary key are skipped, or
+        overwritten when ``update`` is True. Each chunk is executed as one
+        batched multi-row statement and the whole call is committed once.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in ASSET_HISTORY_COLUMNS order
+            update: Overwrite existing rows instead of skipping them
+            chunk_size: Number of rows per INSERT statement
+            commit: Commit at the end; pass False to group with other writes
+
+        Returns:
+            int: Number of rows inserted or updated
+        """
+        table = AssetHistory.__table__
+        stmt = None
+        total = 0
+        for chunk in _chunks(rows, chunk_size):
+            values = [_as_dict(row, ASSET_HISTORY_COLUMNS) for row in chunk]
+            if stmt is None:
+                stmt = upsert_statement(self.dialect, table, values[0].keys(), update)
+            result = self.session.execute(
+                stmt,
+                values,
+                execution_options={"insertmanyvalues_page_size": chunk_size},
+            )
+            total += max(result.rowcount, 0)
+        if commit:
+            self.session.commit()
+        return total
+
+    def bulk_load_asset_histories(
+        self, rows: Iterable[Row], commit: bool = True
+    ) -> int:
+        """
+        Bulk load asset history rows for large backfills.
+
+        Uses COPY into a staging table on PostgreSQL and executemany elsewhere;
+        rows whose (asset_id, interval, date) already exists are skipped.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in ASSET_HISTORY_COLUMNS order
+            commit: Commit at the end; pass False to group with other writes
+
+        Returns:
+            int: Number of rows inserted
+        """
+        return bulk_load(
+            self.session,
+            AssetHistory.__table__,
+            ASSET_HISTORY_COLUMNS,
+            rows,
+            commit=commit,
+        )
+
+    def bulk_load_markets(self, rows: Iterable[Row], commit: bool = True) -> int:
+        """
+        Bulk load market rows, using COPY on PostgreSQL and executemany elsewhere.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in MARKET_COLUMNS order
+            commit: Commit at the end; pass False to group with other writes
+
+        Returns:
+            int: Number of rows inserted
+        """
+        return bulk_load(
+            self.session, Market.__table__, MARKET_COLUMNS, rows, commit=commit
+        )
+
+    def get_latest_date(
+        self, asset_id: str, interval: str = "d1"
+    ) -> Optional[datetime]:
         query = (
             select(AssetHistory.date)
-            .where(AssetHistory.asset_id == asset_id)
+            .where(AssetHistory.asset_id == asset_id, AssetHistory.interval == interval)
             .order_by(AssetHistory.date.desc())
             .limit(1)
         )
         result = self.session.execute(query).scalar_one_or_none()
         return result
 
+    def get_latest_dates(
+        self, asset_ids: List[str], interval: str = "d1"
+    ) -> Dict[str, datetime]:
+        """Get the latest stored history date for many assets in one query."""
+        return dict(self.session.execute(latest_dates_query(asset_ids, interval)).all())
+
+    def get_latest_prices(
+        self,
+        asset_ids: Optional[List[str]] = None,
+        interval: str = "d1",
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        Get the latest stored price of many assets in one query.
+
+        Args:
+            asset_ids: Assets to look up; None returns every asset
+            interval: History interval (default is d1)
+            limit: Maximum rows returned
+
+        Returns:
+            List[Row]: (asset_id, price_usd, date, time) rows
+        """
+        query = latest_prices_query(asset_ids, interval).limit(limit)
+        return self.session.execute(query).all()
+
+    def aggregate_asset_history(
+        self,
+        asset_id: str,
+        interval: str,
+        bucket_ms: int,
+        start_time: int,
+        end_time: int,
+    ) -> List[Tuple[int, Decimal, int]]:
+        """
+        Average stored prices of one interval into coarser time buckets in SQL.
+
+        Args:
+            asset_id: The asset ID
+            interval: Interval of the stored source rows
+            bucket_ms: Bucket length in milliseconds
+            start_time: Inclusive start, UNIX time in milliseconds
+            end_time: Exclusive end, UNIX time in milliseconds
+
+        Returns:
+            List[Tuple[int, Decimal, int]]: (bucket start time, average price,
+            number of source rows) ordered by time
+        """
+        bucket = ((AssetHistory.time // bucket_ms) * bucket_ms).label("bucket")
+        query = (
+            select(bucket, func.avg(AssetHistory.price_usd), func.count())
+            .where(
+                AssetHistory.asset_id == asset_id,
+                AssetHistory.interval == interval,
+                *time_range_clauses(start_time, end_time),
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+        return self.session.execute(query).all()
+
+    def get_watermarks(
+        self, asset_ids: List[str], dataset: str, interval: str
+    ) -> Dict[str, datetime]:
+        """
+        Load the ingestion watermarks of many assets in one query.
+
+        Args:
+            asset_ids: Assets to look up
+            dataset: Dataset name, e.g. "history"
+            interval: Data interval, e.g. "d1"
+
+        Returns:
+            Dict[str, datetime]: Last successfully stored timestamp per asset
+        """
+        query = watermarks_query(asset_ids, dataset, interval)
+        return dict(self.session.execute(query).all())
+
+    def set_watermark(
+        self,
+        asset_id: str,
+        dataset: str,
+        interval: str,
+        last_timestamp: datetime,
+        commit: bool = True,
+    ) -> None:
+        """
+        Advance an asset's ingestion watermark; it never moves backwards.
+
+        Pass ``commit=False`` to commit it together with the batch it describes.
+        """
+        self.session.execute(
+            watermark_statement(
+                self.dialect, asset_id, dataset, interval, last_timestamp
+            )
+        )
+        if commit:
+            self.session.commit()
+
+    def upsert_market_snapshots(
+        self, rows: Iterable[Row], threshold: float = 0.0, commit: bool = True
+    ) -> int:
+        """
+        Record a market snapshot: upsert current state, append only real changes.
+
+        Every market is upserted into markets_current on (base_id, quote_id,
+        exchange_id). A market_changes row is written only for new markets or
+        when price or 24h volume moved more than ``threshold`` relative to the
+        last recorded change, so slow drifts are still captured eventually.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in MARKET_COLUMNS order
+            threshold: Relative move required to record a change, e.g. 0.001
+            commit: Commit at the end; pass False to group with other writes
+
+        Returns:
+            int: Number of change rows recorded
+        """
+        markets = unique_markets(rows)
+        if not markets:
+            return 0
+
+        baselines = {
+            tuple(row[:3]): row
+            for row in self.session.execute(
+                market_baselines_query({market[0] for market in markets})
+            )
+        }
+        current, changes = market_snapshot_rows(markets, baselines, threshold)
+        self.session.execute(
+            upsert_statement(
+                self.dialect, MarketCurrent.__table__, current[0].keys(), update=True
+            ),
+            current,
+        )
+        if changes:
+            self.session.execute(
+                upsert_statement(
+                    self.dialect, MarketChange.__table__, changes[0].keys(), False
+                ),
+                changes,
+            )
+        if commit:
+            self.session.commit()
+        return len(changes)
+
+    def get_prices_on(self, date: datetime, interval: str = "d1") -> Dict[str, Any]:
+        """
+        Get every asset's price at one point in time (a cross section).
+
+        Served by the (interval, date) index instead of a full table scan.
+
+        Returns:
+            Dict[str, Any]: Price per asset ID
+        """
+        query = select(AssetHistory.asset_id, AssetHistory.price_usd).where(
+            AssetHistory.interval == interval, AssetHistory.date == date
+        )
+        return dict(self.session.execute(query).all())
+
+    def get_market_snapshots_as_of(
+        self, base_id: str, as_of: datetime
+    ) -> List[MarketChange]:
+        """
+        Get the state of each market of an asset at a point in time.
+
+        markets_current only holds the present; a market's state at ``as_of``
+        is its last recorded change at or before it, found by walking the
+        market_changes primary key (pair, created_at) per market.
+        """
+        pair = (MarketChange.base_id, MarketChange.quote_id, MarketChange.exchange_id)
+        latest = (
+            select(*pair, func.max(MarketChange.created_at).label("created_at"))
+            .where(MarketChange.base_id == base_id, MarketChange.created_at <= as_of)
+            .group_by(*pair)
+            .subquery()
+        )
+        query = select(MarketChange).join(
+            latest,
+            and_(
+                MarketChange.base_id == latest.c.base_id,
+                MarketChange.quote_id == latest.c.quote_id,
+                MarketChange.exchange_id == latest.c.exchange_id,
+                MarketChange.created_at == latest.c.created_at,
+            ),
+        )
+        return self.session.execute(query).scalars().all()
+
+    def get_current_markets(self, base_id: str) -> List[MarketCurrent]:
+        """Get the latest state of every market of an asset."""
+        query = select(MarketCurrent).where(MarketCurrent.base_id == base_id)
+        return self.session.execute(query).scalars().all()
+
+    def get_current_markets_by_pair(
+        self,
+        pairs: Optional[List[Tuple[str, str, str]]] = None,
+        limit: Optional[int] = None,
+    ) -> List[MarketCurrent]:
+        """
+        Get the latest state of many markets in one query.
+
+        Args:
+            pairs: (base_id, quote_id, exchange_id) keys; None returns every market
+            limit: Maximum rows returned
+        """
+        query = select(MarketCurrent).limit(limit)
+        if pairs is not None:
+            key = tuple_(
+                MarketCurrent.base_id, MarketCurrent.quote_id, MarketCurrent.exchange_id
+            )
+            query = query.where(key.in_(pairs))
+        return self.session.execute(query).scalars().all()
+
+    def get_current_market(
+        self, base_id: str, quote_id: str, exchange_id: str
+    ) -> Optional[MarketCurrent]:
+        """Get the latest state of one market by primary key."""
+        return self.session.get(MarketCurrent, (base_id, quote_id, exchange_id))
+
+    def upsert_assets(
+        self, rows: Iterable[Row], replace: bool = False, commit: bool = True
+    ) -> int:
+        """
+        Insert or refresh asset listing rows.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in ASSET_COLUMNS order
+            replace: Delete stored assets missing from ``rows`` in the same
+                transaction, so stale ranks never mix with the new listing;
+                ignored when ``rows`` is empty
+            commit: Commit at the end; pass False to group with other writes
+
+        Returns:
+            int: Number of rows written
+        """
+        values = list({row["id"]: row for row in map(_asset_dict, rows)}.values())
+        if not values:
+            return 0
+        refreshed_at = datetime.utcnow()
+        for value in values:
+            value["updated_at"] = refreshed_at
+        self.session.execute(
+            upsert_statement(self.dialect, Asset.__table__, ASSET_COLUMNS, True),
+            values,
+        )
+        if replace:
+            self.session.execute(delete(Asset).where(Asset.updated_at < refreshed_at))
+        if commit:
+            self.session.commit()
+        return len(values)
+
+    def get_top_assets(
+        self,
+        limit: int,
+        by: str = "rank",
+        min_volume_usd: Optional[float] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[str]:
+        """
+        Get the IDs of the best assets by one of ASSET_ORDERINGS, best first.
+
+        Args:
+            limit: Number of assets to return
+            by: "rank", "market_cap" or "volume"
+            min_volume_usd: Skip assets trading less than this in 24 hours
+            exclude: Asset IDs to leave out
+
+        Returns:
+            List[str]: Asset IDs in priority order
+        """
+        if by not in ASSET_ORDERINGS:
+            raise ValueError(
+                f"Unknown asset ordering {by!r}; use one of {sorted(ASSET_ORDERINGS)}"
+            )
+        query = select(Asset.id).order_by(*ASSET_ORDERINGS[by]).limit(limit)
+        if min_volume_usd is not None:
+            query = query.where(Asset.volume_usd_24h >= min_volume_usd)
+        exclude = list(exclude)
+        if exclude:
+            query = query.where(Asset.id.not_in(exclude))
+        return self.session.execute(query).scalars().all()
+
     def insert_market(self, market: Market) -> Market:
         """Insert a new market into the database."""
         asset_market = Market(
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.model.sql_models import AssetLease
+from src.repository.crypto_repository import upsert_statement
+
+
+class LeaseRepository:
+    """
+    Work queue of assets shared by ingestion workers through the database.
+
+    A worker leases an asset for a limited time and must complete or renew the
+    lease before it expires; leases of workers that died simply expire and are
+    handed out again. Candidates are picked with ``FOR UPDATE SKIP LOCKED`` on
+    PostgreSQL (ignored by SQLite, which serializes writers) and then claimed
+    with a guarded UPDATE, so an asset is never leased twice at once.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @property
+    def dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    def enqueue(self, asset_ids: List[str]) -> None:
+        """
+        Add assets to the queue, resetting any finished or stale work unit.
+
+        Assets are handed out in the order given, e.g. most liquid first.
+        """
+        if not asset_ids:
+            return
+        rows = [
+            {
+                "asset_id": asset_id,
+                "priority": priority,
+                "owner": None,
+                "lease_expires_at": None,
+                "attempts": 0,
+                "completed_at": None,
+            }
+            for priority, asset_id in enumerate(dict.fromkeys(asset_ids))
+        ]
+        self.session.execute(
+            upsert_statement(
+                self.dialect, AssetLease.__table__, rows[0].keys(), update=True
+            ),
+            rows,
+        )
+        self.session.commit()
+
+    @staticmethod
+    def _available(now: datetime, max_attempts: int) -> list:
+        return [
+            AssetLease.completed_at.is_(None),
+            AssetLease.attempts < max_attempts,
+            or_(
+                AssetLease.lease_expires_at.is_(None),
+                AssetLease.lease_expires_at < now,
+            ),
+        ]
+
+    def acquire(
+        self,
+        owner: str,
+        lease_seconds: float,
+        limit: int = 1,
+        max_attempts: int = 3,
+    ) -> List[str]:
+        """
+        Lease up to ``limit`` available assets to ``owner``.
+
+        Args:
+            owner: Unique worker identifier
+            lease_seconds: Lease length; renew before it runs out
+            limit: Maximum assets to lease
+            max_attempts: Assets leased this many times without completing are
+                left out (e.g. an asset that crashes every worker)
+
+        Returns:
+            List[str]: Leased asset IDs, empty when no work is left
+        """
+        now = datetime.utcnow()
+        candidates = (
+            self.session.execute(
+                select(AssetLease.asset_id)
+                .where(*self._available(now, max_attempts))
+                .order_by(AssetLease.attempts, AssetLease.priority, AssetLease.asset_id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+
+        leased = []
+        for asset_id in candidates:
+            result = self.session.execute(
+                update(AssetLease)
+                .where(
+                    AssetLease.asset_id == asset_id,
+                    *self._available(now, max_attempts),
+                )
+                .values(
+                    owner=owner,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=AssetLease.attempts + 1,
+                )
+            )
+            if result.rowcount == 1:
+                leased.append(asset_id)
+        self.session.commit()
+        return leased
+
+    def renew(self, owner: str, asset_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease still held by ``owner``.
+
+        Returns:
+            bool: False if the lease expired and was taken by another worker
+        """
+        result = self.session.execute(
+            update(AssetLease)
+            .where(self._held(owner, asset_id))
+            .values(
+                lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds)
+            )
+        )
+        self.session.commit()
+        return result.rowcount == 1
+
+    def complete(self, owner: str, asset_id: str) -> bool:
+        """Mark a leased asset as done."""
+        result = self.session.execute(
+            update(AssetLease)
+            .where(self._held(owner, asset_id))
+            .values(owner=None, lease_expires_at=None, completed_at=datetime.utcnow())
+        )
+        self.session.commit()
+        return result.rowcount == 1
+
+    def release(self, owner: str, asset_id: str) -> bool:
+        """Give a leased asset back so another worker can retry it right away."""
+        result = self.session.execute(
+            update(AssetLease)
+            .where(self._held(owner, asset_id))
+            .values(owner=None, lease_expires_at=None)
+        )
+        self.session.commit()
+        return result.rowcount == 1
+
+    def pending(self) -> int:
+        """Number of assets not completed yet."""
+        query = (
+            select(func.count())
+            .select_from(AssetLease)
+            .where(AssetLease.completed_at.is_(None))
+        )
+        return self.session.execute(query).scalar_one()
+
+    @staticmethod
+    def _held(owner: str, asset_id: str):
+        return and_(
+            AssetLease.asset_id == asset_id,
+            AssetLease.owner == owner,
+            AssetLease.completed_at.is_(None),
+        )
@@ -0,0 +1,259 @@
+from decimal import Decimal
+from math import sqrt
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from src.model.sql_models import AssetHistory
+from src.repository.crypto_repository import time_range_clauses
+from src.util.intervals import interval_ms
+
+
+def _series(asset_id: str, interval: str, start_time: int, end_time: int) -> list:
+    """WHERE clauses selecting one asset's series in [start_time, end_time)."""
+    return [
+        AssetHistory.asset_id == asset_id,
+        AssetHistory.interval == interval,
+        *time_range_clauses(start_time, end_time),
+    ]
+
+
+class TimeSeriesRepository:
+    """
+    Read-only time-series queries over asset_history.
+
+    Aggregation runs in SQL and results come back as plain rows (tuples) rather
+    than ORM instances, so dashboards transfer and build only what they show.
+    All times are UNIX milliseconds; ranges are [start_time, end_time).
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def ohlc(
+        self,
+        asset_id: str,
+        interval: str,
+        bucket_ms: int,
+        start_time: int,
+        end_time: int,
+    ) -> List[Tuple[int, Decimal, Decimal, Decimal, Decimal, int]]:
+        """
+        Open/high/low/close of stored prices per time bucket.
+
+        Args:
+            asset_id: The asset ID
+            interval: Interval of the stored source rows
+            bucket_ms: Bucket length in milliseconds
+            start_time: Inclusive start
+            end_time: Exclusive end
+
+        Returns:
+            List[Tuple[int, Decimal, Decimal, Decimal, Decimal, int]]: (bucket start,
+            open, high, low, close, number of source rows) ordered by time
+        """
+        bucket = (AssetHistory.time // bucket_ms) * bucket_ms
+        ranked = (
+            select(
+                bucket.label("bucket"),
+                AssetHistory.price_usd.label("price"),
+                func.row_number()
+                .over(partition_by=bucket, order_by=AssetHistory.time)
+                .label("first"),
+                func.row_number()
+                .over(partition_by=bucket, order_by=AssetHistory.time.desc())
+                .label("last"),
+            )
+            .where(*_series(asset_id, interval, start_time, end_time))
+            .subquery()
+        )
+        query = (
+            select(
+                ranked.c.bucket,
+                func.max(case((ranked.c.first == 1, ranked.c.price))),
+                func.max(ranked.c.price),
+                func.min(ranked.c.price),
+                func.max(case((ranked.c.last == 1, ranked.c.price))),
+                func.count(),
+            )
+            .group_by(ranked.c.bucket)
+            .order_by(ranked.c.bucket)
+        )
+        return self.session.execute(query).all()
+
+    def moving_average(
+        self,
+        asset_id: str,
+        interval: str,
+        window: int,
+        start_time: int,
+        end_time: int,
+    ) -> List[Tuple[int, Decimal, Decimal]]:
+        """
+        Simple moving average over the last ``window`` stored points.
+
+        Points before ``start_time`` are read only to seed the first windows.
+
+        Returns:
+            List[Tuple[int, Decimal, Decimal]]: (time, price, moving average)
+        """
+        lookback = start_time - (window - 1) * interval_ms(interval)
+        averaged = (
+            select(
+                AssetHistory.time,
+                AssetHistory.price_usd,
+                func.avg(AssetHistory.price_usd)
+                .over(order_by=AssetHistory.time, rows=(-(window - 1), 0))
+                .label("average"),
+            )
+            .where(*_series(asset_id, interval, lookback, end_time))
+            .subquery()
+        )
+        query = (
+            select(averaged.c.time, averaged.c.price_usd, averaged.c.average)
+            .where(averaged.c.time >= start_time)
+            .order_by(averaged.c.time)
+        )
+        return self.session.execute(query).all()
+
+    def _returns(
+        self, asset_id: str, interval: str, start_time: int, end_time: int
+    ) -> Any:
+        """Subquery of (time, price, simple return versus the previous point)."""
+        lookback = start_time - interval_ms(interval)
+        price = cast(AssetHistory.price_usd, Float)
+        previous = func.lag(price).over(order_by=AssetHistory.time)
+        return (
+            select(
+                AssetHistory.time,
+                AssetHistory.price_usd,
+                (price / previous - 1).label("change"),
+            )
+            .where(*_series(asset_id, interval, lookback, end_time))
+            .subquery()
+        )
+
+    def returns(
+        self, asset_id: str, interval: str, start_time: int, end_time: int
+    ) -> List[Tuple[int, Decimal, Optional[float]]]:
+        """
+        Simple returns between consecutive stored points.
+
+        Returns:
+            List[Tuple[int, Decimal, Optional[float]]]: (time, price, return); the
+            return is None for the first point of the series
+        """
+        returns = self._returns(asset_id, interval, start_time, end_time)
+        query = (
+            select(returns.c.time, returns.c.price_usd, returns.c.change)
+            .where(returns.c.time >= start_time)
+            .order_by(returns.c.time)
+        )
+        return self.session.execute(query).all()
+
+    def volatility(
+        self,
+        asset_id: str,
+        interval: str,
+        window: int,
+        start_time: int,
+        end_time: int,
+    ) -> List[Tuple[int, Optional[float]]]:
+        """
+        Rolling sample standard deviation of returns over ``window`` points.
+
+        The window moments are computed in SQL (SQLite has no STDDEV); only the
+        final square root runs in Python.
+
+        Returns:
+            List[Tuple[int, Optional[float]]]: (time, volatility); None until the
+            window holds at least two returns
+        """
+        lookback = start_time - (window - 1) * interval_ms(interval)
+        returns = self._returns(asset_id, interval, lookback, end_time)
+        frame = {"order_by": returns.c.time, "rows": (-(window - 1), 0)}
+        moments = (
+            select(
+                returns.c.time,
+                func.count(returns.c.change).over(**frame).label("n"),
+                func.avg(returns.c.change).over(**frame).label("mean"),
+                func.avg(returns.c.change * returns.c.change)
+                .over(**frame)
+                .label("mean_square"),
+            )
+            .where(returns.c.time >= start_time)
+            .order_by(returns.c.time)
+        )
+        series = []
+        for time, n, mean, mean_square in self.session.execute(moments):
+            if n < 2:
+                series.append((time, None))
+                continue
+            variance = (mean_square - mean * mean) * n / (n - 1)
+            series.append((time, sqrt(max(variance, 0.0))))
+        return series
+
+    def pivot(
+        self,
+        asset_ids: Sequence[str],
+        interval: str,
+        start_time: int,
+        end_time: int,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Prices of several assets side by side, one row per timestamp.
+
+        Returns:
+            List[Tuple[Any, ...]]: (time, price of asset_ids[0], price of
+            asset_ids[1], ...); None where an asset has no point at that time
+        """
+        columns = [
+            func.max(
+                case((AssetHistory.asset_id == asset_id, AssetHistory.price_usd))
+            ).label(asset_id)
+            for asset_id in asset_ids
+        ]
+        query = (
+            select(AssetHistory.time, *columns)
+            .where(
+                AssetHistory.asset_id.in_(asset_ids),
+                AssetHistory.interval == interval,
+                *time_range_clauses(start_time, end_time),
+            )
+            .group_by(AssetHistory.time)
+            .order_by(AssetHistory.time)
+        )
+        return self.session.execute(query).all()
+
+    def page(
+        self,
+        asset_id: str,
+        interval: str,
+        after_time: Optional[int] = None,
+        limit: int = 1000,
+    ) -> Tuple[List[Tuple[int, Decimal]], Optional[int]]:
+        """
+        Keyset-paginate one asset's series in time order.
+
+        Args:
+            asset_id: The asset ID
+            interval: Interval of the stored rows
+            after_time: Cursor returned by the previous page; None for the first
+            limit: Maximum rows per page
+
+        Returns:
+            Tuple[List[Tuple[int, Decimal]], Optional[int]]: (time, price) rows and
+            the cursor of the next page, or None when this was the last page
+        """
+        query = (
+            select(AssetHistory.time, AssetHistory.price_usd)
+            .where(AssetHistory.asset_id == asset_id, AssetHistory.interval == interval)
+            .order_by(AssetHistory.time)
+            .limit(limit)
+        )
+        if after_time is not None:
+            query = query.where(AssetHistory.time > after_time)
+        rows = self.session.execute(query).all()
+        cursor = rows[-1][0] if len(rows) == limit else None
+        return rows, cursor
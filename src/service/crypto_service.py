@@ -1,20 +1,65 @@
+import asyncio
+import os
 from datetime import datetime, timedelta
-from typing import List
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
 from src.client.coincap_client import CoinCapClient
-from src.model.sql_models import AssetHistory, Market
-from src.repository.crypto_repository import CryptoRepository
+from src.repository.crypto_repository import MARKET_COLUMNS, CryptoRepository
+from src.service.price_index import LatestPriceIndex
+from src.util.intervals import interval_ms
 from src.util.logger import logger
+from src.util.metrics import metrics
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+_ROWS_WRITTEN = metrics.counter(
+    "ingest_rows_total", "Rows written per dataset and asset"
+)
 
 
 class CryptoService:
-    def __init__(self, session: Session):
+    # History batches at least this large are written with the bulk loader
+    BULK_LOAD_THRESHOLD = 10_000
+    # Watermark dataset name for price history
+    HISTORY_DATASET = "history"
+    DEFAULT_START_DATE = datetime(2018, 1, 1)
+    # Relative price/volume move that records a new market_changes row
+    MARKET_CHANGE_THRESHOLD = float(os.getenv("MARKET_CHANGE_THRESHOLD", "0.001"))
+
+    def __init__(
+        self,
+        session: Session,
+        session_factory: Optional[Callable[[], Session]] = None,
+        price_index: Optional[LatestPriceIndex] = None,
+        async_session_factory: Optional[Callable[[], "AsyncSession"]] = None,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            session: Database session used by the sequential ingestion path
+            session_factory: Optional factory used to open one session per worker
+                when ingesting assets concurrently
+            price_index: Optional LatestPriceIndex updated after every commit
+            async_session_factory: Optional AsyncSession factory (see
+                get_async_session_factory); fetched history and market pages
+                are then written through AsyncCryptoRepository, so commits do
+                not block the API requests in flight on the event loop
+        """
         self.crypto_repo = CryptoRepository(session)
+        self.session_factory = session_factory
+        self.price_index = price_index
+        self.async_session_factory = async_session_factory
 
     async def ingest_asset_history(
-        self, client: CoinCapClient, asset_id: str, start_date: datetime = None
+        self,
+        client: CoinCapClient,
+        asset_id: str,
+        start_date: datetime = None,
+        interval: str = "d1",
     ) -> None:
         """
         Ingest historical data for a specific asset.
@@ -22,23 +67,18 @@ class CryptoService:
         Args:
             client: CoinCapClient instance
             asset_id: The asset ID to fetch data for
-            start_date: Optional start date. If not provided, will use the latest date in DB or default to 2018
+            start_date: Optional start date. If not provided, will resume from the asset's ingestion watermark or default to 2018
+            interval: History interval to fetch and store (default is d1)
         """
         try:
-            # Get the latest date in our database if no start_date provided
+            # Resume from the stored watermark if no start_date provided
             if not start_date:
-                latest_date = self.crypto_repo.get_latest_date(asset_id)
-                if latest_date:
-                    start_date = latest_date + timedelta(days=1)
-                    logger.info(
-                        f"Found existing data until {latest_date}, fetching from {start_date}"
-                    )
-                else:
-                    start_date = datetime(2018, 1, 1)
-                    logger.info(f"No existing data found, starting from {start_date}")
+                start_date = self.plan_history_start_dates([asset_id], interval)[
+                    asset_id
+                ]
 
-            # End date is yesterday (to ensure we have complete data)
-            end_date = datetime.now() - timedelta(days=1)
+            # End one interval ago (to ensure we have complete data)
+            end_date = datetime.now() - timedelta(milliseconds=interval_ms(interval))
 
             # Convert dates to milliseconds for API
             start_ms = int(start_date.timestamp() * 1000)
@@ -47,50 +87,239 @@ class CryptoService:
             logger.info(
                 f"Fetching history for {asset_id} from {start_date} to {end_date}"
             )
-            history_data = await client.get_history(
-                asset_id=asset_id, interval="d1", start=start_ms, end=end_ms
-            )
+            fetched = 0
+            inserted = 0
+            pending = []
+            async for history_data in client.iter_history_points(
+                asset_id, interval, start_ms, end_ms
+            ):
+                # Validated points go straight to the bulk insert as tuples
+                with metrics.span("transform", dataset=self.HISTORY_DATASET):
+                    pending.extend(
+                        (
+                            asset_id,
+                            item["price_usd"],
+                            datetime.fromtimestamp(item["time"] / 1000),
+                            item["time"],
+                            interval,
+                        )
+                        for item in history_data
+                    )
+                fetched += len(history_data)
+                # Write as soon as enough rows are buffered for a bulk load
+                if len(pending) >= self.BULK_LOAD_THRESHOLD:
+                    inserted += await self._write_fetched_history(
+                        asset_id, interval, pending
+                    )
+                    pending = []
+            if pending:
+                inserted += await self._write_fetched_history(
+                    asset_id, interval, pending
+                )
 
-            if not history_data:
+            if not fetched:
                 logger.warning(f"No new data found for {asset_id}")
                 return
-
-            # Get existing records for the date range
-            existing_records = self.crypto_repo.get_asset_history_by_date_range(
-                asset_id, start_date, end_date
-            )
-            existing_dates = {record.date for record in existing_records}
-
-            # Convert API data to database models, filtering out existing records
-            db_models = []
-            for item in history_data:
-                record_date = datetime.fromtimestamp(item.time / 1000)
-                if record_date not in existing_dates:
-                    db_model = AssetHistory(
-                        asset_id=asset_id,
-                        price_usd=float(item.price_usd),
-                        date=record_date,
-                        time=item.time,
-                    )
-                    db_models.append(db_model)
-
-            if not db_models:
+            if not inserted:
                 logger.info(f"No new records to insert for {asset_id}")
                 return
 
-            # Insert into database
-            logger.info(
-                f"Inserting {len(db_models)} new records for {asset_id} into database"
-            )
-            self.crypto_repo.insert_asset_histories(db_models)
             logger.info(f"Data ingestion completed successfully for {asset_id}")
 
         except Exception as e:
             logger.error(f"Error during data ingestion for {asset_id}: {str(e)}")
             raise
 
+    def plan_history_start_dates(
+        self, asset_ids: List[str], interval: str = "d1"
+    ) -> Dict[str, datetime]:
+        """
+        Resolve where each asset's incremental history fetch should start.
+
+        Watermarks for all assets are loaded in one query; assets without a
+        watermark (e.g. data stored before watermarks existed) fall back to a
+        single grouped MAX(date) query.
+
+        Args:
+            asset_ids: Assets to plan
+            interval: Data interval of the history
+
+        Returns:
+            Dict[str, datetime]: Start date per asset
+        """
+        latest = self.crypto_repo.get_watermarks(
+            asset_ids, self.HISTORY_DATASET, interval
+        )
+        missing = [asset_id for asset_id in asset_ids if asset_id not in latest]
+        if missing:
+            latest.update(self.crypto_repo.get_latest_dates(missing, interval))
+
+        step = timedelta(milliseconds=interval_ms(interval))
+        logger.info(
+            "Planned incremental history fetch",
+            resumed=len(latest),
+            new=len(asset_ids) - len(latest),
+        )
+        return {
+            asset_id: (
+                latest[asset_id] + step
+                if asset_id in latest
+                else self.DEFAULT_START_DATE
+            )
+            for asset_id in asset_ids
+        }
+
+    def _write_history(
+        self, asset_id: str, interval: str, rows: List[tuple], update: bool = False
+    ) -> int:
+        """
+        Insert history rows, skipping dates that are already stored (or
+        overwriting them when ``update`` is True), and advance the asset's
+        watermark in the same transaction.
+        """
+        logger.info(f"Upserting {len(rows)} records for {asset_id} into database")
+        with metrics.span("write", dataset=self.HISTORY_DATASET, asset=asset_id):
+            if len(rows) >= self.BULK_LOAD_THRESHOLD and not update:
+                inserted = self.crypto_repo.bulk_load_asset_histories(
+                    rows, commit=False
+                )
+            else:
+                inserted = self.crypto_repo.upsert_asset_histories(
+                    rows, update=update, commit=False
+                )
+            self.crypto_repo.set_watermark(
+                asset_id,
+                self.HISTORY_DATASET,
+                interval,
+                max(row[2] for row in rows),
+                commit=False,
+            )
+            with metrics.span("commit", dataset=self.HISTORY_DATASET):
+                self.crypto_repo.session.commit()
+        self._history_written(asset_id, rows, inserted)
+        return inserted
+
+    async def _write_fetched_history(
+        self, asset_id: str, interval: str, rows: List[tuple]
+    ) -> int:
+        """
+        Write a fetched history batch like _write_history, awaiting the async
+        session when one is configured. The async path always upserts: the
+        COPY bulk loader needs the sync driver.
+        """
+        if self.async_session_factory is None:
+            return self._write_history(asset_id, interval, rows)
+
+        from src.repository.async_crypto_repository import AsyncCryptoRepository
+
+        logger.info(f"Upserting {len(rows)} records for {asset_id} into database")
+        with metrics.span("write", dataset=self.HISTORY_DATASET, asset=asset_id):
+            async with self.async_session_factory() as session:
+                repo = AsyncCryptoRepository(session)
+                inserted = await repo.upsert_asset_histories(rows, commit=False)
+                await repo.set_watermark(
+                    asset_id,
+                    self.HISTORY_DATASET,
+                    interval,
+                    max(row[2] for row in rows),
+                    commit=False,
+                )
+                with metrics.span("commit", dataset=self.HISTORY_DATASET):
+                    await session.commit()
+        self._history_written(asset_id, rows, inserted)
+        return inserted
+
+    def _history_written(self, asset_id: str, rows: List[tuple], inserted: int) -> None:
+        """Publish a committed history batch to the price index and metrics."""
+        if self.price_index is not None:
+            self.price_index.update_prices(rows)
+        _ROWS_WRITTEN.inc(inserted, dataset=self.HISTORY_DATASET, asset=asset_id)
+
+    def rollup_history(
+        self, asset_id: str, source_interval: str, target_interval: str
+    ) -> int:
+        """
+        Compute a coarser history interval locally from finer stored data.
+
+        Each target bucket stores the average of the source prices inside it,
+        matching how CoinCap reports interval prices. Only buckets fully covered
+        by the source watermark are written, and the target watermark is
+        advanced so the API is not asked for the same span again.
+
+        Args:
+            asset_id: The asset ID to roll up
+            source_interval: Stored finer interval, e.g. m5
+            target_interval: Coarser interval to compute, e.g. h1 or d1
+
+        Returns:
+            int: Number of target rows written
+        """
+        self.check_rollups(source_interval, [target_interval])
+        source_ms = interval_ms(source_interval)
+        bucket_ms = interval_ms(target_interval)
+
+        watermarks = {
+            interval: self.crypto_repo.get_watermarks(
+                [asset_id], self.HISTORY_DATASET, interval
+            ).get(asset_id)
+            for interval in (source_interval, target_interval)
+        }
+        if watermarks[source_interval] is None:
+            logger.info(f"No {source_interval} data to roll up for {asset_id}")
+            return 0
+
+        source_end = int(watermarks[source_interval].timestamp() * 1000) + source_ms
+        end_time = source_end // bucket_ms * bucket_ms
+        start_time = 0
+        if watermarks[target_interval] is not None:
+            start_time = int(watermarks[target_interval].timestamp() * 1000) + bucket_ms
+
+        buckets = self.crypto_repo.aggregate_asset_history(
+            asset_id, source_interval, bucket_ms, start_time, end_time
+        )
+        if not buckets:
+            logger.info(f"No complete {target_interval} buckets for {asset_id}")
+            return 0
+
+        rows = [
+            (
+                asset_id,
+                price,
+                datetime.fromtimestamp(bucket / 1000),
+                bucket,
+                target_interval,
+            )
+            for bucket, price, _ in buckets
+        ]
+        logger.info(
+            f"Rolling up {len(rows)} {target_interval} records for {asset_id} "
+            f"from {source_interval}"
+        )
+        return self._write_history(asset_id, target_interval, rows, update=True)
+
+    @staticmethod
+    def check_rollups(source_interval: str, target_intervals: List[str]) -> None:
+        """
+        Check every target can be rolled up from the source interval.
+
+        Raises:
+            ValueError: For unsupported intervals, or targets that are not a
+                coarser multiple of the source
+        """
+        source_ms = interval_ms(source_interval)
+        for target_interval in target_intervals:
+            bucket_ms = interval_ms(target_interval)
+            if bucket_ms <= source_ms or bucket_ms % source_ms:
+                raise ValueError(
+                    f"Cannot roll up {source_interval} into {target_interval}"
+                )
+
     async def ingest_market_data(
-        self, client: CoinCapClient, asset_id: str, limit: int = 100, offset: int = 0
+        self,
+        client: CoinCapClient,
+        asset_id: str,
+        limit: Optional[int] = 100,
+        offset: int = 0,
     ) -> None:
         """
         Ingest market data for a specific asset.
@@ -98,49 +327,61 @@ class CryptoService:
         Args:
             client: CoinCapClient instance
             asset_id: The asset ID to fetch market data for
-            limit: Number of results to return (default is 100)
+            limit: Number of results to return (default is 100); None fetches
+                every page concurrently with get_all_markets
             offset: Number of results to skip (default is 0)
         """
         try:
             logger.info(
                 f"Fetching market data for {asset_id} with limit={limit}, offset={offset}"
             )
-            market_data = await client.get_markets(asset_id, limit=limit, offset=offset)
+            received = 0
+            changed = 0
+            if limit is None:
+                pages = client.get_all_markets(asset_id, offset=offset)
+            else:
+                pages = client.stream_markets(asset_id, limit=limit, offset=offset)
+            async for market_data in pages:
+                with metrics.span("transform", dataset="markets"):
+                    rows = [
+                        market.model_dump(include=set(MARKET_COLUMNS))
+                        for market in market_data
+                    ]
+                with metrics.span("write", dataset="markets", asset=asset_id):
+                    changed += await self._write_markets(rows)
+                if self.price_index is not None:
+                    self.price_index.update_markets(rows)
+                _ROWS_WRITTEN.inc(len(rows), dataset="markets", asset=asset_id)
+                received += len(rows)
 
-            if not market_data:
+            if not received:
                 logger.warning(f"No market data found for {asset_id}")
                 return
 
-            # Convert API data to database models
-            db_models = []
-            for market in market_data:
-                db_model = Market(
-                    exchange_id=market.exchange_id,
-                    base_id=market.base_id,
-                    quote_id=market.quote_id,
-                    base_symbol=market.base_symbol,
-                    quote_symbol=market.quote_symbol,
-                    volume_usd_24h=market.volume_usd_24h,
-                    price_usd=market.price_usd,
-                    volume_percent=market.volume_percent,
-                )
-                db_models.append(db_model)
-
-            if not db_models:
-                logger.info(f"No market records to insert for {asset_id}")
-                return
-
-            # Insert into database
             logger.info(
-                f"Inserting {len(db_models)} market records for {asset_id} into database"
+                f"Market data ingestion completed successfully for {asset_id}",
+                markets=received,
+                changed=changed,
             )
-            self.crypto_repo.insert_markets(db_models)
-            logger.info(f"Market data ingestion completed successfully for {asset_id}")
 
         except Exception as e:
             logger.error(f"Error during market data ingestion for {asset_id}: {str(e)}")
             raise
 
+    async def _write_markets(self, rows: List[dict]) -> int:
+        """Record a market snapshot page, through the async session when configured."""
+        if self.async_session_factory is None:
+            return self.crypto_repo.upsert_market_snapshots(
+                rows, self.MARKET_CHANGE_THRESHOLD
+            )
+
+        from src.repository.async_crypto_repository import AsyncCryptoRepository
+
+        async with self.async_session_factory() as session:
+            return await AsyncCryptoRepository(session).upsert_market_snapshots(
+                rows, self.MARKET_CHANGE_THRESHOLD
+            )
+
     async def ingest_multiple_assets(
         self,
         client: CoinCapClient,
@@ -148,8 +389,11 @@ class CryptoService:
         start_date: datetime = None,
         ingest_history: bool = True,
         ingest_market: bool = True,
-        market_limit: int = 100,
+        market_limit: Optional[int] = 100,
         market_offset: int = 0,
+        max_workers: int = 1,
+        interval: str = "d1",
+        rollup_intervals: Optional[List[str]] = None,
     ) -> None:
         """
         Ingest historical data for multiple assets.
@@ -160,18 +404,92 @@ class CryptoService:
             start_date: Optional start date for all assets
             ingest_history: Whether to ingest price history data
             ingest_market: Whether to ingest market data
-            market_limit: Number of market results to return (default is 100)
+            market_limit: Number of market results to return (default is 100);
+                None fetches every page
             market_offset: Number of market results to skip (default is 0)
+            max_workers: Number of assets ingested concurrently (default is 1).
+                Values above 1 require a session_factory, since each worker
+                uses its own database session.
+            interval: History interval to fetch from the API (default is d1)
+            rollup_intervals: Coarser intervals (e.g. ["h1", "d1"]) computed
+                locally from the fetched interval instead of fetched again
+
+        Raises:
+            ValueError: If a rollup interval cannot be computed from ``interval``,
+                before any asset is fetched
         """
-        for asset_id in asset_ids:
-            try:
-                if ingest_history:
-                    await self.ingest_asset_history(client, asset_id, start_date)
-                if ingest_market:
-                    await self.ingest_market_data(
-                        client, asset_id, limit=market_limit, offset=market_offset
+        if ingest_history:
+            self.check_rollups(interval, rollup_intervals or [])
+
+        # Plan every asset's resume point up front instead of one query per asset
+        start_dates = {}
+        if ingest_history and start_date is None:
+            start_dates = self.plan_history_start_dates(asset_ids, interval)
+
+        options = dict(
+            ingest_history=ingest_history,
+            ingest_market=ingest_market,
+            market_limit=market_limit,
+            market_offset=market_offset,
+            interval=interval,
+            rollup_intervals=rollup_intervals or [],
+        )
+
+        if max_workers <= 1:
+            for asset_id in asset_ids:
+                await self._ingest_single_asset(
+                    client, asset_id, start_dates.get(asset_id, start_date), **options
+                )
+            return
+
+        if self.session_factory is None:
+            raise ValueError("session_factory is required when max_workers > 1")
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def worker(asset_id: str) -> None:
+            async with semaphore:
+                session = self.session_factory()
+                try:
+                    await CryptoService(
+                        session,
+                        price_index=self.price_index,
+                        async_session_factory=self.async_session_factory,
+                    )._ingest_single_asset(
+                        client,
+                        asset_id,
+                        start_dates.get(asset_id, start_date),
+                        **options,
                     )
-            except Exception as e:
-                logger.error(f"Failed to ingest data for {asset_id}: {str(e)}")
-                # Continue with next asset even if one fails
-                continue
+                finally:
+                    session.close()
+
+        logger.info(
+            f"Ingesting {len(asset_ids)} assets with {max_workers} concurrent workers"
+        )
+        await asyncio.gather(*(worker(asset_id) for asset_id in asset_ids))
+
+    async def _ingest_single_asset(
+        self,
+        client: CoinCapClient,
+        asset_id: str,
+        start_date: Optional[datetime],
+        ingest_history: bool,
+        ingest_market: bool,
+        market_limit: Optional[int],
+        market_offset: int,
+        interval: str,
+        rollup_intervals: List[str],
+    ) -> None:
+        """Ingest one asset, logging failures so the remaining assets still run."""
+        try:
+            if ingest_history:
+                await self.ingest_asset_history(client, asset_id, start_date, interval)
+                for target_interval in rollup_intervals:
+                    self.rollup_history(asset_id, interval, target_interval)
+            if ingest_market:
+                await self.ingest_market_data(
+                    client, asset_id, limit=market_limit, offset=market_offset
+                )
+        except Exception as e:
+            logger.error(f"Failed to ingest data for {asset_id}: {str(e)}")
@@ -0,0 +1,340 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.client.coincap_client import CoinCapClient
+from src.repository.crypto_repository import MARKET_COLUMNS, CryptoRepository
+from src.service.crypto_service import CryptoService
+from src.service.price_index import LatestPriceIndex
+from src.util.intervals import interval_ms
+from src.util.logger import logger
+from src.util.metrics import metrics
+
+# Queue items are (dataset, asset_id, payload); _DONE closes a queue
+_DONE = None
+HISTORY = CryptoService.HISTORY_DATASET
+MARKETS = "markets"
+
+
+class StageMetrics:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+
+    def record(self, rows: int, seconds: float) -> None:
+        self.batches += 1
+        self.rows += rows
+        self.busy_seconds += seconds
+        metrics.histogram(
+            "ingest_stage_seconds", "Time spent in each ingestion stage"
+        ).observe(seconds, stage=f"pipeline_{self.name}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "rows_per_second": (
+                round(self.rows / self.busy_seconds) if self.busy_seconds else 0
+            ),
+        }
+
+
+class IngestionPipeline:
+    """
+    Staged ingestion: fetch -> transform -> write.
+
+    Async fetchers push raw API batches into a bounded queue, a transformer turns
+    them into insert rows, and a single writer runs the bulk inserts on a
+    dedicated thread so the synchronous Session never blocks the event loop.
+    Full queues make the fetchers wait, so memory stays bounded while network
+    and database I/O overlap. When a write fails, every asset in the failed
+    buffer is marked failed: its remaining batches are dropped and its
+    watermark stays before the lost rows, so the next run fetches them again.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        fetch_workers: int = 4,
+        queue_size: int = 16,
+        write_batch_size: int = 5000,
+        price_index: Optional[LatestPriceIndex] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            session_factory: Factory for the writer's and planner's sessions
+            fetch_workers: Assets fetched concurrently
+            queue_size: Batches buffered between stages before fetchers wait
+            write_batch_size: Rows coalesced into one write transaction
+            price_index: Optional LatestPriceIndex updated after every commit
+        """
+        self.session_factory = session_factory
+        self.fetch_workers = fetch_workers
+        self.queue_size = queue_size
+        self.write_batch_size = write_batch_size
+        self.price_index = price_index
+        self.metrics: Dict[str, StageMetrics] = {}
+        self.failed: Set[str] = set()
+
+    async def run(
+        self,
+        client: CoinCapClient,
+        asset_ids: List[str],
+        start_date: Optional[datetime] = None,
+        interval: str = "d1",
+        ingest_history: bool = True,
+        ingest_market: bool = True,
+        market_limit: Optional[int] = 100,
+        market_offset: int = 0,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Ingest history and/or market data for many assets.
+
+        Args:
+            client: CoinCapClient instance
+            asset_ids: List of asset IDs to fetch data for
+            start_date: Optional start date; defaults to each asset's watermark
+            interval: History interval to fetch (default is d1)
+            ingest_history: Whether to ingest price history data
+            ingest_market: Whether to ingest market data
+            market_limit: Number of market results to return (default is 100);
+                None fetches every page
+            market_offset: Number of market results to skip (default is 0)
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Throughput metrics per stage
+        """
+        self.metrics = {
+            name: StageMetrics(name) for name in ("fetch", "transform", "write")
+        }
+        self.failed = set()
+        start_dates: Dict[str, datetime] = {}
+        if ingest_history and start_date is None:
+            with self.session_factory() as session:
+                start_dates = CryptoService(session).plan_history_start_dates(
+                    asset_ids, interval
+                )
+        end_date = datetime.now() - timedelta(milliseconds=interval_ms(interval))
+        end_ms = int(end_date.timestamp() * 1000)
+
+        work: asyncio.Queue = asyncio.Queue()
+        for asset_id in asset_ids:
+            work.put_nowait(asset_id)
+        raw: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        rows: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def fetch_all() -> None:
+            async def fetcher() -> None:
+                while not work.empty():
+                    asset_id = work.get_nowait()
+                    if asset_id in self.failed:
+                        continue
+                    if ingest_history:
+                        start = start_dates.get(asset_id, start_date)
+                        await self._fetch_history(
+                            client, asset_id, interval, start, end_ms, raw
+                        )
+                    if ingest_market:
+                        await self._fetch_markets(
+                            client, asset_id, market_limit, market_offset, raw
+                        )
+
+            await asyncio.gather(*(fetcher() for _ in range(self.fetch_workers)))
+            await raw.put(_DONE)
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer")
+        started = time.perf_counter()
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(fetch_all())
+                group.create_task(self._transform(raw, rows, interval))
+                group.create_task(self._write(rows, executor, interval))
+        finally:
+            executor.shutdown(wait=True)
+
+        summary = {name: stage.as_dict() for name, stage in self.metrics.items()}
+        logger.info(
+            "Ingestion pipeline finished",
+            assets=len(asset_ids),
+            failed_assets=sorted(self.failed),
+            seconds=round(time.perf_counter() - started, 3),
+            **summary,
+        )
+        return summary
+
+    async def _timed_batches(self, batches: Any) -> Any:
+        """Yield batches from an async iterator, timing the wait for each one."""
+        iterator = aiter(batches)
+        while True:
+            started = time.perf_counter()
+            try:
+                batch = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            self.metrics["fetch"].record(len(batch), time.perf_counter() - started)
+            yield batch
+
+    async def _fetch_history(
+        self,
+        client: CoinCapClient,
+        asset_id: str,
+        interval: str,
+        start_date: Optional[datetime],
+        end_ms: int,
+        raw: asyncio.Queue,
+    ) -> None:
+        start_ms = int(
+            (start_date or CryptoService.DEFAULT_START_DATE).timestamp() * 1000
+        )
+        try:
+            async for batch in self._timed_batches(
+                client.iter_history_points(asset_id, interval, start_ms, end_ms)
+            ):
+                if asset_id in self.failed:
+                    break
+                await raw.put((HISTORY, asset_id, batch))
+        except Exception as e:
+            logger.error(f"Failed to fetch history for {asset_id}: {str(e)}")
+
+    async def _fetch_markets(
+        self,
+        client: CoinCapClient,
+        asset_id: str,
+        limit: Optional[int],
+        offset: int,
+        raw: asyncio.Queue,
+    ) -> None:
+        if limit is None:
+            pages = client.get_all_markets(asset_id, offset=offset)
+        else:
+            pages = client.stream_markets(asset_id, limit=limit, offset=offset)
+        try:
+            async for batch in self._timed_batches(pages):
+                if asset_id in self.failed:
+                    break
+                await raw.put((MARKETS, asset_id, batch))
+        except Exception as e:
+            logger.error(f"Failed to fetch markets for {asset_id}: {str(e)}")
+
+    async def _transform(
+        self, raw: asyncio.Queue, rows: asyncio.Queue, interval: str
+    ) -> None:
+        while (item := await raw.get()) is not _DONE:
+            dataset, asset_id, batch = item
+            started = time.perf_counter()
+            if dataset == HISTORY:
+                converted = [
+                    (
+                        asset_id,
+                        point["price_usd"],
+                        datetime.fromtimestamp(point["time"] / 1000),
+                        point["time"],
+                        interval,
+                    )
+                    for point in batch
+                ]
+            else:
+                converted = [
+                    market.model_dump(include=set(MARKET_COLUMNS)) for market in batch
+                ]
+            self.metrics["transform"].record(
+                len(converted), time.perf_counter() - started
+            )
+            await rows.put((dataset, asset_id, converted))
+        await rows.put(_DONE)
+
+    async def _write(
+        self, rows: asyncio.Queue, executor: ThreadPoolExecutor, interval: str
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        session = await loop.run_in_executor(executor, self.session_factory)
+        try:
+            done = False
+            while not done:
+                item = await rows.get()
+                if item is _DONE:
+                    break
+                # Coalesce whatever is already queued into one transaction
+                buffer = [item]
+                count = len(item[2])
+                while count < self.write_batch_size and not rows.empty():
+                    item = rows.get_nowait()
+                    if item is _DONE:
+                        done = True
+                        break
+                    buffer.append(item)
+                    count += len(item[2])
+                await loop.run_in_executor(
+                    executor, self._flush, session, buffer, interval
+                )
+        finally:
+            await loop.run_in_executor(executor, session.close)
+
+    def _flush(
+        self,
+        session: Session,
+        buffer: List[Tuple[str, str, list]],
+        interval: str,
+    ) -> None:
+        """
+        Write one coalesced buffer and its watermarks in a single transaction.
+
+        Batches of assets whose earlier writes failed are skipped: committing
+        them would move the watermark past rows that were never stored.
+        """
+        started = time.perf_counter()
+        repo = CryptoRepository(session)
+        buffer = [item for item in buffer if item[1] not in self.failed]
+        if not buffer:
+            return
+        history = [
+            row for dataset, _, batch in buffer if dataset == HISTORY for row in batch
+        ]
+        markets = [
+            row for dataset, _, batch in buffer if dataset == MARKETS for row in batch
+        ]
+        watermarks: Dict[str, datetime] = {}
+        for dataset, asset_id, batch in buffer:
+            if dataset == HISTORY and batch:
+                latest = max(row[2] for row in batch)
+                watermarks[asset_id] = max(latest, watermarks.get(asset_id, latest))
+
+        try:
+            if len(history) >= CryptoService.BULK_LOAD_THRESHOLD:
+                repo.bulk_load_asset_histories(history, commit=False)
+            elif history:
+                repo.upsert_asset_histories(history, commit=False)
+            if markets:
+                repo.upsert_market_snapshots(
+                    markets, CryptoService.MARKET_CHANGE_THRESHOLD, commit=False
+                )
+            for asset_id, latest in watermarks.items():
+                repo.set_watermark(asset_id, HISTORY, interval, latest, commit=False)
+            with metrics.span("commit", dataset="pipeline"):
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            assets = {asset_id for _, asset_id, _ in buffer}
+            self.failed.update(assets)
+            logger.error(f"Failed to write batch for {sorted(assets)}: {str(e)}")
+            return
+        if self.price_index is not None:
+            self.price_index.update_prices(history)
+            self.price_index.update_markets(markets)
+        self.metrics["write"].record(
+            len(history) + len(markets), time.perf_counter() - started
+        )
+        rows_written = metrics.counter("ingest_rows_total")
+        for dataset, asset_id, batch in buffer:
+            rows_written.inc(len(batch), dataset=dataset, asset=asset_id)
@@ -0,0 +1,318 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy.orm import Session
+
+from src.repository.crypto_repository import (
+    ASSET_HISTORY_COLUMNS,
+    MARKET_COLUMNS,
+    CryptoRepository,
+    _as_dict,
+)
+from src.util.metrics import metrics
+
+Pair = Tuple[str, str, str]  # (base_id, quote_id, exchange_id)
+
+# Hits are only counted in-process (see stats()) to keep them allocation-free
+_MISSES = metrics.counter(
+    "price_index_misses_total", "Latest price index lookups loaded from the database"
+)
+
+
+class LatestPrice(NamedTuple):
+    asset_id: str
+    price_usd: Decimal
+    date: datetime
+    time: int
+
+
+class LatestMarket(NamedTuple):
+    base_id: str
+    quote_id: str
+    exchange_id: str
+    price_usd: Decimal
+    volume_usd_24h: Decimal
+    volume_percent: Decimal
+    updated_at: datetime
+
+
+# get() result for keys that are not cached (or too old); a cached None means
+# the database has no row, so unknown keys do not hit it on every lookup
+_UNCACHED = object()
+
+
+class _LRU:
+    """Thread-safe bounded map with least-recently-used eviction."""
+
+    def __init__(self, max_size: int, max_age: Optional[float]):
+        self.max_size = max_size
+        self.max_age = max_age
+        # key -> (value, loaded_at monotonic seconds)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _UNCACHED
+            if self.max_age is not None and time.monotonic() - entry[1] > self.max_age:
+                del self._entries[key]
+                return _UNCACHED
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        loaded_at = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, loaded_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def put_if(self, key: Hashable, value: Any, newer: Callable[[Any], bool]) -> None:
+        """Replace a cached value when ``newer(cached)`` holds; skip uncached keys."""
+        loaded_at = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and newer(entry[0]):
+                self._entries[key] = (value, loaded_at)
+
+    def discard(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LatestPriceIndex:
+    """
+    In-memory index of the latest price per asset and latest state per market.
+
+    Lookups are read-through: hits are served from memory, misses are loaded
+    from the database (many at once for bulk lookups) and remembered,
+    including keys the database does not know. ``warm()`` fills the index
+    with one query per dataset. Ingestion keeps it current: CryptoService and
+    IngestionPipeline call ``update_prices``/``update_markets`` after each
+    commit when given the index. Both maps are bounded and evict the least
+    recently used keys; ``max_age`` additionally bounds staleness when other
+    processes write to the same database.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: str = "d1",
+        max_assets: int = 10_000,
+        max_markets: int = 100_000,
+        max_age: Optional[float] = None,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            session_factory: Factory for the sessions used on misses and warm-up
+            interval: History interval the prices are read from
+            max_assets: Assets kept in memory
+            max_markets: Markets kept in memory
+            max_age: Seconds after which an entry is reloaded; None keeps entries
+                until evicted or updated by ingestion
+        """
+        self.session_factory = session_factory
+        self.interval = interval
+        self._prices = _LRU(max_assets, max_age)
+        self._markets = _LRU(max_markets, max_age)
+        self.hits = 0
+        self.misses = 0
+
+    def warm(self) -> int:
+        """
+        Load the latest price of every asset and the state of every market.
+
+        Returns:
+            int: Entries loaded
+        """
+        with self.session_factory() as session:
+            repo = CryptoRepository(session)
+            prices = repo.get_latest_prices(
+                None, self.interval, limit=self._prices.max_size
+            )
+            markets = repo.get_current_markets_by_pair(
+                None, limit=self._markets.max_size
+            )
+            for row in prices:
+                self._prices.put(row[0], LatestPrice(*row))
+            for market in markets:
+                self._markets.put(_pair(market), _latest_market(market))
+        return len(prices) + len(markets)
+
+    def price(self, asset_id: str) -> Optional[LatestPrice]:
+        """Latest stored price of an asset, or None if it has none."""
+        value = self._prices.get(asset_id)
+        if value is not _UNCACHED:
+            self.hits += 1
+            return value
+        return self.prices([asset_id]).get(asset_id)
+
+    def prices(self, asset_ids: Iterable[str]) -> Dict[str, LatestPrice]:
+        """
+        Latest stored prices of many assets; misses are loaded in one query.
+
+        Returns:
+            Dict[str, LatestPrice]: Prices by asset ID, without unknown assets
+        """
+        found, missing = self._lookup(self._prices, asset_ids)
+        if missing:
+            with self.session_factory() as session:
+                rows = CryptoRepository(session).get_latest_prices(
+                    missing, self.interval
+                )
+            loaded = {row[0]: LatestPrice(*row) for row in rows}
+            for asset_id in missing:
+                self._prices.put(asset_id, loaded.get(asset_id))
+            found.update(loaded)
+        return found
+
+    def market(
+        self, base_id: str, quote_id: str, exchange_id: str
+    ) -> Optional[LatestMarket]:
+        """Latest state of one market, or None if it is unknown."""
+        key = (base_id, quote_id, exchange_id)
+        value = self._markets.get(key)
+        if value is not _UNCACHED:
+            self.hits += 1
+            return value
+        return self.markets([key]).get(key)
+
+    def markets(self, pairs: Iterable[Pair]) -> Dict[Pair, LatestMarket]:
+        """
+        Latest state of many markets; misses are loaded in one query.
+
+        Returns:
+            Dict[Pair, LatestMarket]: Markets by (base_id, quote_id, exchange_id)
+        """
+        found, missing = self._lookup(self._markets, pairs)
+        if missing:
+            with self.session_factory() as session:
+                rows = CryptoRepository(session).get_current_markets_by_pair(missing)
+            loaded = {_pair(market): _latest_market(market) for market in rows}
+            for key in missing:
+                self._markets.put(key, loaded.get(key))
+            found.update(loaded)
+        return found
+
+    def _lookup(self, cache: _LRU, keys: Iterable[Hashable]) -> Tuple[dict, list]:
+        found, missing = {}, []
+        keys = dict.fromkeys(keys)
+        for key in keys:
+            value = cache.get(key)
+            if value is _UNCACHED:
+                missing.append(key)
+            elif value is not None:
+                found[key] = value
+        self.hits += len(keys) - len(missing)
+        if missing:
+            self.misses += len(missing)
+            _MISSES.inc(len(missing))
+        return found, missing
+
+    def update_prices(self, rows: Iterable[Any]) -> None:
+        """
+        Apply committed history rows.
+
+        Only cached assets are updated, and only by points at least as recent
+        as the cached one: a backfill of older dates leaves the latest price
+        alone, and assets not in memory are loaded on their next lookup.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in ASSET_HISTORY_COLUMNS
+                order
+        """
+        newest: Dict[str, LatestPrice] = {}
+        for row in rows:
+            values = _as_dict(row, ASSET_HISTORY_COLUMNS)
+            # A missing trailing interval defaults to d1, as in the repository
+            if (values.get("interval") or "d1") != self.interval:
+                continue
+            point = LatestPrice(
+                values["asset_id"], values["price_usd"], values["date"], values["time"]
+            )
+            current = newest.get(point.asset_id)
+            if current is None or point.date >= current.date:
+                newest[point.asset_id] = point
+        for asset_id, point in newest.items():
+            self._prices.put_if(
+                asset_id,
+                point,
+                lambda cached: cached is None or point.date >= cached.date,
+            )
+
+    def update_markets(self, rows: Iterable[Any]) -> None:
+        """
+        Apply committed market snapshots; they are the markets' current state.
+
+        Args:
+            rows: Dicts keyed by column name, or tuples in MARKET_COLUMNS order
+        """
+        now = datetime.utcnow()
+        for row in rows:
+            values = _as_dict(row, MARKET_COLUMNS)
+            market = LatestMarket(
+                values["base_id"],
+                values["quote_id"],
+                values["exchange_id"],
+                values["price_usd"],
+                values["volume_usd_24h"],
+                values["volume_percent"],
+                now,
+            )
+            self._markets.put(market[:3], market)
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after writes that bypassed ingestion."""
+        self._prices.discard()
+        self._markets.discard()
+
+    def stats(self) -> dict:
+        return {
+            "price_index_hits": self.hits,
+            "price_index_misses": self.misses,
+            "price_index_assets": len(self._prices),
+            "price_index_markets": len(self._markets),
+            "price_index_evictions": self._prices.evictions + self._markets.evictions,
+        }
+
+
+def _pair(market: Any) -> Pair:
+    return (market.base_id, market.quote_id, market.exchange_id)
+
+
+def _latest_market(market: Any) -> LatestMarket:
+    return LatestMarket(
+        market.base_id,
+        market.quote_id,
+        market.exchange_id,
+        market.price_usd,
+        market.volume_usd_24h,
+        market.volume_percent,
+        market.updated_at,
+    )
@@ -0,0 +1,114 @@
+import asyncio
+import os
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.client.coincap_client import CoinCapClient
+from src.repository.crypto_repository import (
+    ASSET_COLUMNS,
+    ASSET_ORDERINGS,
+    CryptoRepository,
+)
+from src.util.logger import logger
+from src.util.metrics import metrics
+
+
+class UniversePlanner:
+    """
+    Picks the assets to ingest from the CoinCap asset listing.
+
+    The listing is fetched page by page (concurrently when the whole listing is
+    needed), stored in the ``assets`` table and the top ``size`` assets by
+    rank, market cap or 24h volume are returned best first, so ingestion
+    handles the most liquid assets before the long tail.
+    """
+
+    DEFAULT_SIZE = int(os.getenv("UNIVERSE_SIZE", "100"))
+    DEFAULT_BY = os.getenv("UNIVERSE_BY", "rank")
+
+    def __init__(
+        self,
+        session: Session,
+        size: Optional[int] = None,
+        by: Optional[str] = None,
+        min_volume_usd: Optional[float] = None,
+        exclude: Iterable[str] = (),
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            session: Database session storing the asset listing
+            size: Number of assets in the universe (default UNIVERSE_SIZE or 100)
+            by: "rank", "market_cap" or "volume" (default UNIVERSE_BY or rank)
+            min_volume_usd: Leave out assets trading less than this in 24 hours
+            exclude: Asset IDs never included, e.g. stablecoins
+        """
+        self.crypto_repo = CryptoRepository(session)
+        self.size = size or self.DEFAULT_SIZE
+        self.by = by or self.DEFAULT_BY
+        if self.by not in ASSET_ORDERINGS:
+            raise ValueError(
+                f"Unknown asset ordering {self.by!r}; "
+                f"use one of {sorted(ASSET_ORDERINGS)}"
+            )
+        self.min_volume_usd = min_volume_usd
+        self.exclude = list(exclude)
+
+    async def refresh(self, client: CoinCapClient) -> int:
+        """
+        Fetch the asset listing and store it in place of the previous one.
+
+        The listing is served by rank, so ranking by rank without filters only
+        needs the first ``size`` assets, fetched as concurrent pages; any other
+        ordering needs the whole listing. Assets not returned by this refresh
+        are removed, so earlier, larger refreshes never leave stale ranks.
+
+        Returns:
+            int: Number of assets stored
+        """
+        with metrics.span("universe_fetch", by=self.by):
+            if self.by == "rank" and not self.min_volume_usd and not self.exclude:
+                page_size = client.ASSETS_PAGE_SIZE
+                pages = await asyncio.gather(
+                    *(
+                        client.get_assets(
+                            limit=min(page_size, self.size - offset), offset=offset
+                        )
+                        for offset in range(0, self.size, page_size)
+                    )
+                )
+            else:
+                pages = [page async for page in client.get_all_assets()]
+
+        rows = [
+            asset.model_dump(include=set(ASSET_COLUMNS))
+            for page in pages
+            for asset in page
+        ]
+        return self.crypto_repo.upsert_assets(rows, replace=True)
+
+    def plan(self) -> List[str]:
+        """Asset IDs of the universe from the stored listing, best first."""
+        return self.crypto_repo.get_top_assets(
+            self.size, self.by, self.min_volume_usd, self.exclude
+        )
+
+    async def discover(self, client: CoinCapClient) -> List[str]:
+        """
+        Refresh the listing and return the universe, best first.
+
+        If the listing cannot be fetched or stored, the previously stored one
+        is used.
+        """
+        try:
+            stored = await self.refresh(client)
+            logger.info("Asset listing refreshed", assets=stored, by=self.by)
+        except Exception as e:
+            # A failed write leaves the transaction unusable for plan()
+            self.crypto_repo.session.rollback()
+            logger.error(f"Failed to refresh asset listing: {str(e)}")
+        asset_ids = self.plan()
+        logger.info(f"Asset universe has {len(asset_ids)} assets", by=self.by)
+        return asset_ids
@@ -1,14 +1,17 @@
 import os
-from typing import Generator
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Dict, Generator
 
-from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import QueuePool
 
+from . import env  # noqa: F401  (loads .env before DATABASE_URL is read)
 from .logger import logger
 
-load_dotenv()
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 # Get database URL from environment variable
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./local.db")
@@ -16,20 +19,58 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./local.db")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-# Configure the engine with connection pooling and timeouts
-engine = create_engine(
-    DATABASE_URL,  # "sqlite:///./local.db",
-    poolclass=QueuePool,
-    pool_size=5,  # Number of connections to keep open
-    max_overflow=10,  # Maximum number of connections to create above pool_size
-    pool_timeout=30,  # Seconds to wait before giving up on getting a connection
-    pool_recycle=1800,  # Recycle connections after 30 minutes
-    pool_pre_ping=True,  # Enable connection health checks
-    echo=False,  # Set to True for SQL query logging
-)
+# Async drivers used for each sync driver scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def pool_options() -> Dict[str, Any]:
+    """Connection pool settings, overridable through DB_POOL_* variables."""
+    return {
+        # Number of connections to keep open
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        # Maximum number of connections to create above pool_size
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        # Seconds to wait before giving up on getting a connection
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Recycle connections after 30 minutes
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_engine(url: str = DATABASE_URL) -> "Engine":
+    """
+    Get the shared engine, with connection pooling and timeouts.
+
+    The engine is created on first use, so importing this module neither
+    builds a pool nor touches the database.
+    """
+    return create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_pre_ping=True,  # Enable connection health checks
+        echo=False,  # Set to True for SQL query logging
+        **pool_options(),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_session_factory(url: str = DATABASE_URL) -> sessionmaker:
+    """Get the session factory bound to the shared engine."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine(url))
+
+
+def __getattr__(name: str) -> Any:
+    """Keep ``engine`` and ``SessionLocal`` importable, built on first access."""
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -37,7 +78,7 @@ def get_db() -> Generator[Session, None, None]:
     Dependency function to get database session.
     Yields a database session and ensures it's closed after use.
     """
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     except Exception as e:
@@ -45,3 +86,51 @@ def get_db() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """Swap the sync driver of a database URL for its asyncio counterpart."""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+@lru_cache(maxsize=None)
+def get_async_engine(url: str = DATABASE_URL) -> "AsyncEngine":
+    """
+    Get the shared async engine (asyncpg for PostgreSQL, aiosqlite for SQLite).
+
+    The engine is created on first use so the async drivers are only required
+    by code paths that actually talk to the database asynchronously.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(url)
+    options: Dict[str, Any] = {"pool_pre_ping": True, "echo": False}
+    if not url.startswith("sqlite"):
+        options.update(pool_options())
+    return create_async_engine(url, **options)
+
+
+@lru_cache(maxsize=None)
+def get_async_session_factory(
+    url: str = DATABASE_URL,
+) -> "async_sessionmaker[AsyncSession]":
+    """Get the async session factory bound to the shared async engine."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(
+        get_async_engine(url), autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    """
+    Async counterpart of get_db.
+    Yields an async database session and ensures it's closed after use.
+    """
+    async with get_async_session_factory()() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error("Database error", error=str(e))
+            raise
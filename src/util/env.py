@@ -0,0 +1,10 @@
+"""
+Loads the project's .env file into the environment.
+
+Modules that read settings at import time import this module first; Python
+caches the import, so the file is located and parsed once per process.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,42 @@
+from typing import Dict, Iterator, Tuple
+
+# Length of each CoinCap history interval in milliseconds
+INTERVAL_MS: Dict[str, int] = {
+    "m1": 60_000,
+    "m5": 5 * 60_000,
+    "m15": 15 * 60_000,
+    "m30": 30 * 60_000,
+    "h1": 3_600_000,
+    "h2": 2 * 3_600_000,
+    "h6": 6 * 3_600_000,
+    "h12": 12 * 3_600_000,
+    "d1": 24 * 3_600_000,
+}
+
+
+def interval_ms(interval: str) -> int:
+    """Get the length of a CoinCap interval in milliseconds."""
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported interval: {interval}") from None
+
+
+def history_windows(
+    start: int, end: int, interval: str, points_per_window: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    Split an inclusive [start, end] range in milliseconds into request windows.
+
+    Each window covers at most ``points_per_window`` points of ``interval`` and
+    windows do not overlap.
+
+    Yields:
+        Tuple[int, int]: Inclusive (start, end) of each window in milliseconds
+    """
+    span = interval_ms(interval) * points_per_window
+    window_start = start
+    while window_start <= end:
+        window_end = min(window_start + span - 1, end)
+        yield window_start, window_end
+        window_start = window_end + 1
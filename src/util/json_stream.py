@@ -0,0 +1,107 @@
+import codecs
+import json
+from typing import Any, AsyncIterator
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _JsonStream:
+    """Incremental reader over a JSON document arriving as byte chunks."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    async def _more(self) -> bool:
+        """Append the next chunk to the buffer, dropping consumed text."""
+        if self._eof:
+            return False
+        chunk = await anext(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._utf8.decode(b"", final=True)
+        else:
+            text = self._utf8.decode(chunk)
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return True
+
+    async def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while (
+                self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not await self._more():
+                raise ValueError("Unexpected end of JSON stream")
+
+    async def expect(self, char: str) -> None:
+        found = await self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self._pos += 1
+
+    async def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        await self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not await self._more():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and await self._more():
+                continue
+            self._pos = end
+            return value
+
+
+async def iter_json_array(
+    chunks: AsyncIterator[bytes], key: str = "data"
+) -> AsyncIterator[Any]:
+    """
+    Yield the elements of a top-level JSON array without loading the whole body.
+
+    Only one element at a time is decoded; the response text already consumed is
+    discarded, so memory stays bounded by the chunk and element sizes.
+
+    Args:
+        chunks: Raw response bytes, e.g. ``httpx.Response.aiter_bytes()``
+        key: Name of the array member of the top-level JSON object
+
+    Yields:
+        Any: Each decoded element of the array
+    """
+    stream = _JsonStream(chunks)
+    await stream.expect("{")
+    while True:
+        char = await stream.peek()
+        if char == "}":
+            return
+        if char == ",":
+            await stream.expect(",")
+            continue
+        name = await stream.value()
+        await stream.expect(":")
+        if name != key:
+            await stream.value()
+            continue
+
+        await stream.expect("[")
+        while True:
+            char = await stream.peek()
+            if char == "]":
+                return
+            if char == ",":
+                await stream.expect(",")
+                continue
+            yield await stream.value()
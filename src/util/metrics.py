@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# Default histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, one series per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(_labels(labels), 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts with a trailing +Inf slot, sum, count)
+        self._series: Dict[Labels, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            counts, total, count = self._series.get(
+                key, ([0] * (len(self.buckets) + 1), 0.0, 0)
+            )
+            counts[bisect_left(self.buckets, value)] += 1
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: object) -> int:
+        series = self._series.get(_labels(labels))
+        return series[2] if series else 0
+
+    def sum(self, **labels: object) -> float:
+        series = self._series.get(_labels(labels))
+        return series[1] if series else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def totals(self) -> Dict[Labels, Tuple[int, float]]:
+        """(count, sum) of every label set."""
+        with self._lock:
+            return {
+                labels: (count, total)
+                for labels, (_, total, count) in self._series.items()
+            }
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = sorted(
+                (labels, (list(counts), total, count))
+                for labels, (counts, total, count) in self._series.items()
+            )
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = _format_labels(labels, (("le", bound),))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of counters and histograms.
+
+    Metrics are created on first use and rendered in the Prometheus text
+    exposition format, either served over HTTP or dumped to a file.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[Counter, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str = "") -> Counter:
+        return self._get(Counter, name, documentation)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str = "",
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, documentation, buckets)
+
+    def _get(self, kind: type, name: str, *args: object) -> Union[Counter, Histogram]:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = kind(name, *args)
+            elif not isinstance(metric, kind):
+                raise ValueError(f"Metric {name} is already a {metric.kind}")
+            return metric
+
+    @contextmanager
+    def span(self, stage: str, **labels: object) -> Iterator[None]:
+        """
+        Time a block into the ``ingest_stage_seconds`` histogram.
+
+        Args:
+            stage: Stage name, e.g. "validate" or "write"
+            **labels: Extra labels such as asset or endpoint
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(
+                "ingest_stage_seconds", "Time spent in each ingestion stage"
+            ).observe(time.perf_counter() - started, stage=stage, **labels)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        for name, metric in metrics:
+            if metric.documentation:
+                lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """Write the rendered metrics to a file, atomically."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port: int = 9108, addr: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """
+        Serve the metrics at ``/metrics`` from a daemon thread.
+
+        Returns:
+            ThreadingHTTPServer: The running server; call ``shutdown()`` to stop it
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        server = ThreadingHTTPServer((addr, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def reset(self) -> None:
+        """Zero every metric, keeping the instances modules already hold."""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+
+
+# Create a global metrics registry
+metrics = MetricsRegistry()
+
+
+def start_from_env() -> Optional[ThreadingHTTPServer]:
+    """Start the metrics endpoint when METRICS_PORT is set."""
+    port = os.getenv("METRICS_PORT")
+    return metrics.serve(int(port)) if port else None
@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.client.coincap_client import CoinCapClient
+from src.repository.crypto_repository import ASSET_ORDERINGS
+from src.repository.lease_repository import LeaseRepository
+from src.service.crypto_service import CryptoService
+from src.service.universe import UniversePlanner
+from src.util.logger import logger
+
+LEASE_SECONDS = float(os.getenv("WORKER_LEASE_SECONDS", "300"))
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def run_worker(
+    session_factory: Callable[[], Session],
+    client: CoinCapClient,
+    owner: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    ingest_history: bool = True,
+    ingest_market: bool = True,
+    market_limit: Optional[int] = 100,
+    market_offset: int = 0,
+    interval: str = "d1",
+    lease_seconds: float = LEASE_SECONDS,
+    max_attempts: int = 3,
+) -> int:
+    """
+    Ingest assets leased from the asset_leases queue until none are left.
+
+    While an asset is being ingested its lease is renewed in the background
+    every third of ``lease_seconds``; if the worker dies, the lease expires and
+    another worker picks the asset up.
+
+    Args:
+        session_factory: Factory for the worker's database sessions
+        client: CoinCapClient instance
+        owner: Worker identifier (defaults to host:pid)
+        start_date: Optional start date; defaults to each asset's watermark
+        ingest_history: Whether to ingest price history data
+        ingest_market: Whether to ingest market data
+        market_limit: Number of market results to return; None fetches all pages
+        market_offset: Number of market results to skip (default is 0)
+        interval: History interval to fetch (default is d1)
+        lease_seconds: Lease length
+        max_attempts: Leases granted per asset before it is given up on
+
+    Returns:
+        int: Number of assets completed by this worker
+    """
+    owner = owner or worker_id()
+    completed = 0
+    with session_factory() as lease_session, session_factory() as session:
+        leases = LeaseRepository(lease_session)
+        service = CryptoService(session)
+        while True:
+            leased = leases.acquire(owner, lease_seconds, max_attempts=max_attempts)
+            if not leased:
+                break
+            asset_id = leased[0]
+
+            async def heartbeat() -> None:
+                while True:
+                    await asyncio.sleep(lease_seconds / 3)
+                    if not leases.renew(owner, asset_id, lease_seconds):
+                        logger.warning(f"Lost lease on {asset_id}", owner=owner)
+                        return
+
+            renewer = asyncio.create_task(heartbeat())
+            try:
+                if ingest_history:
+                    await service.ingest_asset_history(
+                        client, asset_id, start_date, interval
+                    )
+                if ingest_market:
+                    await service.ingest_market_data(
+                        client, asset_id, limit=market_limit, offset=market_offset
+                    )
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Worker failed to ingest {asset_id}: {str(e)}")
+                leases.release(owner, asset_id)
+                continue
+            finally:
+                renewer.cancel()
+            leases.complete(owner, asset_id)
+            completed += 1
+    logger.info("Worker finished", owner=owner, completed=completed)
+    return completed
+
+
+def _process_main(options: dict) -> None:
+    """Entry point of one worker process; it builds its own engine and client."""
+    from src.util.db import get_session_factory
+
+    async def run() -> None:
+        async with CoinCapClient(os.getenv("COINCAP_API_KEY")) as client:
+            await run_worker(get_session_factory(), client, **options)
+
+    asyncio.run(run())
+
+
+def _discover(universe_size: int, universe_by: str) -> List[str]:
+    from src.util.db import get_session_factory
+
+    async def run() -> List[str]:
+        async with CoinCapClient(os.getenv("COINCAP_API_KEY")) as client:
+            with get_session_factory()() as session:
+                planner = UniversePlanner(session, size=universe_size, by=universe_by)
+                return await planner.discover(client)
+
+    return asyncio.run(run())
+
+
+def run_workers(
+    processes: int,
+    asset_ids: Optional[List[str]] = None,
+    universe_size: Optional[int] = None,
+    universe_by: str = "rank",
+    **options,
+):
+    """
+    Enqueue assets (if given) and ingest them with ``processes`` worker processes.
+
+    With ``universe_size`` the top assets of the CoinCap listing are enqueued
+    instead, most liquid first. Workers on other machines can join the same
+    queue by running this module against the same DATABASE_URL without
+    --assets or --universe-size.
+    """
+    from src.migrations import migrate
+    from src.util.db import get_engine, get_session_factory
+
+    engine = get_engine()
+    migrate(engine)
+    if not asset_ids and universe_size:
+        asset_ids = _discover(universe_size, universe_by)
+    if asset_ids:
+        with get_session_factory()() as session:
+            LeaseRepository(session).enqueue(asset_ids)
+    engine.dispose()
+
+    # spawn gives every worker a fresh interpreter, engine and connection pool
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_process_main, args=(options,), name=f"worker-{i}")
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run leased ingestion workers")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--assets", nargs="+", help="Assets to enqueue first")
+    parser.add_argument(
+        "--universe-size", type=int, help="Enqueue the top N listed assets instead"
+    )
+    parser.add_argument(
+        "--universe-by", choices=sorted(ASSET_ORDERINGS), default="rank"
+    )
+    parser.add_argument("--interval", default="d1")
+    parser.add_argument("--start-date", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--no-history", action="store_true")
+    parser.add_argument("--no-market", action="store_true")
+    parser.add_argument("--market-limit", type=int, default=100)
+    parser.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    args = parser.parse_args()
+    run_workers(
+        args.processes,
+        args.assets,
+        universe_size=args.universe_size,
+        universe_by=args.universe_by,
+        start_date=args.start_date,
+        ingest_history=not args.no_history,
+        ingest_market=not args.no_market,
+        market_limit=args.market_limit,
+        interval=args.interval,
+        lease_seconds=args.lease_seconds,
+        max_attempts=args.max_attempts,
+    )
@@ -0,0 +1,66 @@
+import math
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.analytics.price_matrix import load_price_matrix  # noqa: E402
+from src.analytics.risk import (  # noqa: E402
+    correlation,
+    drawdown,
+    max_drawdown,
+    returns,
+    rolling_volatility,
+)
+from src.repository.crypto_repository import CryptoRepository  # noqa: E402
+
+NAN = float("nan")
+
+
+def test_load_price_matrix_aligns_assets_and_masks_gaps(session):
+    start = datetime(2024, 5, 1)
+    points = [("bitcoin", 0, 1.0), ("bitcoin", 1, 2.0), ("bitcoin", 3, 4.0)]
+    points.append(("ethereum", 2, 10.0))
+    rows = []
+    for asset_id, day, price in points:
+        date = start + timedelta(days=day)
+        rows.append((asset_id, price, date, int(date.timestamp() * 1000), "d1"))
+    CryptoRepository(session).upsert_asset_histories(rows)
+
+    matrix = load_price_matrix(
+        session, ["ethereum", "bitcoin", "solana"], start, start + timedelta(days=4)
+    )
+
+    assert matrix.prices.shape == (3, 4)
+    np.testing.assert_array_equal(matrix.row("bitcoin"), [1.0, 2.0, NAN, 4.0])
+    np.testing.assert_array_equal(matrix.row("ethereum"), [NAN, NAN, 10.0, NAN])
+    assert matrix.coverage() == {"ethereum": 0.25, "bitcoin": 0.75, "solana": 0.0}
+    assert matrix.dates[0] == np.datetime64(start, "ms")
+
+
+def test_metrics_match_naive_loops():
+    prices = np.array(
+        [
+            [100.0, 110.0, 99.0, NAN, 120.0, 90.0, 95.0],
+            [50.0, 52.0, 51.0, 55.0, 54.0, 53.0, 58.0],
+        ]
+    )
+    result = returns(prices)
+    assert math.isnan(result[0, 3]) and math.isnan(result[0, 4])
+    assert result[1, 1] == pytest.approx(0.04)
+
+    volatility = rolling_volatility(result, window=3)
+    expected = statistics.stdev(result[1, 4:7])
+    assert volatility[1, 6] == pytest.approx(expected)
+    assert math.isnan(volatility[0, 4])  # only one return observed in the window
+
+    both = ~np.isnan(result).any(axis=0)
+    expected = np.corrcoef(result[0, both], result[1, both])[0, 1]
+    matrix = correlation(result)
+    assert matrix[0, 1] == pytest.approx(expected)
+    assert matrix[0, 0] == pytest.approx(1.0)
+
+    np.testing.assert_allclose(drawdown(prices)[0, :4], [0, 0, -0.1, -0.1])
+    np.testing.assert_allclose(max_drawdown(prices), [-0.25, 53 / 55 - 1])
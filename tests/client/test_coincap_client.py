@@ -0,0 +1,290 @@
+import asyncio
+import gzip
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+import httpx
+
+from src.client.cache import ResponseCache
+from src.client.coincap_client import CoinCapClient, negotiate_encodings
+from src.client.rate_limiter import TokenBucket, parse_retry_after
+from src.util.metrics import metrics
+
+EXAMPLES = Path(__file__).resolve().parents[2] / "src" / "examples"
+BASE_URL = "https://coincap.test/v3"
+
+
+def example(name):
+    return json.loads((EXAMPLES / name).read_text())
+
+
+def make_client(handler, **kwargs):
+    return CoinCapClient(
+        base_url=BASE_URL, transport=httpx.MockTransport(handler), **kwargs
+    )
+
+
+def test_token_bucket_limits_sustained_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(7):
+            await bucket.acquire()
+        return time.monotonic() - started, bucket
+
+    elapsed, bucket = asyncio.run(run())
+    # 2 burst tokens are free, the remaining 5 need 1/50s each
+    assert elapsed >= 0.09
+    assert bucket.throttled_requests == 5
+    assert bucket.throttled_seconds > 0
+
+
+def test_token_bucket_pause_drops_the_burst():
+    async def run():
+        bucket = TokenBucket(rate=20, burst=5)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # 0.1s pause, then tokens accrue from zero: 3 requests need 3/20s more
+    assert asyncio.run(run()) >= 0.24
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_rate_limited_request_honors_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        return httpx.Response(200, json=example("slug_history.json"))
+
+    async def run():
+        async with make_client(handler) as client:
+            history = await client.get_history("bitcoin")
+            return history, client.throttle_stats()
+
+    rate_limited = metrics.counter("coincap_rate_limited_total")
+    before = rate_limited.value(endpoint="/assets/{id}/history")
+    history, stats = asyncio.run(run())
+    assert len(history) == 3
+    assert calls[1] - calls[0] >= 0.05
+    assert rate_limited.value(endpoint="/assets/{id}/history") == before + 1
+    assert stats["rate_limited_responses"] == 1
+    assert stats["retries"] == 1
+    assert stats["backoff_seconds"] == 0.05
+
+
+def test_iter_history_fetches_windows_concurrently_in_order():
+    day = 86_400_000
+    start = 1_714_262_400_000
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        window_start = int(request.url.params["start"])
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        # later windows answer first; the boundary point is repeated on purpose
+        await asyncio.sleep(0.05 - (window_start - start) / day * 0.001)
+        in_flight["now"] -= 1
+        points = [window_start + i * 60_000 for i in range(3)] + [window_start]
+        return httpx.Response(
+            200,
+            json={
+                "data": [
+                    {"priceUsd": "1", "time": t, "date": "2024-04-28T00:00:00.000Z"}
+                    for t in points
+                ]
+            },
+        )
+
+    async def run():
+        async with make_client(handler, rate_limit=0) as client:
+            return [
+                batch
+                async for batch in client.iter_history(
+                    "bitcoin", "m1", start, start + 5 * day - 1, max_concurrency=3
+                )
+            ]
+
+    batches = asyncio.run(run())
+    times = [item.time for batch in batches for item in batch]
+    assert len(batches) == 5
+    assert times == sorted(set(times))
+    assert in_flight["max"] == 3
+
+
+def test_stream_markets_yields_validated_batches():
+    def handler(request):
+        return httpx.Response(200, json=example("slug_markets.json"))
+
+    async def run():
+        async with make_client(handler) as client:
+            return [
+                batch async for batch in client.stream_markets("bitcoin", batch_size=1)
+            ]
+
+    batches = asyncio.run(run())
+    assert [len(batch) for batch in batches] == [1, 1]
+    assert [batch[0].exchange_id for batch in batches] == ["Binance", "BYBIT"]
+
+
+def test_cache_keeps_closed_history_windows_and_revalidates_markets(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.path.endswith("/markets"):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200, json=example("slug_markets.json"), headers={"ETag": '"v1"'}
+            )
+        return httpx.Response(200, json=example("slug_history.json"))
+
+    async def run(cache):
+        async with make_client(handler, cache=cache) as client:
+            for _ in range(2):
+                await client.get_history("bitcoin", "d1", start=0, end=86_400_000)
+                markets = [
+                    market
+                    async for batch in client.stream_markets("bitcoin")
+                    for market in batch
+                ]
+            return markets
+
+    cache = ResponseCache(ttl=0, directory=tmp_path)
+    markets = asyncio.run(run(cache))
+    assert len(markets) == 2
+    # history fetched once; markets fetched, then revalidated with its ETag
+    assert [request.url.path for request in requests] == [
+        "/v3/assets/bitcoin/history",
+        "/v3/assets/bitcoin/markets",
+        "/v3/assets/bitcoin/markets",
+    ]
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
+    assert cache.stats()["cache_revalidated"] == 1
+
+    # a new process reuses the closed window from disk
+    requests.clear()
+    asyncio.run(run(ResponseCache(ttl=60, directory=tmp_path)))
+    assert [request.url.path for request in requests] == ["/v3/assets/bitcoin/markets"]
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, max_bytes=10, ttl=60)
+    response = httpx.Response(200)
+    cache.put("a", response, b"1234", ttl=60)
+    cache.put("b", response, b"1234", ttl=60)
+    cache.get("a")
+    cache.put("c", response, b"1234", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"1234"
+    cache.put("d", response, b"12345678", ttl=60)
+    assert cache.stats()["cache_entries"] == 1
+
+
+def test_get_all_markets_fetches_pages_concurrently_until_short_page():
+    total = 23
+    template = example("slug_markets.json")["data"][0]
+    offsets = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        offsets.append(offset)
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        data = [
+            {**template, "quoteId": f"quote-{i}"}
+            for i in range(offset, min(offset + limit, total))
+        ]
+        return httpx.Response(200, json={"data": data})
+
+    async def run():
+        async with make_client(handler, rate_limit=0) as client:
+            return [
+                page
+                async for page in client.get_all_markets(
+                    "bitcoin", page_size=5, max_concurrency=3
+                )
+            ]
+
+    pages = asyncio.run(run())
+    quotes = sorted(int(m.quote_id.split("-")[1]) for page in pages for m in page)
+    assert quotes == list(range(total))
+    assert in_flight["max"] == 3
+    assert offsets[0] == 0 and max(offsets) <= 30
+
+
+def test_accept_encoding_negotiation_and_gzip_bodies():
+    seen = {}
+
+    def handler(request):
+        seen["accept_encoding"] = request.headers["Accept-Encoding"]
+        body = gzip.compress(json.dumps(example("slug_history.json")).encode())
+        return httpx.Response(200, content=body, headers={"Content-Encoding": "gzip"})
+
+    async def run():
+        async with make_client(
+            handler, accept_encoding="gzip, unknown", http2=True
+        ) as client:
+            return await client.get_history("bitcoin"), client
+
+    history, client = asyncio.run(run())
+    assert len(history) == 3
+    assert seen["accept_encoding"] == "gzip"
+    assert negotiate_encodings("unknown") == "identity"
+    assert negotiate_encodings().startswith("gzip, deflate")
+    # without the h2 package the client quietly stays on HTTP/1.1
+    assert client.http2 == (importlib.util.find_spec("h2") is not None)
+
+
+def test_get_all_assets_pages_through_the_listing():
+    templates = example("assets.json")["data"]
+
+    def handler(request):
+        assert request.url.path.endswith("/assets")
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        data = [
+            {**templates[i % 3], "id": f"asset-{i}", "rank": str(i + 1)}
+            for i in range(offset, min(offset + limit, 12))
+        ]
+        return httpx.Response(200, json={"data": data})
+
+    async def run():
+        async with make_client(handler, rate_limit=0) as client:
+            return [page async for page in client.get_all_assets(page_size=5)]
+
+    pages = asyncio.run(run())
+    assert sorted(asset.rank for page in pages for asset in page) == list(range(1, 13))
+    assert pages[0][1].max_supply is None
+
+
+def test_http_client_is_created_on_first_request():
+    async def run():
+        client = make_client(lambda request: httpx.Response(200, json={"data": []}))
+        assert client._client is None
+        async with client:
+            await client.get_markets("bitcoin")
+            assert client._client is not None
+        # closing a client that never sent a request is a no-op
+        async with make_client(lambda request: httpx.Response(500)):
+            pass
+
+    asyncio.run(run())
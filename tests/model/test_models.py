@@ -6,6 +6,7 @@ import pytest
 from src.model.cryptocurrency import (
     AssetHistory,
     AssetHistoryResponse,
+    HistoryPointsAdapter,
     Market,
     MarketResponse,
 )
@@ -87,3 +88,13 @@ def test_history_invalid_type(sample_history_dict):
     bad["priceUsd"] = "not a number"
     with pytest.raises(ValueError):
         AssetHistory.model_validate(bad)
+
+
+def test_history_points_adapter_fast_path(sample_history_dict):
+    points = HistoryPointsAdapter.validate_python([sample_history_dict])
+    assert points == [{"price_usd": Decimal("62792.13"), "time": 1714348800000}]
+
+    bad = sample_history_dict.copy()
+    bad["priceUsd"] = "not a number"
+    with pytest.raises(ValueError):
+        HistoryPointsAdapter.validate_python([bad])
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from src.model.sql_models import Base, MarketChange, MarketCurrent  # noqa: E402
+from src.repository.async_crypto_repository import AsyncCryptoRepository  # noqa: E402
+from src.util.db import (  # noqa: E402
+    async_database_url,
+    get_async_engine,
+    get_async_session_factory,
+)
+
+
+def test_async_database_url_swaps_driver():
+    assert (
+        async_database_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+    )
+    assert (
+        async_database_url("postgresql://u:p@db/crypto")
+        == "postgresql+asyncpg://u:p@db/crypto"
+    )
+
+
+def test_async_repository_upserts_and_tracks_watermarks(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    rows = [
+        ("bitcoin", 1.0, datetime(2024, 4, day), day * 86_400_000, "d1")
+        for day in (1, 2, 3)
+    ]
+
+    async def run():
+        engine = get_async_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            async with get_async_session_factory(url)() as session:
+                repo = AsyncCryptoRepository(session)
+                inserted = await repo.upsert_asset_histories(rows)
+                skipped = await repo.upsert_asset_histories(rows[:1])
+                await repo.set_watermark(
+                    "bitcoin", "history", "d1", datetime(2024, 4, 3)
+                )
+                await repo.set_watermark(
+                    "bitcoin", "history", "d1", datetime(2024, 4, 1)
+                )
+                stored = await repo.get_asset_history_by_date_range(
+                    "bitcoin", datetime(2024, 4, 2), datetime(2024, 4, 30)
+                )
+                return (
+                    inserted,
+                    skipped,
+                    len(stored),
+                    await repo.get_latest_dates(["bitcoin", "ethereum"]),
+                    await repo.get_watermarks(["bitcoin"], "history", "d1"),
+                )
+        finally:
+            await engine.dispose()
+
+    inserted, skipped, stored, latest, watermarks = asyncio.run(run())
+    assert (inserted, skipped, stored) == (3, 0, 2)
+    assert latest == {"bitcoin": datetime(2024, 4, 3)}
+    assert watermarks == {"bitcoin": datetime(2024, 4, 3)}
+
+
+def test_async_market_snapshots_only_record_real_changes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+
+    def market(price, volume=1000):
+        return ("Binance", "bitcoin", "tether", "BTC", "USDT", volume, price, 10)
+
+    async def run():
+        engine = get_async_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            async with get_async_session_factory(url)() as session:
+                repo = AsyncCryptoRepository(session)
+                changed = [
+                    await repo.upsert_market_snapshots([snapshot], threshold=0.01)
+                    for snapshot in (market(100), market(100.6), market(101.2))
+                ]
+                current = await session.execute(
+                    select(MarketCurrent.price_usd, MarketCurrent.changed_at)
+                )
+                changes = await session.execute(select(MarketChange.created_at))
+                return changed, current.one(), changes.scalars().all()
+        finally:
+            await engine.dispose()
+
+    changed, current, changes = asyncio.run(run())
+    assert changed == [1, 0, 1]
+    assert float(current.price_usd) == 101.2
+    assert current.changed_at == max(changes)
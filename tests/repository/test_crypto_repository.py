@@ -0,0 +1,146 @@
+from datetime import datetime
+from decimal import Decimal
+
+from src.model.sql_models import MarketChange
+from src.repository.crypto_repository import CryptoRepository
+
+
+def history_row(day, price):
+    date = datetime(2024, 4, day)
+    return {
+        "asset_id": "bitcoin",
+        "price_usd": price,
+        "date": date,
+        "time": int(date.timestamp() * 1000),
+    }
+
+
+def test_upsert_asset_histories_skips_existing(session):
+    repo = CryptoRepository(session)
+    assert repo.upsert_asset_histories([history_row(1, 1.0), history_row(2, 2.0)]) == 2
+
+    inserted = repo.upsert_asset_histories(
+        [history_row(2, 99.0), history_row(3, 3.0)], chunk_size=1
+    )
+
+    assert inserted == 1
+    stored = repo.get_asset_history_by_date_range(
+        "bitcoin", datetime(2024, 4, 1), datetime(2024, 4, 30)
+    )
+    assert [float(h.price_usd) for h in stored] == [1.0, 2.0, 3.0]
+
+
+def test_upsert_asset_histories_updates_from_tuples(session):
+    repo = CryptoRepository(session)
+    row = history_row(1, 1.0)
+    repo.upsert_asset_histories([row])
+
+    repo.upsert_asset_histories(
+        [("bitcoin", Decimal("5.5"), row["date"], row["time"])], update=True
+    )
+
+    stored = repo.get_asset_history_by_date_range("bitcoin", row["date"], row["date"])
+    assert len(stored) == 1
+    assert float(stored[0].price_usd) == 5.5
+
+
+def test_bulk_load_falls_back_to_executemany_on_sqlite(session):
+    repo = CryptoRepository(session)
+    repo.upsert_asset_histories([history_row(1, 1.0)])
+
+    inserted = repo.bulk_load_asset_histories(
+        [history_row(1, 1.0), history_row(2, 2.0), history_row(3, 3.0)]
+    )
+    markets = repo.bulk_load_markets(
+        [("binance", "bitcoin", "tether", "BTC", "USDT", 1e9, 94330.61, 17.1)]
+    )
+
+    assert inserted == 2
+    assert markets == 1
+    assert len(repo.get_all()) == 3
+
+
+def test_bulk_load_keeps_the_last_row_for_a_repeated_key(session):
+    repo = CryptoRepository(session)
+
+    inserted = repo.bulk_load_asset_histories(
+        [history_row(1, 1.0), history_row(2, 2.0), history_row(1, 9.0)]
+    )
+
+    assert inserted == 2
+    stored = repo.get_asset_history_by_date_range(
+        "bitcoin", datetime(2024, 4, 1), datetime(2024, 4, 30)
+    )
+    assert [float(h.price_usd) for h in stored] == [9.0, 2.0]
+
+
+def test_watermarks_only_move_forward(session):
+    repo = CryptoRepository(session)
+    repo.set_watermark("bitcoin", "history", "d1", datetime(2024, 4, 2))
+    repo.set_watermark("bitcoin", "history", "d1", datetime(2024, 4, 1))
+    repo.set_watermark("ethereum", "history", "d1", datetime(2024, 3, 1))
+    repo.set_watermark("ethereum", "history", "h1", datetime(2024, 5, 1))
+
+    watermarks = repo.get_watermarks(
+        ["bitcoin", "ethereum", "cardano"], "history", "d1"
+    )
+
+    assert watermarks == {
+        "bitcoin": datetime(2024, 4, 2),
+        "ethereum": datetime(2024, 3, 1),
+    }
+
+
+def test_market_snapshots_record_changes_past_threshold(session):
+    repo = CryptoRepository(session)
+
+    def market(price, volume=1000):
+        return ("Binance", "bitcoin", "tether", "BTC", "USDT", volume, price, 10)
+
+    assert repo.upsert_market_snapshots([market(100)], threshold=0.01) == 1
+    # small moves are folded into the current row only...
+    assert repo.upsert_market_snapshots([market(100.6)], threshold=0.01) == 0
+    # ...but are measured from the last recorded change, so drift adds up
+    assert repo.upsert_market_snapshots([market(101.2)], threshold=0.01) == 1
+    assert repo.upsert_market_snapshots([market(101.2, 2000)], threshold=0.01) == 1
+
+    current = repo.get_current_market("bitcoin", "tether", "Binance")
+    assert (current.price_usd, current.volume_usd_24h) == (
+        Decimal("101.2"),
+        Decimal(2000),
+    )
+    assert len(repo.get_current_markets("bitcoin")) == 1
+
+
+def test_cross_section_and_market_snapshots_as_of(session):
+    repo = CryptoRepository(session)
+    rows = [history_row(1, 1.0), history_row(2, 2.0)]
+    rows.append({**history_row(2, 30.0), "asset_id": "ethereum"})
+    repo.upsert_asset_histories(rows)
+    assert repo.get_prices_on(datetime(2024, 4, 2)) == {
+        "bitcoin": Decimal("2.0"),
+        "ethereum": Decimal("30.0"),
+    }
+
+    columns = ("exchange_id", "quote_id", "price_usd", "created_at")
+    changes = [
+        ("Binance", "tether", 100, datetime(2024, 4, 1)),
+        ("Binance", "tether", 110, datetime(2024, 4, 3)),
+        ("Kraken", "usd", 105, datetime(2024, 4, 2)),
+    ]
+    session.add_all(
+        MarketChange(
+            **dict(zip(columns, change)),
+            base_id="bitcoin",
+            volume_usd_24h=1,
+            volume_percent=1,
+        )
+        for change in changes
+    )
+    session.commit()
+
+    as_of = repo.get_market_snapshots_as_of("bitcoin", datetime(2024, 4, 2, 12))
+    assert sorted((m.exchange_id, m.price_usd) for m in as_of) == [
+        ("Binance", Decimal(100)),
+        ("Kraken", Decimal(105)),
+    ]
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from src.model.sql_models import AssetLease
+from src.repository.lease_repository import LeaseRepository
+
+
+def test_leases_are_exclusive_and_completed_once(session):
+    repo = LeaseRepository(session)
+    repo.enqueue(["bitcoin", "ethereum", "cardano"])
+
+    first = repo.acquire("worker-a", lease_seconds=60, limit=2)
+    second = repo.acquire("worker-b", lease_seconds=60, limit=2)
+
+    # handed out in enqueue (priority) order
+    assert first == ["bitcoin", "ethereum"]
+    assert second == ["cardano"]
+    assert repo.acquire("worker-c", lease_seconds=60) == []
+    assert not repo.complete("worker-b", "bitcoin")
+    assert repo.complete("worker-a", "bitcoin")
+    assert repo.pending() == 2
+
+
+def test_expired_leases_are_reclaimed(session):
+    repo = LeaseRepository(session)
+    repo.enqueue(["bitcoin"])
+    assert repo.acquire("dead-worker", lease_seconds=60) == ["bitcoin"]
+
+    session.execute(
+        update(AssetLease).values(lease_expires_at=datetime.utcnow() - timedelta(1))
+    )
+    session.commit()
+
+    assert repo.acquire("worker-b", lease_seconds=60) == ["bitcoin"]
+    assert not repo.renew("dead-worker", "bitcoin", 60)
+    assert repo.renew("worker-b", "bitcoin", 60)
+
+    # released work is retried until it runs out of attempts
+    assert repo.release("worker-b", "bitcoin")
+    assert repo.acquire("worker-c", lease_seconds=60, max_attempts=3) == ["bitcoin"]
+    assert repo.release("worker-c", "bitcoin")
+    assert repo.acquire("worker-d", lease_seconds=60, max_attempts=3) == []
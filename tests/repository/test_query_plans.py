@@ -0,0 +1,149 @@
+"""
+Query-plan regression tests: the repository's hot queries must stay on their
+indexes. SQLite plans run everywhere; PostgreSQL plans (partition pruning,
+index-only scans) run when TEST_POSTGRES_URL points at a disposable database.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from src.analytics.price_matrix import load_price_matrix
+from src.migrations import migrate
+from src.repository.crypto_repository import CryptoRepository
+from src.repository.timeseries_repository import TimeSeriesRepository
+
+HOUR = 3_600_000
+START = datetime(2024, 5, 1)
+
+
+def seed(session):
+    repo = CryptoRepository(session)
+    repo.upsert_asset_histories(
+        (
+            asset_id,
+            100 + i,
+            START + timedelta(hours=i),
+            int((START + timedelta(hours=i)).timestamp() * 1000),
+            "h1",
+        )
+        for asset_id in ("bitcoin", "ethereum")
+        for i in range(24 * 62)
+    )
+
+
+def hot_queries(session):
+    """Run each hot repository query, returning (name, sql, parameters)."""
+    captured = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, sql, params, context, many: captured.append((sql, params)),
+    )
+    # Clear of the month edges, so date bounds derived from time stay in May
+    start = int((START + timedelta(days=7)).timestamp() * 1000)
+    queries = {
+        "series": lambda: TimeSeriesRepository(session).returns(
+            "bitcoin", "h1", start, start + 48 * HOUR
+        ),
+        "cross_section": lambda: CryptoRepository(session).get_prices_on(START, "h1"),
+        "date_range": lambda: CryptoRepository(session).get_asset_history_by_date_range(
+            "bitcoin", START, START + timedelta(days=2), "h1"
+        ),
+        "latest_markets": lambda: CryptoRepository(session).get_market_snapshots_as_of(
+            "bitcoin", START
+        ),
+    }
+    if find_spec("numpy"):
+        queries["price_matrix"] = lambda: load_price_matrix(
+            session,
+            ["bitcoin", "ethereum"],
+            START + timedelta(days=7),
+            START + timedelta(days=9),
+            "h1",
+        )
+    for name, run in queries.items():
+        captured.clear()
+        run()
+        yield (name, *captured[-1])
+
+
+@pytest.fixture
+def sqlite_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    migrate(engine)
+    with sessionmaker(bind=engine)() as session:
+        seed(session)
+        session.execute(text("ANALYZE"))
+        yield session
+    engine.dispose()
+
+
+def test_sqlite_hot_queries_use_indexes(sqlite_session):
+    expected = {
+        # INCLUDE (price_usd) makes it covering on PostgreSQL only
+        "series": "INDEX ix_asset_history_series",
+        "cross_section": "INDEX ix_asset_history_date",
+        "date_range": "INDEX sqlite_autoindex_asset_history_1",
+        "latest_markets": "INDEX sqlite_autoindex_market_changes_1",
+        "price_matrix": "INDEX sqlite_autoindex_asset_history_1",
+    }
+    for name, sql, params in hot_queries(sqlite_session):
+        plan = " | ".join(
+            row[-1]
+            for row in sqlite_session.connection().exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {sql}", params
+            )
+        )
+        assert expected[name] in plan, (name, plan)
+
+
+@pytest.fixture
+def postgres_session():
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    from src.partitions import ensure_partitions
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+    migrate(engine)
+    with sessionmaker(bind=engine)() as session:
+        seed(session)
+        session.commit()
+        ensure_partitions(engine, convert=True)
+        # VACUUM sets the visibility map that index-only scans rely on
+        with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            connection.execute(text("VACUUM ANALYZE"))
+        # Plan shape, not the planner's cost choice on a tiny table
+        session.execute(text("SET enable_seqscan = off"))
+        yield session
+    engine.dispose()
+
+
+def test_postgres_hot_queries_prune_partitions_and_use_indexes(postgres_session):
+    cursor = postgres_session.connection().connection.cursor()
+    for name, sql, params in hot_queries(postgres_session):
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = json.dumps(cursor.fetchone()[0])
+        assert "Seq Scan" not in plan, (name, plan)
+        if name == "latest_markets":
+            continue
+        # May 2024 only: June and the default partition are pruned
+        assert "asset_history_2024_05" in plan, (name, plan)
+        assert "asset_history_2024_06" not in plan, (name, plan)
+        assert "asset_history_default" not in plan, (name, plan)
+    cursor.execute(
+        "EXPLAIN (FORMAT JSON) SELECT price_usd FROM asset_history "
+        "WHERE asset_id = 'bitcoin' AND interval = 'h1' AND time >= 0"
+    )
+    assert "Index Only Scan" in json.dumps(cursor.fetchone()[0])
@@ -0,0 +1,73 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.repository.crypto_repository import CryptoRepository
+from src.repository.timeseries_repository import TimeSeriesRepository
+
+HOUR = 3_600_000
+START = 1_714_521_600_000  # 2024-05-01T00:00:00Z
+
+
+def store(session, asset_id, prices, step=HOUR):
+    rows = [
+        (
+            asset_id,
+            price,
+            datetime.fromtimestamp((START + i * step) / 1000),
+            START + i * step,
+            "h1",
+        )
+        for i, price in enumerate(prices)
+    ]
+    CryptoRepository(session).upsert_asset_histories(rows)
+
+
+def test_ohlc_buckets(session):
+    store(session, "bitcoin", [10, 14, 9, 12, 20, 18])
+    bars = TimeSeriesRepository(session).ohlc(
+        "bitcoin", "h1", 3 * HOUR, START, START + 6 * HOUR
+    )
+    assert [tuple(bar) for bar in bars] == [
+        (START, Decimal(10), Decimal(14), Decimal(9), Decimal(9), 3),
+        (START + 3 * HOUR, Decimal(12), Decimal(20), Decimal(12), Decimal(18), 3),
+    ]
+
+
+def test_moving_average_seeds_from_earlier_points(session):
+    store(session, "bitcoin", [1, 2, 3, 4, 5])
+    rows = TimeSeriesRepository(session).moving_average(
+        "bitcoin", "h1", 3, START + 2 * HOUR, START + 5 * HOUR
+    )
+    assert [row[2] for row in rows] == [Decimal(2), Decimal(3), Decimal(4)]
+
+
+def test_returns_and_volatility(session):
+    store(session, "bitcoin", [100, 110, 99, 99])
+    repo = TimeSeriesRepository(session)
+
+    returns = repo.returns("bitcoin", "h1", START + HOUR, START + 4 * HOUR)
+    assert [round(row[2], 6) for row in returns] == [0.1, -0.1, 0.0]
+
+    volatility = repo.volatility("bitcoin", "h1", 2, START, START + 4 * HOUR)
+    assert volatility[0] == (START, None)
+    assert volatility[2][1] == pytest.approx(0.141421, rel=1e-4)
+
+
+def test_pivot_and_keyset_pages(session):
+    store(session, "bitcoin", [1, 2, 3])
+    store(session, "ethereum", [10, 20], step=2 * HOUR)
+    repo = TimeSeriesRepository(session)
+
+    rows = repo.pivot(["bitcoin", "ethereum"], "h1", START, START + 3 * HOUR)
+    assert [tuple(row) for row in rows] == [
+        (START, Decimal(1), Decimal(10)),
+        (START + HOUR, Decimal(2), None),
+        (START + 2 * HOUR, Decimal(3), Decimal(20)),
+    ]
+
+    first, cursor = repo.page("bitcoin", "h1", limit=2)
+    second, last = repo.page("bitcoin", "h1", after_time=cursor, limit=2)
+    assert [row[0] for row in first + second] == [START + i * HOUR for i in range(3)]
+    assert last is None
@@ -0,0 +1,269 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.model.cryptocurrency import AssetHistoryResponse, MarketResponse
+from src.model.sql_models import AssetHistory, Base, MarketChange, MarketCurrent
+from src.repository.crypto_repository import CryptoRepository
+from src.service.crypto_service import CryptoService
+from src.service.pipeline import IngestionPipeline
+
+EXAMPLES = Path(__file__).resolve().parents[2] / "src" / "examples"
+
+
+class FakeClient:
+    """Stand-in for CoinCapClient serving the bundled example payloads."""
+
+    def __init__(self, failing=(), delay=0.01):
+        self.failing = set(failing)
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.history = AssetHistoryResponse.model_validate(
+            json.loads((EXAMPLES / "slug_history.json").read_text())
+        ).data
+        self.markets = MarketResponse.model_validate(
+            json.loads((EXAMPLES / "slug_markets.json").read_text())
+        ).data
+
+    async def _call(self, asset_id, payload):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if asset_id in self.failing:
+                raise RuntimeError(f"boom for {asset_id}")
+            return payload
+        finally:
+            self.in_flight -= 1
+
+    async def get_history(self, asset_id, interval="d1", start=None, end=None):
+        return await self._call(asset_id, self.history)
+
+    async def iter_history_points(
+        self, asset_id, interval, start, end, max_concurrency=None
+    ):
+        history = await self.get_history(asset_id, interval, start, end)
+        yield [{"price_usd": h.price_usd, "time": h.time} for h in history]
+
+    async def get_markets(self, asset_id, limit=100, offset=0):
+        markets = [m.model_copy(update={"base_id": asset_id}) for m in self.markets]
+        return await self._call(asset_id, markets)
+
+    async def stream_markets(self, asset_id, limit=100, offset=0, batch_size=None):
+        yield await self.get_markets(asset_id, limit, offset)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def count_rows(session_factory, model):
+    with session_factory() as session:
+        return session.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_ingest_multiple_assets_concurrently(session_factory):
+    client = FakeClient(failing={"broken"})
+    assets = ["bitcoin", "ethereum", "broken", "cardano"]
+
+    with session_factory() as session:
+        service = CryptoService(session, session_factory=session_factory)
+        asyncio.run(
+            service.ingest_multiple_assets(
+                client, assets, datetime(2024, 1, 1), max_workers=4
+            )
+        )
+
+    assert client.max_in_flight > 1
+    assert count_rows(session_factory, AssetHistory) == 3 * len(client.history)
+    assert count_rows(session_factory, MarketCurrent) == 3 * len(client.markets)
+
+
+@pytest.mark.skipif(
+    not (find_spec("aiosqlite") and find_spec("greenlet")),
+    reason="requires the async extra",
+)
+def test_async_session_factory_writes_fetched_pages(session_factory):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine = session_factory.kw["bind"]
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+
+    async def run():
+        async_engine = create_async_engine(
+            str(engine.url).replace("sqlite://", "sqlite+aiosqlite://")
+        )
+        try:
+            with session_factory() as session:
+                service = CryptoService(
+                    session,
+                    session_factory=session_factory,
+                    async_session_factory=async_sessionmaker(async_engine),
+                )
+                await service.ingest_multiple_assets(
+                    FakeClient(), ["bitcoin", "ethereum"], max_workers=2
+                )
+        finally:
+            await async_engine.dispose()
+
+    client = FakeClient()
+    asyncio.run(run())
+
+    # The sync sessions only planned the run; every write went through the async one
+    assert not [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert count_rows(session_factory, AssetHistory) == 2 * len(client.history)
+    assert count_rows(session_factory, MarketCurrent) == 2 * len(client.markets)
+    assert count_rows(session_factory, MarketChange) == 2 * len(client.markets)
+    with session_factory() as session:
+        watermarks = CryptoRepository(session).get_watermarks(
+            ["bitcoin", "ethereum"], CryptoService.HISTORY_DATASET, "d1"
+        )
+    assert watermarks.keys() == {"bitcoin", "ethereum"}
+
+
+def test_repeated_market_ingest_only_records_changes(session_factory):
+    client = FakeClient()
+    with session_factory() as session:
+        service = CryptoService(session)
+        asyncio.run(service.ingest_market_data(client, "bitcoin"))
+        asyncio.run(service.ingest_market_data(client, "bitcoin"))
+
+    assert count_rows(session_factory, MarketCurrent) == len(client.markets)
+    assert count_rows(session_factory, MarketChange) == len(client.markets)
+
+
+def test_ingest_multiple_assets_requires_session_factory(session_factory):
+    with session_factory() as session:
+        service = CryptoService(session)
+        with pytest.raises(ValueError):
+            asyncio.run(
+                service.ingest_multiple_assets(FakeClient(), ["bitcoin"], max_workers=2)
+            )
+
+
+def test_history_watermark_drives_next_run(session_factory):
+    client = FakeClient()
+    last_date = max(datetime.fromtimestamp(h.time / 1000) for h in client.history)
+
+    with session_factory() as session:
+        service = CryptoService(session)
+        asyncio.run(
+            service.ingest_multiple_assets(
+                client, ["bitcoin"], datetime(2024, 1, 1), ingest_market=False
+            )
+        )
+        starts = service.plan_history_start_dates(["bitcoin", "ethereum"])
+
+    assert starts == {
+        "bitcoin": last_date + timedelta(days=1),
+        "ethereum": CryptoService.DEFAULT_START_DATE,
+    }
+
+
+def test_rollup_history_writes_complete_buckets_only(session_factory):
+    hour = 3_600_000
+    start = 1_711_929_600_000  # 2024-04-01T00:00:00Z
+    rows = [
+        (
+            "bitcoin",
+            float(i),
+            datetime.fromtimestamp((start + i * hour) / 1000),
+            start + i * hour,
+            "h1",
+        )
+        for i in range(53)  # two full days plus a partial third day
+    ]
+
+    with session_factory() as session:
+        service = CryptoService(session)
+        service._write_history("bitcoin", "h1", rows)
+
+        assert service.rollup_history("bitcoin", "h1", "d1") == 2
+        assert service.rollup_history("bitcoin", "h1", "d1") == 0
+        daily = service.crypto_repo.get_asset_history_by_date_range(
+            "bitcoin", datetime(2024, 3, 30), datetime(2024, 4, 5), interval="d1"
+        )
+
+    assert [h.time for h in daily] == [start, start + 24 * hour]
+    assert [float(h.price_usd) for h in daily] == [11.5, 35.5]
+
+
+def test_pipeline_ingests_with_stage_metrics(session_factory):
+    client = FakeClient(failing={"broken"})
+    pipeline = IngestionPipeline(session_factory, fetch_workers=3, queue_size=1)
+
+    metrics = asyncio.run(
+        pipeline.run(client, ["bitcoin", "broken", "ethereum"], datetime(2024, 1, 1))
+    )
+
+    assert count_rows(session_factory, AssetHistory) == 2 * len(client.history)
+    assert count_rows(session_factory, MarketCurrent) == 2 * len(client.markets)
+    assert metrics["write"]["rows"] == 2 * (len(client.history) + len(client.markets))
+    assert metrics["fetch"]["batches"] == metrics["transform"]["batches"] == 4
+
+
+class OnePointPerBatchClient(FakeClient):
+    async def iter_history_points(
+        self, asset_id, interval, start, end, max_concurrency=None
+    ):
+        for h in await self.get_history(asset_id, interval, start, end):
+            yield [{"price_usd": h.price_usd, "time": h.time}]
+
+
+def test_pipeline_failed_write_keeps_watermark_before_the_gap(
+    session_factory, monkeypatch
+):
+    client = OnePointPerBatchClient()
+    first, second, _ = sorted(h.time for h in client.history)
+    upsert = CryptoRepository.upsert_asset_histories
+
+    def failing_upsert(self, rows, *args, **kwargs):
+        if any(row[0] == "bitcoin" and row[3] == second for row in rows):
+            raise RuntimeError("disk full")
+        return upsert(self, rows, *args, **kwargs)
+
+    monkeypatch.setattr(CryptoRepository, "upsert_asset_histories", failing_upsert)
+    pipeline = IngestionPipeline(session_factory, fetch_workers=1, write_batch_size=1)
+    asyncio.run(
+        pipeline.run(
+            client, ["bitcoin", "ethereum"], datetime(2024, 1, 1), ingest_market=False
+        )
+    )
+
+    assert pipeline.failed == {"bitcoin"}
+    with session_factory() as session:
+        stored = session.execute(select(AssetHistory.asset_id, AssetHistory.time)).all()
+        watermarks = CryptoRepository(session).get_watermarks(
+            ["bitcoin", "ethereum"], CryptoService.HISTORY_DATASET, "d1"
+        )
+    assert sorted(t for a, t in stored if a == "bitcoin") == [first]
+    assert len([a for a, _ in stored if a == "ethereum"]) == len(client.history)
+    assert watermarks["bitcoin"] == datetime.fromtimestamp(first / 1000)
+
+
+@pytest.mark.parametrize("rollups", [["d1"], ["h1"], ["w1"]])
+def test_invalid_rollup_intervals_fail_before_fetching(session_factory, rollups):
+    client = FakeClient()
+    with session_factory() as session:
+        service = CryptoService(session)
+        with pytest.raises(ValueError):
+            asyncio.run(
+                service.ingest_multiple_assets(
+                    client, ["bitcoin"], interval="d1", rollup_intervals=rollups
+                )
+            )
+    assert client.max_in_flight == 0
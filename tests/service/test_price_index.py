@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.model.sql_models import Base
+from src.repository.crypto_repository import CryptoRepository
+from src.service.crypto_service import CryptoService
+from src.service.pipeline import IngestionPipeline
+from src.service.price_index import LatestPriceIndex
+from tests.service.test_crypto_service import FakeClient
+
+DAY = datetime(2024, 1, 1)
+
+
+def history(asset_id, price, days, interval="d1"):
+    date = DAY + timedelta(days=days)
+    return (asset_id, price, date, int(date.timestamp() * 1000), interval)
+
+
+def market(base_id, price, exchange_id="binance"):
+    return {
+        "exchange_id": exchange_id,
+        "base_id": base_id,
+        "quote_id": "tether",
+        "base_symbol": base_id[:3].upper(),
+        "quote_symbol": "USDT",
+        "volume_usd_24h": 1000,
+        "price_usd": price,
+        "volume_percent": 1,
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        repo = CryptoRepository(session)
+        repo.upsert_asset_histories(
+            [
+                history("bitcoin", 100, 0),
+                history("bitcoin", 110, 1),
+                history("bitcoin", 999, 2, interval="h1"),
+                history("ethereum", 10, 0),
+            ]
+        )
+        repo.upsert_market_snapshots([market("bitcoin", 111), market("ethereum", 11)])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def queries(engine):
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+    return statements
+
+
+@pytest.fixture
+def index(engine):
+    return LatestPriceIndex(sessionmaker(bind=engine))
+
+
+def test_warm_loads_everything_with_one_query_per_dataset(index, queries):
+    assert index.warm() == 4
+    assert len(queries) == 2
+
+    bitcoin = index.price("bitcoin")
+    assert (bitcoin.price_usd, bitcoin.date) == (110, DAY + timedelta(days=1))
+    assert index.prices(["bitcoin", "ethereum"])["ethereum"].price_usd == 10
+    assert index.market("ethereum", "tether", "binance").price_usd == 11
+    assert len(queries) == 2
+    assert index.stats()["price_index_hits"] == 4
+
+
+def test_bulk_misses_are_loaded_in_one_query(index, queries):
+    prices = index.prices(["bitcoin", "ethereum", "dogecoin", "bitcoin"])
+
+    assert sorted(prices) == ["bitcoin", "ethereum"]
+    assert len(queries) == 1
+    # Unknown assets are remembered too, so they do not query again
+    assert index.price("dogecoin") is None
+    assert index.prices(["bitcoin", "dogecoin"]).keys() == {"bitcoin"}
+    assert len(queries) == 1
+
+    markets = index.markets(
+        [("bitcoin", "tether", "binance"), ("bitcoin", "tether", "kraken")]
+    )
+    assert list(markets) == [("bitcoin", "tether", "binance")]
+    assert len(queries) == 2
+
+
+def test_least_recently_used_entries_are_evicted(engine, queries):
+    index = LatestPriceIndex(sessionmaker(bind=engine), max_assets=1)
+
+    index.price("bitcoin")
+    index.price("ethereum")
+    index.price("ethereum")
+    assert len(queries) == 2
+    index.price("bitcoin")
+    assert len(queries) == 3
+    assert index.stats()["price_index_evictions"] == 2
+
+
+def test_max_age_reloads_entries(engine, queries):
+    index = LatestPriceIndex(sessionmaker(bind=engine), max_age=0)
+
+    index.price("bitcoin")
+    index.price("bitcoin")
+    assert len(queries) == 2
+
+
+def test_updates_only_move_cached_prices_forward(index, queries):
+    index.warm()
+
+    index.update_prices(
+        [
+            history("bitcoin", 50, -10),
+            history("bitcoin", 500, 5, interval="h1"),
+            history("ethereum", 12, 3),
+            history("ethereum", 11, 2),
+            history("solana", 1, 3),
+        ]
+    )
+
+    assert index.price("bitcoin").price_usd == 110
+    assert index.price("ethereum").price_usd == 12
+    assert len(index._prices) == 2
+    assert len(queries) == 2
+
+
+@pytest.mark.parametrize("ingest_with", ["service", "pipeline"])
+def test_ingestion_updates_the_index(engine, index, ingest_with):
+    factory = sessionmaker(bind=engine)
+    index.warm()
+    index.invalidate()
+    # Cached as unknown before ingestion writes its first rows
+    assert index.price("cardano") is None
+    assert index.market("cardano", "tether", "binance") is None
+
+    client = FakeClient()
+    if ingest_with == "service":
+        with factory() as session:
+            service = CryptoService(session, session_factory=factory, price_index=index)
+            asyncio.run(
+                service.ingest_multiple_assets(client, ["cardano"], DAY, max_workers=2)
+            )
+    else:
+        pipeline = IngestionPipeline(factory, price_index=index)
+        asyncio.run(pipeline.run(client, ["cardano"], DAY))
+
+    latest = max(client.history, key=lambda h: h.time)
+    assert index.price("cardano").price_usd == Decimal(str(latest.price_usd))
+    with factory() as session:
+        stored = CryptoRepository(session).get_current_markets("cardano")
+    pairs = [(m.base_id, m.quote_id, m.exchange_id) for m in stored]
+    assert stored and len(index.markets(pairs)) == len(stored)
+    # Only the two lookups before ingestion went to the database
+    assert index.stats()["price_index_misses"] == 2
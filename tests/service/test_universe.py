@@ -0,0 +1,102 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+from src.client.coincap_client import CoinCapClient
+from src.model.sql_models import Asset
+from src.repository.crypto_repository import CryptoRepository
+from src.service.universe import UniversePlanner
+
+EXAMPLES = Path(__file__).resolve().parents[2] / "src" / "examples"
+
+
+class FakeListing:
+    """Serves ``size`` assets ranked 1..N, with volume falling with rank."""
+
+    def __init__(self, size, volumes=None, failing=False, ids=None):
+        self.template = json.loads((EXAMPLES / "assets.json").read_text())["data"][0]
+        self.size = size
+        self.volumes = volumes or {}
+        self.ids = ids or {}
+        self.failing = failing
+        self.requests = 0
+
+    def __call__(self, request):
+        self.requests += 1
+        if self.failing:
+            return httpx.Response(500)
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        data = [
+            {
+                **self.template,
+                "id": self.ids.get(rank, f"asset-{rank}"),
+                "rank": str(rank),
+                "marketCapUsd": str(1e12 / rank),
+                "volumeUsd24Hr": self.volumes.get(f"asset-{rank}", str(1e10 / rank)),
+            }
+            for rank in range(offset + 1, min(offset + limit, self.size) + 1)
+        ]
+        return httpx.Response(200, json={"data": data})
+
+
+def discover(session, listing, **options):
+    async def run():
+        async with CoinCapClient(
+            base_url="https://coincap.test/v3",
+            transport=httpx.MockTransport(listing),
+            rate_limit=0,
+        ) as client:
+            return await UniversePlanner(session, **options).discover(client)
+
+    return asyncio.run(run())
+
+
+def test_top_assets_by_rank_fetch_only_the_needed_pages(session):
+    listing = FakeListing(5000)
+
+    assert discover(session, listing, size=3) == ["asset-1", "asset-2", "asset-3"]
+    assert listing.requests == 1
+    assert session.query(Asset).count() == 3
+
+
+def test_top_assets_by_volume_use_the_whole_listing(session):
+    listing = FakeListing(4500, volumes={"asset-4000": "1e12"})
+
+    universe = discover(
+        session, listing, size=3, by="volume", exclude=["asset-1"], min_volume_usd=1e5
+    )
+
+    assert universe == ["asset-4000", "asset-2", "asset-3"]
+    assert session.query(Asset).count() == 4500
+    # a failed refresh falls back to the stored listing
+    failing = FakeListing(0, failing=True)
+    assert discover(session, failing, size=2, by="market_cap") == [
+        "asset-1",
+        "asset-2",
+    ]
+
+
+def test_smaller_refresh_replaces_the_stored_listing(session):
+    discover(session, FakeListing(5000), size=5)
+    # asset-1 left the top and the universe shrank
+    universe = discover(session, FakeListing(5000, ids={1: "newcoin"}), size=3)
+
+    assert universe == ["newcoin", "asset-2", "asset-3"]
+    stored = session.query(Asset.id, Asset.rank).order_by(Asset.rank).all()
+    assert stored == [("newcoin", 1), ("asset-2", 2), ("asset-3", 3)]
+
+
+def test_failed_listing_write_falls_back_to_the_stored_listing(session, monkeypatch):
+    discover(session, FakeListing(5000), size=2)
+
+    def failing_upsert(self, rows, replace=False, commit=True):
+        # A failed flush leaves the session needing a rollback
+        self.session.add(Asset(id="broken"))
+        self.session.flush()
+
+    monkeypatch.setattr(CryptoRepository, "upsert_assets", failing_upsert)
+
+    assert discover(session, FakeListing(5000), size=2) == ["asset-1", "asset-2"]
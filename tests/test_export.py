@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from src.export import export, load_state
+from src.model.sql_models import AssetHistory, Base
+from src.repository.crypto_repository import CryptoRepository
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def history_rows(asset_id, days):
+    return [
+        (
+            asset_id,
+            Decimal("62792.13020000"),
+            date,
+            int(date.timestamp() * 1000),
+        )
+        for date in days
+    ]
+
+
+def market_row(price):
+    return {
+        "exchange_id": "Binance",
+        "base_id": "bitcoin",
+        "quote_id": "tether",
+        "base_symbol": "BTC",
+        "quote_symbol": "USDT",
+        "volume_usd_24h": 1000,
+        "price_usd": price,
+        "volume_percent": 1,
+    }
+
+
+def test_export_partitions_by_asset_and_month_incrementally(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    repo = CryptoRepository(sessionmaker(bind=engine)())
+    repo.upsert_asset_histories(
+        history_rows("bitcoin", [datetime(2024, 4, 29), datetime(2024, 5, 1)])
+    )
+    output = tmp_path / "exports"
+
+    export(engine, output, tables=["asset_history"])
+
+    april = output / "asset_history" / "asset_id=bitcoin" / "month=2024-04"
+    table = pq.read_table(next(april.glob("*.parquet")))
+    assert table.column("price_usd").to_pylist() == [Decimal("62792.13020000")]
+    assert str(table.schema.field("price_usd").type) == "decimal128(20, 8)"
+    assert "asset_id" not in table.column_names
+    assert "asset_history" in load_state(output)
+
+    repo.upsert_asset_histories(history_rows("ethereum", [datetime(2024, 5, 2)]))
+    export(engine, output, tables=["asset_history"])
+
+    files = sorted(p.relative_to(output) for p in output.rglob("*.parquet"))
+    assert len(files) == 3
+    assert str(files[-1]).startswith("asset_history/asset_id=ethereum/month=2024-05")
+    engine.dispose()
+
+
+def read_partition(directory):
+    return [pq.read_table(path).to_pylist() for path in directory.glob("*.parquet")]
+
+
+def test_incremental_export_rewrites_upserted_partitions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    repo = CryptoRepository(sessionmaker(bind=engine)())
+    days = [datetime(2024, 4, 29), datetime(2024, 5, 1)]
+    repo.upsert_asset_histories(history_rows("bitcoin", days))
+    repo.upsert_market_snapshots([market_row(100)])
+    output = tmp_path / "exports"
+    export(engine, output, tables=["asset_history", "markets_current"])
+
+    # Rewrite the May point in place and move the market
+    updated = history_rows("bitcoin", days[1:])
+    updated[0] = (*updated[0][:1], Decimal("1.00000000"), *updated[0][2:])
+    repo.upsert_asset_histories(updated, update=True)
+    repo.upsert_market_snapshots([market_row(120)])
+    export(engine, output, tables=["asset_history", "markets_current"])
+
+    bitcoin = output / "asset_history" / "asset_id=bitcoin"
+    april = read_partition(bitcoin / "month=2024-04")
+    may = read_partition(bitcoin / "month=2024-05")
+    assert len(april) == 1 and len(april[0]) == 1
+    assert len(may) == 1 and [r["price_usd"] for r in may[0]] == [Decimal(1)]
+    markets = read_partition(output / "markets_current" / "base_id=bitcoin")
+    assert len(markets) == 1 and [r["price_usd"] for r in markets[0]] == [120]
+    engine.dispose()
+
+
+def test_full_export_replaces_previous_files(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    repo = CryptoRepository(sessionmaker(bind=engine)())
+    repo.upsert_asset_histories(history_rows("bitcoin", [datetime(2024, 5, 1)]))
+    output = tmp_path / "exports"
+
+    export(engine, output, tables=["asset_history"])
+    export(engine, output, tables=["asset_history"], full=True)
+
+    assert len(list(output.rglob("*.parquet"))) == 1
+    engine.dispose()
+
+
+def test_incremental_export_picks_up_rows_committed_late(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    repo = CryptoRepository(session)
+    repo.upsert_asset_histories(history_rows("bitcoin", [datetime(2024, 5, 1)]))
+    output = tmp_path / "exports"
+    export(engine, output, tables=["asset_history"])
+    watermark = datetime.fromisoformat(load_state(output)["asset_history"])
+
+    # A slower writer commits a row stamped just before the saved watermark
+    repo.upsert_asset_histories(history_rows("ethereum", [datetime(2024, 5, 1)]))
+    session.execute(
+        update(AssetHistory)
+        .where(AssetHistory.asset_id == "ethereum")
+        .values(created_at=watermark - timedelta(seconds=1))
+    )
+    session.commit()
+    export(engine, output, tables=["asset_history"])
+
+    ethereum = output / "asset_history" / "asset_id=ethereum" / "month=2024-05"
+    assert len(read_partition(ethereum)) == 1
+    assert load_state(output)["asset_history"] == watermark.isoformat()
+    assert len(list(output.rglob("*.parquet"))) == 2
+    engine.dispose()
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from src.migrations import LATEST_VERSION, current_version, migrate
+from src.model.sql_models import AssetHistory, SchemaVersion
+from src.repository.crypto_repository import CryptoRepository
+
+
+def test_migrate_creates_schema_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+    assert migrate(engine) == LATEST_VERSION
+    tables = set(inspect(engine).get_table_names())
+    assert {"asset_history", "markets_current", "schema_version"} <= tables
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    # an up-to-date schema costs one query, no reflection
+    assert migrate(engine) == 0
+    assert len(statements) == 1
+    engine.dispose()
+
+
+# asset_history as created by create_all before history was stored per interval
+PRE_INTERVAL_ASSET_HISTORY = """
+CREATE TABLE asset_history (
+    asset_id VARCHAR NOT NULL,
+    price_usd NUMERIC(20, 8) NOT NULL,
+    date DATETIME NOT NULL,
+    time INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    CONSTRAINT asset_history_pkey PRIMARY KEY (asset_id, date)
+)
+"""
+
+
+def test_migrate_adopts_schema_created_by_create_all(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(PRE_INTERVAL_ASSET_HISTORY))
+        connection.execute(
+            text(
+                "INSERT INTO asset_history VALUES "
+                "('bitcoin', 100, '2024-01-01 00:00:00.000000', 1704067200, "
+                "'2024-01-02 00:00:00.000000')"
+            )
+        )
+
+    assert migrate(engine) == LATEST_VERSION
+    with engine.connect() as connection:
+        assert current_version(connection) == LATEST_VERSION
+        versions = connection.execute(select(SchemaVersion.version)).scalars()
+        assert list(versions) == list(range(1, LATEST_VERSION + 1))
+    key = inspect(engine).get_pk_constraint("asset_history")["constrained_columns"]
+    assert key == ["asset_id", "interval", "date"]
+
+    with sessionmaker(bind=engine)() as session:
+        repo = CryptoRepository(session)
+        # The upsert targets the new (asset_id, interval, date) key
+        repo.upsert_asset_histories(
+            [
+                ("bitcoin", 101, datetime(2024, 1, 1), 1704067200000, "d1"),
+                ("bitcoin", 99, datetime(2024, 1, 1), 1704067200000, "h1"),
+            ],
+            update=True,
+        )
+        rows = session.execute(
+            select(AssetHistory.interval, AssetHistory.price_usd).order_by(
+                AssetHistory.interval
+            )
+        ).all()
+    assert rows == [("d1", 101), ("h1", 99)]
+    engine.dispose()
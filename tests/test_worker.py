@@ -0,0 +1,55 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.client.coincap_client import CoinCapClient
+from src.model.sql_models import AssetHistory, Base
+from src.repository.lease_repository import LeaseRepository
+from src.worker import run_worker
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "src" / "examples"
+
+
+def test_workers_share_the_lease_queue(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'worker.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    assets = ["bitcoin", "ethereum", "cardano", "broken"]
+    with factory() as session:
+        LeaseRepository(session).enqueue(assets)
+
+    history = json.loads((EXAMPLES / "slug_history.json").read_text())
+
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        if "/broken/" in request.url.path:
+            return httpx.Response(500)
+        return httpx.Response(200, json=history)
+
+    async def run():
+        async with CoinCapClient(
+            base_url="https://coincap.test/v3",
+            transport=httpx.MockTransport(handler),
+            rate_limit=0,
+        ) as client:
+            return await asyncio.gather(
+                *(
+                    run_worker(factory, client, owner=f"w{i}", ingest_market=False)
+                    for i in range(2)
+                )
+            )
+
+    completed = asyncio.run(run())
+
+    assert sum(completed) == 3
+    with factory() as session:
+        stored = session.execute(
+            select(AssetHistory.asset_id, func.count()).group_by(AssetHistory.asset_id)
+        ).all()
+        assert dict(stored) == {"bitcoin": 3, "cardano": 3, "ethereum": 3}
+        assert LeaseRepository(session).pending() == 1
+    engine.dispose()
@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+from src.util.json_stream import iter_json_array
+
+
+async def byte_chunks(payload: bytes, size: int):
+    for i in range(0, len(payload), size):
+        yield payload[i : i + size]
+
+
+def collect(payload: bytes, size: int, key: str = "data"):
+    async def run():
+        return [item async for item in iter_json_array(byte_chunks(payload, size), key)]
+
+    return asyncio.run(run())
+
+
+def test_iter_json_array_handles_arbitrary_chunk_boundaries():
+    document = {
+        "meta": {"nested": [1, 2, {"data": "ignored"}]},
+        "count": 12345,
+        "data": [
+            {"priceUsd": "62792.13", "time": 1714348800000, "name": "Crédito ₿"},
+            {"priceUsd": "61827.21", "time": 1714435200000, "name": "plain"},
+        ],
+        "timestamp": 1714435200000,
+    }
+    payload = json.dumps(document, ensure_ascii=False, indent=2).encode()
+
+    for size in (1, 2, 7, 64, len(payload)):
+        assert collect(payload, size) == document["data"]
+
+
+def test_iter_json_array_streams_scalar_items_and_missing_key():
+    assert collect(b'{"data": [10, 2000, 3.5]}', 3) == [10, 2000, 3.5]
+    assert collect(b'{"other": []}', 4) == []
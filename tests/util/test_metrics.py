@@ -0,0 +1,43 @@
+import urllib.request
+
+from src.util.metrics import MetricsRegistry
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(endpoint="/a", status=200)
+    registry.counter("requests_total").inc(2, endpoint="/a", status=200)
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, endpoint="/a")
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{endpoint="/a",status="200"} 3' in text
+    assert 'latency_seconds_bucket{endpoint="/a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="/a",le="1"} 3' in text
+    assert 'latency_seconds_bucket{endpoint="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{endpoint="/a"} 4' in text
+    assert 'latency_seconds_sum{endpoint="/a"} 3.65' in text
+
+
+def test_span_dump_and_http_endpoint(tmp_path):
+    registry = MetricsRegistry()
+    with registry.span("write", asset="bitcoin"):
+        pass
+    assert (
+        registry.histogram("ingest_stage_seconds").count(stage="write", asset="bitcoin")
+        == 1
+    )
+
+    registry.dump(tmp_path / "metrics.prom")
+    assert "ingest_stage_seconds_count" in (tmp_path / "metrics.prom").read_text()
+
+    server = registry.serve(port=0, addr="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.read().decode() == registry.render()
+    finally:
+        server.shutdown()